@@ -0,0 +1,54 @@
+"""Ancrage Merkle des documents
+
+Revision ID: 3c5e1a9f2b7d
+Revises: 7ae9d8da05c4
+Create Date: 2026-10-19 09:12:41.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c5e1a9f2b7d'
+down_revision: Union[str, None] = '7ae9d8da05c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('documents_ancrages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('jour', sa.Date(), nullable=False),
+    sa.Column('lot', sa.Integer(), nullable=False),
+    sa.Column('racine', sa.String(length=64), nullable=False),
+    sa.Column('signature', sa.String(length=64), nullable=False),
+    sa.Column('nb_feuilles', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('jour', 'lot', name='unique_jour_lot')
+    )
+    op.create_index(op.f('ix_documents_ancrages_id'), 'documents_ancrages', ['id'], unique=False)
+    op.create_index(op.f('ix_documents_ancrages_jour'), 'documents_ancrages', ['jour'], unique=False)
+    op.add_column('documents', sa.Column('ancrage_id', sa.Integer(), nullable=True))
+    op.add_column('documents', sa.Column('merkle_index', sa.Integer(), nullable=True))
+    op.add_column('documents', sa.Column('merkle_preuve', sa.Text(), nullable=True))
+    op.create_foreign_key('documents_ancrage_id_fk', 'documents', 'documents_ancrages', ['ancrage_id'], ['id'], ondelete='SET NULL')
+    op.create_index(op.f('ix_documents_ancrage_id'), 'documents', ['ancrage_id'], unique=False)
+    op.create_index(op.f('ix_documents_created_at'), 'documents', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_documents_created_at'), table_name='documents')
+    op.drop_index(op.f('ix_documents_ancrage_id'), table_name='documents')
+    op.drop_constraint('documents_ancrage_id_fk', 'documents', type_='foreignkey')
+    op.drop_column('documents', 'merkle_preuve')
+    op.drop_column('documents', 'merkle_index')
+    op.drop_column('documents', 'ancrage_id')
+    op.drop_index(op.f('ix_documents_ancrages_jour'), table_name='documents_ancrages')
+    op.drop_index(op.f('ix_documents_ancrages_id'), table_name='documents_ancrages')
+    op.drop_table('documents_ancrages')
@@ -0,0 +1,45 @@
+"""Boîte d'envoi des emails
+
+Revision ID: 5b2f7e9a1c04
+Revises: 8d41f0c6e2a9
+Create Date: 2026-10-19 14:10:37.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2f7e9a1c04'
+down_revision: Union[str, None] = '8d41f0c6e2a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('emails_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('destinataire', sa.String(length=255), nullable=False),
+    sa.Column('sujet', sa.String(length=255), nullable=False),
+    sa.Column('corps', sa.Text(), nullable=True),
+    sa.Column('html', sa.Boolean(), nullable=False),
+    sa.Column('statut', sa.Enum('EN_ATTENTE', 'EN_COURS', 'ENVOYE', 'ECHEC', name='emailstatusenum'), nullable=False),
+    sa.Column('tentatives', sa.Integer(), nullable=False),
+    sa.Column('prochaine_tentative', sa.DateTime(), nullable=False),
+    sa.Column('derniere_erreur', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_emails_outbox_id'), 'emails_outbox', ['id'], unique=False)
+    op.create_index('ix_emails_outbox_statut_prochaine_tentative', 'emails_outbox', ['statut', 'prochaine_tentative'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_emails_outbox_statut_prochaine_tentative', table_name='emails_outbox')
+    op.drop_index(op.f('ix_emails_outbox_id'), table_name='emails_outbox')
+    op.drop_table('emails_outbox')
@@ -0,0 +1,32 @@
+"""Archivage des documents
+
+Revision ID: 8d41f0c6e2a9
+Revises: 3c5e1a9f2b7d
+Create Date: 2026-10-19 13:05:12.482950
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41f0c6e2a9'
+down_revision: Union[str, None] = '3c5e1a9f2b7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('compression', sa.String(length=20), nullable=True))
+    op.add_column('documents', sa.Column('stored_size', sa.Integer(), nullable=True))
+    op.add_column('documents', sa.Column('archived_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents', 'archived_at')
+    op.drop_column('documents', 'stored_size')
+    op.drop_column('documents', 'compression')
@@ -0,0 +1,28 @@
+"""Alternative texte des emails
+
+Revision ID: a7c3d1e5f802
+Revises: 5b2f7e9a1c04
+Create Date: 2026-10-19 15:02:44.906113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3d1e5f802'
+down_revision: Union[str, None] = '5b2f7e9a1c04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('emails_outbox', sa.Column('corps_texte', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('emails_outbox', 'corps_texte')
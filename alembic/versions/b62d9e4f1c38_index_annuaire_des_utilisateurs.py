@@ -0,0 +1,34 @@
+"""Index de l'annuaire des utilisateurs
+
+Revision ID: b62d9e4f1c38
+Revises: f3a8c6e1d497
+Create Date: 2026-10-19 20:37:11.208465
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b62d9e4f1c38'
+down_revision: Union[str, None] = 'f3a8c6e1d497'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_utilisateurs_nom_id', 'utilisateurs', ['nom', 'id'], unique=False)
+    op.create_index('ix_utilisateurs_organisation_nom_id', 'utilisateurs', ['organisation_id', 'nom', 'id'], unique=False)
+    op.create_index('ix_utilisateurs_centre_nom_id', 'utilisateurs', ['centre_id', 'nom', 'id'], unique=False)
+    op.create_index('ix_utilisateurs_role_nom_id', 'utilisateurs', ['role_id', 'nom', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_utilisateurs_role_nom_id', table_name='utilisateurs')
+    op.drop_index('ix_utilisateurs_centre_nom_id', table_name='utilisateurs')
+    op.drop_index('ix_utilisateurs_organisation_nom_id', table_name='utilisateurs')
+    op.drop_index('ix_utilisateurs_nom_id', table_name='utilisateurs')
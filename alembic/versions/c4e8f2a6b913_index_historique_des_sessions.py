@@ -0,0 +1,28 @@
+"""Index de l'historique des sessions clients
+
+Revision ID: c4e8f2a6b913
+Revises: a7c3d1e5f802
+Create Date: 2026-10-19 16:21:09.532870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8f2a6b913'
+down_revision: Union[str, None] = 'a7c3d1e5f802'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_clients_sessions_client_actif_expiration', 'clients_sessions', ['client_id', 'is_active', 'expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_clients_sessions_client_actif_expiration', table_name='clients_sessions')
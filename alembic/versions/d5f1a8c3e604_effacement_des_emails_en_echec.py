@@ -0,0 +1,29 @@
+"""Effacement des corps des emails en échec
+
+Revision ID: d5f1a8c3e604
+Revises: b62d9e4f1c38
+Create Date: 2026-10-19 18:41:07.215930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f1a8c3e604'
+down_revision: Union[str, None] = 'b62d9e4f1c38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Les emails abandonnés gardaient leur corps (mots de passe, codes OTP) : effacé comme pour les emails envoyés
+    op.execute("UPDATE emails_outbox SET corps = NULL, corps_texte = NULL WHERE statut = 'ECHEC'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Les corps effacés ne peuvent pas être restaurés
+    pass
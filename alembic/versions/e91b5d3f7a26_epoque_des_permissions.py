@@ -0,0 +1,30 @@
+"""Époque des permissions des utilisateurs et des rôles
+
+Revision ID: e91b5d3f7a26
+Revises: c4e8f2a6b913
+Create Date: 2026-10-19 18:02:41.117305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91b5d3f7a26'
+down_revision: Union[str, None] = 'c4e8f2a6b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('utilisateurs', sa.Column('permissions_epoch', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('roles', sa.Column('permissions_epoch', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('roles', 'permissions_epoch')
+    op.drop_column('utilisateurs', 'permissions_epoch')
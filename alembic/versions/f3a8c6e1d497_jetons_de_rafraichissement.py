@@ -0,0 +1,48 @@
+"""Jetons de rafraîchissement des utilisateurs
+
+Revision ID: f3a8c6e1d497
+Revises: e91b5d3f7a26
+Create Date: 2026-10-19 19:14:52.640183
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8c6e1d497'
+down_revision: Union[str, None] = 'e91b5d3f7a26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('utilisateurs_refresh_tokens',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('utilisateur_id', sa.Integer(), nullable=False),
+    sa.Column('famille', sa.String(length=32), nullable=False),
+    sa.Column('token_hash', sa.String(length=64), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('utilise_le', sa.DateTime(), nullable=True),
+    sa.Column('revoque_le', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['utilisateur_id'], ['utilisateurs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('token_hash')
+    )
+    op.create_index(op.f('ix_utilisateurs_refresh_tokens_id'), 'utilisateurs_refresh_tokens', ['id'], unique=False)
+    op.create_index(op.f('ix_utilisateurs_refresh_tokens_utilisateur_id'), 'utilisateurs_refresh_tokens', ['utilisateur_id'], unique=False)
+    op.create_index(op.f('ix_utilisateurs_refresh_tokens_famille'), 'utilisateurs_refresh_tokens', ['famille'], unique=False)
+    op.create_index(op.f('ix_utilisateurs_refresh_tokens_expires_at'), 'utilisateurs_refresh_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_utilisateurs_refresh_tokens_expires_at'), table_name='utilisateurs_refresh_tokens')
+    op.drop_index(op.f('ix_utilisateurs_refresh_tokens_famille'), table_name='utilisateurs_refresh_tokens')
+    op.drop_index(op.f('ix_utilisateurs_refresh_tokens_utilisateur_id'), table_name='utilisateurs_refresh_tokens')
+    op.drop_index(op.f('ix_utilisateurs_refresh_tokens_id'), table_name='utilisateurs_refresh_tokens')
+    op.drop_table('utilisateurs_refresh_tokens')
@@ -0,0 +1,7 @@
+from enum import Enum as PyEnum
+
+class EmailStatusEnum(PyEnum):
+    EN_ATTENTE = "En attente"
+    EN_COURS = "En cours d'envoi"
+    ENVOYE = "Envoyé"
+    ECHEC = "Échec"
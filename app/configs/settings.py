@@ -12,8 +12,107 @@ class Settings:
     GMAIL_PASSWORD: str = os.getenv("GMAIL_PASSWORD")
     GMAIL_USERNAME: str = os.getenv("GMAIL_USERNAME")
     DOCUMENTS_STORAGE_PATH: str = os.getenv("DOCUMENTS_STORAGE_PATH")
-    ACCESS_TOKEN_EXPIRE_MINUTES: str = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")
+    # Stockage des documents : "local" (DOCUMENTS_STORAGE_PATH) ou "s3" (compatible MinIO)
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "local")
+    STORAGE_CHUNK_SIZE: int = int(os.getenv("STORAGE_CHUNK_SIZE", str(1024 * 1024)))
+    S3_ENDPOINT_URL: str = os.getenv("S3_ENDPOINT_URL")
+    S3_BUCKET: str = os.getenv("S3_BUCKET")
+    S3_ACCESS_KEY: str = os.getenv("S3_ACCESS_KEY")
+    S3_SECRET_KEY: str = os.getenv("S3_SECRET_KEY")
+    S3_REGION: str = os.getenv("S3_REGION")
+    S3_MAX_POOL_CONNECTIONS: int = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "10"))
+    S3_MULTIPART_THRESHOLD: int = int(os.getenv("S3_MULTIPART_THRESHOLD", str(8 * 1024 * 1024)))
+    # Niveau froid : documents compressés des demandes clôturées
+    COLD_STORAGE_BACKEND: str = os.getenv("COLD_STORAGE_BACKEND", "cold")
+    DOCUMENTS_COLD_STORAGE_PATH: str = os.getenv("DOCUMENTS_COLD_STORAGE_PATH", "uploads_archives")
+    S3_COLD_BUCKET: str = os.getenv("S3_COLD_BUCKET")
+    S3_COLD_STORAGE_CLASS: str = os.getenv("S3_COLD_STORAGE_CLASS", "STANDARD_IA")
+    DOCUMENTS_ARCHIVAGE_JOURS: int = int(os.getenv("DOCUMENTS_ARCHIVAGE_JOURS", "30"))
+    DOCUMENTS_ZSTD_NIVEAU: int = int(os.getenv("DOCUMENTS_ZSTD_NIVEAU", "10"))
+    # Durée de vie courte des tokens d'accès, renouvelés via /auth/refresh (jeton de rafraîchissement rotatif)
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
     ALGORITHM: str = os.getenv("ALGORITHM")
+    # Redis partagé (OTP, limitation de débit, bus d'événements)
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    REDIS_SOCKET_TIMEOUT: float = float(os.getenv("REDIS_SOCKET_TIMEOUT", "5"))
+    # OTP : stockage "database" (table clients_otps), "memory" (un seul processus) ou "redis"
+    OTP_STORE_BACKEND: str = os.getenv("OTP_STORE_BACKEND", "database")
+    OTP_TTL_MINUTES: int = int(os.getenv("OTP_TTL_MINUTES", "70"))
+    # Purge des sessions et OTP expirés
+    PURGE_BATCH_SIZE: int = int(os.getenv("PURGE_BATCH_SIZE", "1000"))
+    PURGE_PAUSE_SECONDS: float = float(os.getenv("PURGE_PAUSE_SECONDS", "0.2"))
+    PURGE_SESSIONS_RETENTION_JOURS: int = int(os.getenv("PURGE_SESSIONS_RETENTION_JOURS", "7"))
+    PURGE_OTPS_RETENTION_MINUTES: int = int(os.getenv("PURGE_OTPS_RETENTION_MINUTES", "0"))
+    # Révocation des jetons utilisateurs (déconnexion) : "memory" (par processus) ou "redis" (partagé)
+    TOKEN_REVOCATION_BACKEND: str = os.getenv("TOKEN_REVOCATION_BACKEND", "memory")
+    # Hachage des mots de passe : schémas passlib, le premier pour les nouveaux hachages
+    # (ex. "argon2,bcrypt" pour migrer vers argon2 au fil des connexions ; nécessite argon2-cffi)
+    PASSWORD_SCHEMES: str = os.getenv("PASSWORD_SCHEMES", "bcrypt")
+    PASSWORD_BCRYPT_ROUNDS: int = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))
+    # Pool dédié au hachage : "thread" ou "process" ; au-delà de la file, la connexion répond 503
+    PASSWORD_HASH_EXECUTOR: str = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+    PASSWORD_HASH_QUEUE_SIZE: int = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "64"))
+    # Cache des permissions effectives des utilisateurs (masques de bits), invalidé par le bus d'événements
+    PERMISSIONS_CACHE_SIZE: int = int(os.getenv("PERMISSIONS_CACHE_SIZE", "10000"))
+    PERMISSIONS_CACHE_TTL: float = float(os.getenv("PERMISSIONS_CACHE_TTL", "300"))
+    # Refuse les tokens dont l'époque des droits (claim epo) est dépassée ; false : droits du token seuls
+    PERMISSIONS_EPOCH_CHECK: bool = os.getenv("PERMISSIONS_EPOCH_CHECK", "true").lower() == "true"
+    # Correspondance identifiant naturel -> id des centres, organisations et rôles (invalidée à chaque écriture)
+    IDENTIFIANTS_CACHE_TTL: float = float(os.getenv("IDENTIFIANTS_CACHE_TTL", "600"))
+    # Données de référence (motifs, rôles, permissions, organisations, centres) : durée en cache côté
+    # serveur et max-age envoyé aux clients (revalidation ensuite par ETag)
+    REFERENCES_CACHE_TTL: float = float(os.getenv("REFERENCES_CACHE_TTL", "3600"))
+    REFERENCES_CACHE_MAX_AGE: int = int(os.getenv("REFERENCES_CACHE_MAX_AGE", "60"))
+    # Lève une erreur sur tout chargement paresseux imprévu des relations d'un utilisateur (tests, développement)
+    SQLALCHEMY_RAISELOAD: bool = os.getenv("SQLALCHEMY_RAISELOAD", "false").lower() == "true"
+    # Import en masse des utilisateurs (lignes par INSERT, lignes maximum par fichier envoyé à l'API)
+    UTILISATEURS_IMPORT_BATCH_SIZE: int = int(os.getenv("UTILISATEURS_IMPORT_BATCH_SIZE", "500"))
+    UTILISATEURS_IMPORT_MAX_LIGNES: int = int(os.getenv("UTILISATEURS_IMPORT_MAX_LIGNES", "20000"))
+    # Annuaire des utilisateurs (/utilisateurs/recherche) : taille de page par défaut et maximale
+    UTILISATEURS_PAGE_TAILLE: int = int(os.getenv("UTILISATEURS_PAGE_TAILLE", "50"))
+    UTILISATEURS_PAGE_TAILLE_MAX: int = int(os.getenv("UTILISATEURS_PAGE_TAILLE_MAX", "200"))
+    # Bus d'événements entre processus : "local" (un seul processus) ou "redis" (pub/sub)
+    EVENT_BUS_BACKEND: str = os.getenv("EVENT_BUS_BACKEND", "local")
+    # Filtre des sessions clients révoquées (filtre de Bloom + ensemble exact)
+    SESSION_REVOCATION_CAPACITY: int = int(os.getenv("SESSION_REVOCATION_CAPACITY", "100000"))
+    SESSION_REVOCATION_ERROR_RATE: float = float(os.getenv("SESSION_REVOCATION_ERROR_RATE", "0.001"))
+    # Limitation de débit (seau à jetons) : "memory" (par processus) ou "redis" (partagé)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_TRUST_PROXY: bool = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() == "true"
+    # Règles "n/secondes" : émission d'OTP (création de client/session, renvoi) et vérification
+    RATE_LIMIT_OTP_IP: str = os.getenv("RATE_LIMIT_OTP_IP", "30/300")
+    RATE_LIMIT_OTP_CLIENT: str = os.getenv("RATE_LIMIT_OTP_CLIENT", "5/300")
+    RATE_LIMIT_OTP_SESSION: str = os.getenv("RATE_LIMIT_OTP_SESSION", "3/300")
+    RATE_LIMIT_VERIFY_IP: str = os.getenv("RATE_LIMIT_VERIFY_IP", "60/300")
+    RATE_LIMIT_VERIFY_SESSION: str = os.getenv("RATE_LIMIT_VERIFY_SESSION", "5/300")
+    # Serveur SMTP (SMTP_USE_SSL=false uniquement pour un serveur local de test)
+    SMTP_SERVER: str = os.getenv("SMTP_SERVER", "smtp.gmail.com")
+    SMTP_PORT: int = int(os.getenv("SMTP_PORT", "465"))
+    SMTP_USE_SSL: bool = os.getenv("SMTP_USE_SSL", "true").lower() == "true"
+    # Langue par défaut des templates d'email (app/templates/emails/<langue>/)
+    EMAIL_LOCALE_DEFAUT: str = os.getenv("EMAIL_LOCALE_DEFAUT", "fr")
+    # SMS : "log" (journalisation seule, développement) ou "http" (API du fournisseur / serveur local)
+    SMS_PROVIDER: str = os.getenv("SMS_PROVIDER", "log")
+    SMS_API_URL: str = os.getenv("SMS_API_URL")
+    SMS_API_KEY: str = os.getenv("SMS_API_KEY")
+    SMS_SENDER: str = os.getenv("SMS_SENDER", "ANGARA")
+    SMS_MAX_BATCH: int = int(os.getenv("SMS_MAX_BATCH", "100"))
+    SMS_MAX_CONNECTIONS: int = int(os.getenv("SMS_MAX_CONNECTIONS", "10"))
+    SMS_BATCH_WINDOW_MS: int = int(os.getenv("SMS_BATCH_WINDOW_MS", "50"))
+    SMS_TIMEOUT: float = float(os.getenv("SMS_TIMEOUT", "10"))
+    # Développement : le fournisseur "log" déclare les SMS envoyés (sinon ils sont en échec)
+    SMS_LOG_SIMULER_ENVOI: bool = os.getenv("SMS_LOG_SIMULER_ENVOI", "false").lower() == "true"
+    # Boîte d'envoi des emails (worker d'arrière-plan)
+    EMAIL_OUTBOX_WORKER_ENABLED: bool = os.getenv("EMAIL_OUTBOX_WORKER_ENABLED", "true").lower() == "true"
+    EMAIL_OUTBOX_CONCURRENCY: int = int(os.getenv("EMAIL_OUTBOX_CONCURRENCY", "4"))
+    EMAIL_OUTBOX_BATCH_SIZE: int = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "50"))
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "6"))
+    EMAIL_OUTBOX_BACKOFF_SECONDS: int = int(os.getenv("EMAIL_OUTBOX_BACKOFF_SECONDS", "30"))
+    EMAIL_OUTBOX_POLL_INTERVAL: float = float(os.getenv("EMAIL_OUTBOX_POLL_INTERVAL", "2"))
 
     def check_config(self):
         print("✅ Configuration chargée :")
@@ -1,8 +1,14 @@
 # app/api/dependencies.py
-from fastapi import HTTPException, Security
+from fastapi import Depends, HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
-from app.configs import settings
+from sqlalchemy.orm import Session
+from app.configs.database import get_db
+from app.configs.enumerations.Persmissions import PermissionEnum
+from app.configs.settings import settings
+from app.configs.utils.permissions import masque, masque_du_jeton, permission_engine
+from app.configs.utils.session_revocation import session_revocations
+from app.configs.utils.token_revocation import get_token_revocation_store
 
 security = HTTPBearer()
 
@@ -14,6 +20,59 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Security(security))
     """
     try:
         payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=["HS256"])
-        return payload
     except Exception as e:
         raise HTTPException(status_code=401, detail="Token invalide ou expiré")
+    # Token révoqué à la déconnexion (vérification O(1) par son identifiant jti)
+    if payload.get("jti") and get_token_revocation_store().is_revoked(payload["jti"]):
+        raise HTTPException(status_code=401, detail="Token révoqué")
+    return payload
+
+
+def require_permission(*permissions: PermissionEnum):
+    """
+    Dépendance FastAPI exigeant que l'utilisateur du token possède toutes les permissions indiquées.
+    Le masque requis est compilé une fois. Si le token porte ses droits (claims perm/epo), ils sont utilisés
+    directement, après comparaison de son époque avec celle en cache (PERMISSIONS_EPOCH_CHECK) : un token
+    émis avant un changement de droits est refusé (401) et doit être renouvelé. Sinon, la vérification
+    se fait sur le masque en cache de l'utilisateur.
+    Retourne la charge utile du token, sinon lève une HTTPException 401 ou 403.
+
+    Exemple : dependencies=[Depends(require_permission(PermissionEnum.CREER_UTILISATEUR))]
+    """
+    requis = masque(permissions)
+
+    def verifier(payload: dict = Depends(verify_token), db: Session = Depends(get_db)) -> dict:
+        try:
+            utilisateur_id = int(payload.get("sub"))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=401, detail="Token invalide")
+        masque_jeton = masque_du_jeton(payload)
+        if masque_jeton is None:
+            masque_effectif = permission_engine.effective_mask(db, utilisateur_id)
+        else:
+            if settings.PERMISSIONS_EPOCH_CHECK and payload.get("epo") != permission_engine.etat(db, utilisateur_id).epoque:
+                raise HTTPException(status_code=401, detail="Droits modifiés depuis l'émission du token, veuillez le renouveler")
+            masque_effectif = masque_jeton
+        if masque_effectif & requis != requis:
+            raise HTTPException(status_code=403, detail="Permission insuffisante")
+        return payload
+
+    return verifier
+
+
+def verify_client_session(credentials: HTTPAuthorizationCredentials = Security(security)) -> dict:
+    """
+    Vérifie le jeton de session d'un client sans lecture en base : signature et expiration du JWT,
+    puis présence de la session (claim sid) dans le filtre de révocation en mémoire.
+    Retourne la charge utile du jeton, sinon lève une HTTPException 401.
+    """
+    try:
+        payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=["HS256"])
+    except jwt.PyJWTError:
+        raise HTTPException(status_code=401, detail="Token invalide ou expiré")
+    if payload.get("sid") is None:
+        raise HTTPException(status_code=401, detail="Token de session invalide")
+    # Jetons antérieurs au claim emi : iat (entier), refusés aussi dans la seconde de la révocation
+    if session_revocations.is_revoked(payload["sid"], payload.get("emi", payload.get("iat", 0))):
+        raise HTTPException(status_code=401, detail="Session révoquée")
+    return payload
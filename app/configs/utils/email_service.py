@@ -1,9 +1,17 @@
 import smtplib
 import ssl
 import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from queue import Empty, LifoQueue
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
 from app.configs.settings import settings
+from app.configs.utils.email_templates import email_templates
+from app.models.notifications.email_outbox import EmailOutbox
 
 # Configuration du logger
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -12,8 +20,9 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 class EmailService:
     """Service professionnel d'envoi d'email via SMTP avec gestion avancée des erreurs et support HTML."""
 
-    SMTP_SERVER = "smtp.gmail.com"
-    PORT = 465  # Port SSL
+    SMTP_SERVER = settings.SMTP_SERVER
+    PORT = settings.SMTP_PORT  # 465 : SSL
+    USE_SSL = settings.SMTP_USE_SSL
     SENDER_EMAIL = settings.GMAIL_EMAIL
     PASSWORD = settings.GMAIL_PASSWORD
     COMPANY_NAME = settings.GMAIL_USERNAME
@@ -35,17 +44,11 @@ class EmailService:
             return False
 
         # Création du message email
-        message = MIMEMultipart()
-        message["From"] = f"{cls.COMPANY_NAME} <{cls.SENDER_EMAIL}>"
-        message["To"] = receiver_email
-        message["Subject"] = subject
-        message.attach(MIMEText(body, "html" if html else "plain"))
+        message = cls.build_message(receiver_email, subject, body, html)
 
         try:
             # Connexion sécurisée au serveur SMTP
-            context = ssl.create_default_context()
-            with smtplib.SMTP_SSL(cls.SMTP_SERVER, cls.PORT, context=context) as server:
-                server.login(cls.SENDER_EMAIL, cls.PASSWORD)
+            with cls.connect() as server:
                 server.sendmail(cls.SENDER_EMAIL, receiver_email, message.as_string())
 
             logging.info(f"✅ Email envoyé avec succès à {receiver_email} - Sujet: {subject}")
@@ -62,13 +65,78 @@ class EmailService:
 
         return False
 
+    @classmethod
+    def build_message(cls, receiver_email: str, subject: str, body: str, html: bool = False,
+                      text: Optional[str] = None) -> MIMEMultipart:
+        """
+        Construit le message MIME d'un email.
+        Si `text` est fourni avec un corps HTML, le message est multipart/alternative (texte puis HTML).
+        """
+        message = MIMEMultipart("alternative") if html and text else MIMEMultipart()
+        message["From"] = f"{cls.COMPANY_NAME} <{cls.SENDER_EMAIL}>"
+        message["To"] = receiver_email
+        message["Subject"] = subject
+        if html and text:
+            message.attach(MIMEText(text, "plain", "utf-8"))
+        message.attach(MIMEText(body, "html" if html else "plain", "utf-8"))
+        return message
+
+    @classmethod
+    def connect(cls) -> smtplib.SMTP:
+        """
+        Ouvre et authentifie une connexion SMTP (poignée de main TLS + login).
+        SMTP_USE_SSL=false n'est prévu que pour un serveur local (tests, benchmarks).
+        """
+        if cls.USE_SSL:
+            server = smtplib.SMTP_SSL(cls.SMTP_SERVER, cls.PORT, context=ssl.create_default_context(), timeout=30)
+        else:
+            server = smtplib.SMTP(cls.SMTP_SERVER, cls.PORT, timeout=30)
+        try:
+            server.login(cls.SENDER_EMAIL, cls.PASSWORD)
+        except BaseException:
+            server.close()
+            raise
+        return server
+
+    @staticmethod
+    def queue_email(db: Session, receiver_email: str, subject: str, body: str, html: bool = False,
+                    text: Optional[str] = None) -> EmailOutbox:
+        """
+        Met un email en file d'attente dans la boîte d'envoi.
+        L'email est enregistré dans la transaction de l'appelant : il ne part qu'après son commit.
+        """
+        email = EmailOutbox(destinataire=receiver_email, sujet=subject, corps=body, html=html, corps_texte=text)
+        db.add(email)
+        return email
+
+    @classmethod
+    def queue_template_email(cls, db: Session, receiver_email: str, template: str, context: Dict[str, Any],
+                             locale: Optional[str] = None, organisation: Optional[Any] = None) -> EmailOutbox:
+        """Rend un template d'email (HTML + texte) et le met en file dans la boîte d'envoi."""
+        rendu = email_templates.render(template, context, locale, organisation)
+        return cls.queue_email(db, receiver_email, rendu.sujet, rendu.html, html=True, text=rendu.texte)
+
+    @classmethod
+    def queue_template_emails(cls, db: Session, envois: List[Tuple[str, Dict[str, Any]]], template: str,
+                              locale: Optional[str] = None, organisation: Optional[Any] = None) -> int:
+        """
+        Met en file un lot d'emails d'un même template, (destinataire, contexte) par email :
+        templates compilés une fois et une seule requête INSERT pour tout le lot.
+        """
+        if not envois:
+            return 0
+        rendus = email_templates.render_many(template, [contexte for _, contexte in envois], locale, organisation)
+        db.execute(insert(EmailOutbox), [
+            {"destinataire": destinataire, "sujet": rendu.sujet, "corps": rendu.html, "html": True, "corps_texte": rendu.texte}
+            for (destinataire, _), rendu in zip(envois, rendus)
+        ])
+        return len(envois)
+
     @classmethod
     def test_smtp_connection(cls) -> bool:
         """Test la connexion au serveur SMTP."""
         try:
-            context = ssl.create_default_context()
-            with smtplib.SMTP_SSL(cls.SMTP_SERVER, cls.PORT, context=context) as server:
-                server.login(cls.SENDER_EMAIL, cls.PASSWORD)
+            with cls.connect():
                 logging.info("✅ Connexion SMTP réussie.")
                 return True
         except smtplib.SMTPAuthenticationError:
@@ -79,3 +147,85 @@ class EmailService:
             logging.error(f"❌ Erreur SMTP inconnue : {e}")
 
         return False
+
+
+class SMTPConnectionPool:
+    """
+    Pool de connexions SMTP déjà authentifiées, partagé entre les threads d'envoi.
+    Évite une poignée de main TLS et un login par email ; une connexion inactive trop longtemps
+    est vérifiée (NOOP) avant réutilisation, une connexion en erreur est jetée.
+    """
+
+    def __init__(self, max_size: int = 4, max_idle: float = 60.0):
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self._idle = LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._available = threading.Semaphore(max_size)
+
+    def acquire(self) -> smtplib.SMTP:
+        self._available.acquire()
+        try:
+            while True:
+                try:
+                    server, last_used = self._idle.get_nowait()
+                except Empty:
+                    break
+                if time.monotonic() - last_used < self.max_idle or self._is_alive(server):
+                    return server
+                self._close(server)
+            server = EmailService.connect()
+            with self._lock:
+                self._created += 1
+            return server
+        except BaseException:
+            self._available.release()
+            raise
+
+    def release(self, server: smtplib.SMTP, broken: bool = False) -> None:
+        if broken:
+            self._close(server)
+        else:
+            self._idle.put((server, time.monotonic()))
+        self._available.release()
+
+    def send(self, receiver_email: str, subject: str, body: str, html: bool = False, text: Optional[str] = None) -> None:
+        """Envoie un email via une connexion du pool ; lève l'exception SMTP en cas d'échec."""
+        message = EmailService.build_message(receiver_email, subject, body, html, text)
+        server = self.acquire()
+        try:
+            server.sendmail(EmailService.SENDER_EMAIL, receiver_email, message.as_string())
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException, OSError):
+            self.release(server, broken=True)
+            raise
+        except BaseException:
+            self.release(server)
+            raise
+        self.release(server)
+
+    @property
+    def connections_created(self) -> int:
+        return self._created
+
+    def close(self) -> None:
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except Empty:
+                return
+            self._close(server)
+
+    @staticmethod
+    def _is_alive(server: smtplib.SMTP) -> bool:
+        try:
+            return server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @staticmethod
+    def _close(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
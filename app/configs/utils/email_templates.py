@@ -0,0 +1,163 @@
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template, select_autoescape
+from markupsafe import Markup
+
+from app.configs.settings import settings
+from app.configs.utils.event_bus import get_event_bus
+
+logger = logging.getLogger(__name__)
+
+CANAL_TEMPLATES = "email_templates.invalides"
+
+# Dossier racine des templates : un sous-dossier par langue (fr/, en/, ...)
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "templates", "emails")
+
+
+@dataclass(frozen=True)
+class EmailRendu:
+    """Email prêt à être envoyé : sujet, version HTML et alternative texte."""
+    sujet: str
+    html: str
+    texte: str
+
+
+class EmailTemplateEngine:
+    """
+    Moteur de templates des emails (Jinja2).
+
+    Les templates sont compilés une seule fois (précompilation au démarrage) et gardés en mémoire ;
+    les parties statiques (en-tête et pied de page) sont rendues une seule fois par couple
+    (langue, organisation). Un email `<nom>` se compose de `<nom>.sujet.txt`, `<nom>.html` et `<nom>.txt`.
+    Les SMS utilisent le même mécanisme avec un unique template `<nom>.sms.txt`.
+    Une langue sans traduction d'un template retombe sur la langue par défaut.
+    Les parties statiques d'une organisation modifiée sont invalidées via le bus d'événements.
+    """
+
+    def __init__(self, dossier: str = TEMPLATES_DIR, locale_defaut: Optional[str] = None):
+        self.dossier = dossier
+        self.locale_defaut = locale_defaut or settings.EMAIL_LOCALE_DEFAUT
+        self._environnements: Dict[Tuple[str, bool], Environment] = {}
+        self._templates: Dict[Tuple[str, str], Template] = {}
+        self._statiques: Dict[Tuple[str, Optional[int]], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        # Incrémentée à chaque invalidation : des parties rendues pendant une invalidation ne sont pas gardées
+        self._generation = 0
+        self._bus = None
+
+    def _abonner(self) -> None:
+        bus = get_event_bus()
+        if self._bus is not bus:
+            with self._lock:
+                if self._bus is not bus:
+                    bus.subscribe(CANAL_TEMPLATES, self._recevoir)
+                    self._bus = bus
+
+    def _environnement(self, locale: str, html: bool) -> Environment:
+        env = self._environnements.get((locale, html))
+        if env is None:
+            chemins = [os.path.join(self.dossier, locale)]
+            if locale != self.locale_defaut:
+                chemins.append(os.path.join(self.dossier, self.locale_defaut))
+            env = Environment(
+                loader=FileSystemLoader(chemins),
+                autoescape=select_autoescape(["html"]) if html else False,
+                undefined=StrictUndefined,
+                auto_reload=False,  # les templates ne changent pas en production : pas de stat() par rendu
+                cache_size=-1,
+                keep_trailing_newline=False,
+            )
+            self._environnements[(locale, html)] = env
+        return env
+
+    def _template(self, locale: str, fichier: str) -> Template:
+        cle = (locale, fichier)
+        template = self._templates.get(cle)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(cle)
+                if template is None:
+                    template = self._environnement(locale, fichier.endswith(".html")).get_template(fichier)
+                    self._templates[cle] = template
+        return template
+
+    def locales(self) -> List[str]:
+        return sorted(d for d in os.listdir(self.dossier) if os.path.isdir(os.path.join(self.dossier, d)))
+
+    def precompiler(self) -> int:
+        """Compile tous les templates disponibles ; retourne le nombre de templates chargés."""
+        fichiers = {f for locale in self.locales() for f in os.listdir(os.path.join(self.dossier, locale))}
+        for locale in self.locales():
+            for fichier in fichiers:
+                self._template(locale, fichier)
+        logger.info(f"✅ {len(self._templates)} templates d'email compilés")
+        return len(self._templates)
+
+    def _parties_statiques(self, locale: str, organisation: Optional[Any]) -> Dict[str, Any]:
+        """En-tête, pied de page et variables communes, rendus une fois par (langue, organisation)."""
+        if self._bus is None:
+            self._abonner()
+        cle = (locale, getattr(organisation, "id", None))
+        generation = self._generation
+        statiques = self._statiques.get(cle)
+        if statiques is None:
+            nom = getattr(organisation, "nom", None)
+            contexte = {
+                "application": settings.GMAIL_USERNAME or "ANGARA",
+                "organisation": getattr(nom, "value", nom),
+                "locale": locale,
+            }
+            statiques = dict(contexte)
+            statiques["entete"] = Markup(self._template(locale, "_entete.html").render(contexte))
+            statiques["pied_html"] = Markup(self._template(locale, "_pied.html").render(contexte))
+            statiques["pied_texte"] = self._template(locale, "_pied.txt").render(contexte)
+            with self._lock:
+                if self._generation == generation:
+                    self._statiques[cle] = statiques
+        return statiques
+
+    def render(self, nom: str, contexte: Dict[str, Any], locale: Optional[str] = None,
+               organisation: Optional[Any] = None) -> EmailRendu:
+        """
+        Rend l'email `nom` dans la langue demandée.
+        :param organisation: objet exposant `id` et `nom` (ex. Organisation), ou None.
+        """
+        locale = locale or self.locale_defaut
+        statiques = self._parties_statiques(locale, organisation)
+        commun = {"application": statiques["application"], "organisation": statiques["organisation"],
+                  "locale": locale, "entete": statiques["entete"]}
+        sujet = self._template(locale, f"{nom}.sujet.txt").render(commun, **contexte).strip()
+        html = self._template(locale, f"{nom}.html").render(commun, pied=statiques["pied_html"], **contexte)
+        texte = self._template(locale, f"{nom}.txt").render(commun, pied=statiques["pied_texte"], **contexte)
+        return EmailRendu(sujet=sujet, html=html, texte=texte)
+
+    def render_sms(self, nom: str, contexte: Dict[str, Any], locale: Optional[str] = None) -> str:
+        """Rend le texte d'un SMS (`<nom>.sms.txt`)."""
+        locale = locale or self.locale_defaut
+        commun = {"application": settings.GMAIL_USERNAME or "ANGARA", "locale": locale}
+        return self._template(locale, f"{nom}.sms.txt").render(commun, **contexte).strip()
+
+    def render_many(self, nom: str, contextes: Iterable[Dict[str, Any]], locale: Optional[str] = None,
+                    organisation: Optional[Any] = None) -> List[EmailRendu]:
+        """Rend un lot d'emails avec les mêmes templates compilés (envois en masse)."""
+        return [self.render(nom, contexte, locale, organisation) for contexte in contextes]
+
+    def _recevoir(self, message: Dict) -> None:
+        organisation_id = message.get("organisation_id")
+        with self._lock:
+            self._generation += 1
+            for cle in [c for c in self._statiques if organisation_id is None or c[1] == organisation_id]:
+                del self._statiques[cle]
+
+    def invalider(self, organisation_id: Optional[int] = None) -> None:
+        """Oublie les parties statiques (toutes, ou celles d'une organisation modifiée) dans ce processus et les autres."""
+        self._abonner()
+        get_event_bus().publish(CANAL_TEMPLATES, {"organisation_id": organisation_id})
+
+
+# Instance partagée par l'application (précompilée au démarrage)
+email_templates = EmailTemplateEngine()
@@ -0,0 +1,128 @@
+import json
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from app.configs.settings import settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], None]
+
+
+class EventBus:
+    """
+    Bus d'événements entre les processus de l'API (invalidation de caches, révocations...).
+    Les abonnés sont des fonctions appelées avec le message (dict) publié sur leur canal.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        with self._lock:
+            self._handlers[channel].append(handler)
+
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def _dispatch(self, channel: str, message: Dict[str, Any]) -> None:
+        for handler in list(self._handlers.get(channel, [])):
+            try:
+                handler(message)
+            except Exception as e:
+                logger.error(f"❌ Erreur d'un abonné au canal {channel} : {e}")
+
+    def close(self) -> None:
+        pass
+
+
+class LocalEventBus(EventBus):
+    """Bus en mémoire : les messages ne sortent pas du processus (un seul worker)."""
+
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        self._dispatch(channel, message)
+
+
+class RedisEventBus(EventBus):
+    """
+    Bus partagé via Redis pub/sub : un thread par processus écoute les canaux abonnés.
+    Le message est aussi remis immédiatement aux abonnés locaux ; le même message reçu ensuite
+    de Redis est ignoré grâce à l'identifiant d'origine.
+    """
+
+    PREFIX = "angara:"
+
+    def __init__(self, client=None):
+        super().__init__()
+        if client is None:
+            from app.configs.utils.redis_client import get_redis
+            client = get_redis()
+        self.client = client
+        self.origine = f"{id(self)}-{threading.get_native_id()}"
+        self._pubsub = None
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        super().subscribe(channel, handler)
+        with self._lock:
+            if self._pubsub is None:
+                self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{f"{self.PREFIX}{channel}": self._recevoir})
+            if self._thread is None:
+                self._thread = self._pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def _recevoir(self, brut: Dict[str, Any]) -> None:
+        try:
+            enveloppe = json.loads(brut["data"])
+        except (TypeError, ValueError):
+            return
+        if enveloppe.get("origine") == self.origine:
+            return
+        self._dispatch(brut["channel"][len(self.PREFIX):], enveloppe.get("message", {}))
+
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        self._dispatch(channel, message)
+        try:
+            self.client.publish(f"{self.PREFIX}{channel}", json.dumps({"origine": self.origine, "message": message}, default=str))
+        except Exception as e:
+            # Les autres processus ne seront pas notifiés : le message est journalisé pour diagnostic
+            logger.error(f"❌ Publication impossible sur le canal {channel} : {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                self._thread.stop()
+                self._thread = None
+            if self._pubsub is not None:
+                self._pubsub.close()
+                self._pubsub = None
+
+
+_bus: Optional[EventBus] = None
+_lock = threading.Lock()
+
+
+def get_event_bus() -> EventBus:
+    """Bus configuré (EVENT_BUS_BACKEND : local ou redis), partagé par toute l'application."""
+    global _bus
+    if _bus is None:
+        with _lock:
+            if _bus is None:
+                if settings.EVENT_BUS_BACKEND == "redis":
+                    _bus = RedisEventBus()
+                elif settings.EVENT_BUS_BACKEND == "local":
+                    _bus = LocalEventBus()
+                else:
+                    raise ValueError(f"Bus d'événements inconnu : {settings.EVENT_BUS_BACKEND}")
+    return _bus
+
+
+def close_event_bus() -> None:
+    global _bus
+    with _lock:
+        if _bus is not None:
+            _bus.close()
+            _bus = None
@@ -0,0 +1,119 @@
+import logging
+import threading
+import time
+from enum import Enum
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.configs.settings import settings
+from app.configs.utils.event_bus import get_event_bus
+
+logger = logging.getLogger(__name__)
+
+CANAL_IDENTIFIANTS = "identifiants.invalides"
+
+CENTRE = "centre"
+ORGANISATION = "organisation"
+ROLE = "role"
+
+
+def _cles_naturelles(entite: str):
+    """Modèle et colonnes acceptées comme identifiant, par ordre de priorité (l'id d'abord)."""
+    from app.models.organisations.centre_etat_civil import CentreEtatCivil
+    from app.models.organisations.organisations import Organisation
+    from app.models.utilisateurs.role import Role
+
+    return {
+        CENTRE: (CentreEtatCivil, ("reference", "nom", "email", "telephone")),
+        ORGANISATION: (Organisation, ("reference", "nom")),
+        ROLE: (Role, ("nom",)),
+    }[entite]
+
+
+def normaliser(valeur: Any) -> str:
+    # Comparaison insensible à la casse et aux espaces de bord, comme la collation de la base
+    return str(valeur).strip().lower()
+
+
+class IdentifierResolver:
+    """
+    Résolution des identifiants naturels des centres, organisations et rôles vers leur id.
+
+    Les routes acceptent indifféremment l'id, la référence, le nom (ou l'email, le téléphone d'un
+    centre) : au lieu d'un OR sur toutes ces colonnes à chaque appel, chaque table (petite et
+    rarement modifiée) est chargée une fois en une table de correspondance clé -> id. Une résolution
+    est alors une lecture de dictionnaire, sans requête. Pour les énumérations (noms de rôles et
+    d'organisations), le nom du membre et sa valeur sont acceptés.
+
+    Les services invalident une table après chaque écriture ; l'invalidation passe par le bus
+    d'événements et une durée de vie (IDENTIFIANTS_CACHE_TTL) borne l'écart si un message est perdu.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = settings.IDENTIFIANTS_CACHE_TTL if ttl is None else ttl
+        # entité -> (clé normalisée -> id, expiration)
+        self._tables: Dict[str, Tuple[Dict[str, int], float]] = {}
+        self._lock = threading.Lock()
+        # Incrémentée à chaque invalidation : une table chargée pendant une invalidation n'est pas gardée
+        self._generation = 0
+        self._bus = None
+
+    def _abonner(self) -> None:
+        bus = get_event_bus()
+        if self._bus is not bus:
+            with self._lock:
+                if self._bus is not bus:
+                    bus.subscribe(CANAL_IDENTIFIANTS, self._recevoir)
+                    self._bus = bus
+
+    def _charger(self, db: Session, entite: str) -> Dict[str, int]:
+        modele, colonnes = _cles_naturelles(entite)
+        lignes = db.query(modele.id, *(getattr(modele, c) for c in colonnes)).all()
+        correspondances: Dict[str, int] = {normaliser(ligne[0]): ligne[0] for ligne in lignes}
+        # Une clé déjà prise (par un id ou une colonne prioritaire) n'est pas remplacée
+        for position in range(1, len(colonnes) + 1):
+            for ligne in lignes:
+                valeur = ligne[position]
+                if valeur is None:
+                    continue
+                if isinstance(valeur, Enum):
+                    correspondances.setdefault(normaliser(valeur.name), ligne[0])
+                    valeur = valeur.value
+                correspondances.setdefault(normaliser(valeur), ligne[0])
+        return correspondances
+
+    def table(self, db: Session, entite: str) -> Dict[str, int]:
+        if self._bus is None:
+            self._abonner()
+        now = time.monotonic()
+        generation = self._generation
+        entree = self._tables.get(entite)
+        if entree is None or entree[1] <= now:
+            entree = (self._charger(db, entite), now + self.ttl)
+            with self._lock:
+                if self._generation == generation:
+                    self._tables[entite] = entree
+        return entree[0]
+
+    def resoudre(self, db: Session, entite: str, identifiant: Any) -> Optional[int]:
+        """Id de l'entité désignée par son id ou l'une de ses clés naturelles, None si inconnue."""
+        if identifiant is None:
+            return None
+        return self.table(db, entite).get(normaliser(identifiant))
+
+    def _recevoir(self, message: Dict) -> None:
+        with self._lock:
+            self._generation += 1
+            for entite in message.get("entites", []):
+                self._tables.pop(entite, None)
+
+    def invalider(self, *entites: str) -> None:
+        """Invalide les tables des entités dans ce processus et dans les autres (après le commit)."""
+        if entites:
+            self._abonner()
+            get_event_bus().publish(CANAL_IDENTIFIANTS, {"entites": list(entites)})
+
+
+# Instance partagée par le processus
+identifier_resolver = IdentifierResolver()
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.configs.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def build_context() -> CryptContext:
+    """
+    Contexte passlib construit depuis les paramètres : le premier schéma de PASSWORD_SCHEMES sert
+    aux nouveaux hachages, les suivants sont seulement vérifiés (puis remplacés à la connexion).
+    Un coût bcrypt inférieur à PASSWORD_BCRYPT_ROUNDS est aussi considéré comme à mettre à jour.
+    """
+    schemes = [s.strip() for s in settings.PASSWORD_SCHEMES.split(",") if s.strip()]
+    options = {}
+    if "bcrypt" in schemes:
+        options["bcrypt__default_rounds"] = settings.PASSWORD_BCRYPT_ROUNDS
+        options["bcrypt__min_rounds"] = settings.PASSWORD_BCRYPT_ROUNDS
+    return CryptContext(schemes=schemes, deprecated="auto", **options)
+
+
+# Contexte du processus courant (aussi reconstruit dans chaque processus du pool)
+pwd_context = build_context()
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    try:
+        return pwd_context.verify_and_update(password, hashed_password)
+    except (ValueError, TypeError):
+        # Hachage absent ou illisible : mot de passe refusé
+        return False, None
+
+
+class PasswordHasherBusy(Exception):
+    """File d'attente du pool de hachage pleine : la requête doit être réessayée plus tard."""
+
+
+class PasswordHasher:
+    """
+    Hachage et vérification des mots de passe dans un pool dédié et borné.
+
+    bcrypt est volontairement coûteux : exécuté dans les threads des requêtes, un afflux de connexions
+    occupe tous les threads et affame les autres routes. Ici, au plus `workers` calculs tournent en même
+    temps (threads, ou processus si PASSWORD_HASH_EXECUTOR=process) et au plus `queue_size` attendent ;
+    au-delà, PasswordHasherBusy est levée immédiatement au lieu d'allonger la file.
+    """
+
+    def __init__(self, workers: Optional[int] = None, queue_size: Optional[int] = None, executor: Optional[str] = None):
+        self.workers = max(1, workers or settings.PASSWORD_HASH_WORKERS)
+        self.queue_size = max(0, settings.PASSWORD_HASH_QUEUE_SIZE if queue_size is None else queue_size)
+        self.executor_type = executor or settings.PASSWORD_HASH_EXECUTOR
+        self._executor: Optional[Executor] = None
+        self._places = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._lock = threading.Lock()
+        # Métriques
+        self._en_attente = 0
+        self._en_cours = 0
+        self._termines = 0
+        self._rejetes = 0
+        self._duree_totale = 0.0
+        self._attente_totale = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.executor_type == "process":
+                        # spawn, comme hash_many : le processus fait déjà tourner des threads
+                        self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+                    elif self.executor_type == "thread":
+                        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="password-hasher")
+                    else:
+                        raise ValueError(f"Exécuteur de hachage inconnu : {self.executor_type}")
+        return self._executor
+
+    def _soumettre(self, fn, *args) -> Future:
+        if not self._places.acquire(blocking=False):
+            with self._lock:
+                self._rejetes += 1
+            logger.warning(f"⚠️ File de hachage pleine ({self.workers} en cours, {self.queue_size} en attente)")
+            raise PasswordHasherBusy("Service d'authentification saturé, veuillez réessayer plus tard.")
+        soumis = time.perf_counter()
+        with self._lock:
+            self._en_attente += 1
+
+        def executer():
+            # Exécuté dans un thread du pool : la tâche quitte la file et démarre
+            with self._lock:
+                self._en_attente -= 1
+                self._en_cours += 1
+                self._attente_totale += time.perf_counter() - soumis
+            return fn(*args)
+
+        try:
+            if self.executor_type == "process":
+                # Les processus n'ont pas accès aux compteurs : la tâche est comptée en cours dès sa soumission
+                with self._lock:
+                    self._en_attente -= 1
+                    self._en_cours += 1
+                future = self.executor.submit(fn, *args)
+            else:
+                future = self.executor.submit(executer)
+        except Exception:
+            with self._lock:
+                self._en_attente -= 1
+            self._places.release()
+            raise
+
+        def terminer(_):
+            with self._lock:
+                self._en_cours -= 1
+                self._termines += 1
+                self._duree_totale += time.perf_counter() - soumis
+            self._places.release()
+
+        future.add_done_callback(terminer)
+        return future
+
+    # API synchrone (services appelés depuis les threads des requêtes)
+    def hash(self, password: str) -> str:
+        return self._soumettre(_hash, password).result()
+
+    def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Retourne (valide, nouveau_hash) ; nouveau_hash est non nul si le hachage stocké doit être remplacé."""
+        return self._soumettre(_verify_and_update, password, hashed_password).result()
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self.verify_and_update(password, hashed_password)[0]
+
+    # API asynchrone : la boucle d'événements et les threads de requêtes restent libres pendant le calcul
+    async def ahash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._soumettre(_hash, password))
+
+    async def averify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await asyncio.wrap_future(self._soumettre(_verify_and_update, password, hashed_password))
+
+    def hash_many(self, passwords: Iterable[str], workers: Optional[int] = None) -> Iterator[str]:
+        """
+        Hache un lot de mots de passe (imports en masse) dans un pool de processus dédié, distinct du pool
+        des connexions pour ne pas le saturer. Les hachages sont produits dans l'ordre, au fil de l'eau :
+        l'appelant peut insérer un lot pendant que les suivants sont calculés.
+        """
+        passwords: List[str] = list(passwords)
+        if not passwords:
+            return
+        workers = max(1, workers or self.workers)
+        # spawn : pas de fork d'un processus qui fait tourner des threads (boucle SMS, bus d'événements...)
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            yield from pool.map(_hash, passwords, chunksize=max(1, min(64, len(passwords) // (workers * 4))))
+
+    def stats(self) -> Dict[str, float]:
+        """Profondeur de file et temps moyens (en millisecondes) depuis le démarrage."""
+        with self._lock:
+            termines = self._termines or 1
+            return {
+                "executeur": self.executor_type,
+                "workers": self.workers,
+                "capacite_file": self.queue_size,
+                "en_attente": self._en_attente,
+                "en_cours": self._en_cours,
+                "termines": self._termines,
+                "rejetes": self._rejetes,
+                "attente_moyenne_ms": round(self._attente_totale / termines * 1000, 2),
+                "duree_moyenne_ms": round(self._duree_totale / termines * 1000, 2),
+            }
+
+    def close(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+# Instance partagée par l'application
+password_hasher = PasswordHasher()
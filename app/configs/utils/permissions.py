@@ -0,0 +1,220 @@
+import logging
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.configs.enumerations.Comptes import ComptesEnum
+from app.configs.enumerations.Persmissions import PermissionEnum
+from app.configs.enumerations.Roles import RoleEnum
+from app.configs.settings import settings
+from app.configs.utils.event_bus import get_event_bus
+
+logger = logging.getLogger(__name__)
+
+CANAL_PERMISSIONS = "permissions.invalidees"
+
+# Un bit par permission, dans l'ordre de déclaration de PermissionEnum (les alias partagent le bit
+# de leur membre canonique). Ajouter les nouvelles permissions en fin d'énumération.
+PERMISSION_BITS: Dict[PermissionEnum, int] = {permission: 1 << i for i, permission in enumerate(PermissionEnum)}
+TOUTES_PERMISSIONS = (1 << len(PERMISSION_BITS)) - 1
+# Empreinte de la table des bits : un jeton émis avec une autre table n'est pas lu
+PERMISSIONS_VERSION = zlib.crc32(",".join(p.name for p in PermissionEnum).encode()) & 0xFFFF
+
+
+def masque(permissions: Iterable[PermissionEnum]) -> int:
+    """Compile un ensemble de permissions en masque de bits."""
+    resultat = 0
+    for permission in permissions:
+        resultat |= PERMISSION_BITS[permission]
+    return resultat
+
+
+def permissions_du_masque(valeur: int) -> List[PermissionEnum]:
+    """Liste les permissions contenues dans un masque."""
+    return [permission for permission, bit in PERMISSION_BITS.items() if valeur & bit]
+
+
+class EtatPermissions(NamedTuple):
+    """Droits compilés d'un utilisateur et époques correspondantes (voir claims_utilisateur)."""
+    role_id: Optional[int]
+    masque: int
+    epoque_utilisateur: int
+    epoque_role: int
+    organisation_id: Optional[int]
+    centre_id: Optional[int]
+
+    @property
+    def epoque(self) -> List[int]:
+        return [self.role_id or 0, self.epoque_utilisateur, self.epoque_role]
+
+
+class PermissionEngine:
+    """
+    Permissions effectives des utilisateurs, compilées en masques de bits et gardées en cache.
+
+    Le masque effectif d'un utilisateur est le OU des permissions de son rôle et de ses permissions
+    propres (SUPER_ADMINISTRATEUR : toutes). Les deux parties sont en cache séparément, si bien qu'une
+    modification d'un rôle n'invalide qu'une entrée. Un compte non actif n'a aucune permission.
+    Une vérification en cache est une opération sur des entiers ; la base n'est lue qu'en cas d'absence.
+
+    Le cache garde aussi l'époque des permissions de l'utilisateur et de son rôle, comparée à celle
+    des jetons (claim epo) pour refuser les jetons émis avant un changement de droits.
+
+    Les invalidations sont diffusées par le bus d'événements ; une durée de vie (PERMISSIONS_CACHE_TTL)
+    borne l'écart si un message est perdu.
+    """
+
+    def __init__(self, taille_max: Optional[int] = None, ttl: Optional[float] = None):
+        self.taille_max = taille_max or settings.PERMISSIONS_CACHE_SIZE
+        self.ttl = settings.PERMISSIONS_CACHE_TTL if ttl is None else ttl
+        # utilisateur -> (rôle, masque propre, époque, organisation, centre, expiration)
+        # rôle -> (masque, époque, expiration)
+        # Au-delà de taille_max, les entrées les plus anciennes sont retirées
+        self._utilisateurs: Dict[int, Tuple[Optional[int], int, int, Optional[int], Optional[int], float]] = {}
+        self._roles: Dict[int, Tuple[int, int, float]] = {}
+        self._lock = threading.Lock()
+        # Incrémentée à chaque invalidation : un masque compilé pendant une invalidation n'est pas gardé
+        self._generation = 0
+        self._bus = None
+
+    def _abonner(self) -> None:
+        bus = get_event_bus()
+        if self._bus is not bus:
+            with self._lock:
+                if self._bus is not bus:
+                    bus.subscribe(CANAL_PERMISSIONS, self._recevoir)
+                    self._bus = bus
+
+    def _charger_utilisateur(self, db: Session, utilisateur_id: int):
+        from app.models.utilisateurs.permission import Permission
+        from app.models.utilisateurs.relations import user_permissions
+        from app.models.utilisateurs.utilisateur import Utilisateur
+
+        ligne = (
+            db.query(Utilisateur.role_id, Utilisateur.status, Utilisateur.permissions_epoch,
+                     Utilisateur.organisation_id, Utilisateur.centre_id)
+            .filter(Utilisateur.id == utilisateur_id)
+            .first()
+        )
+        if ligne is None:
+            return None, 0, 0, None, None
+        if ligne.status != ComptesEnum.ACTIF:
+            return None, 0, ligne.permissions_epoch, ligne.organisation_id, ligne.centre_id
+        noms = (
+            db.query(Permission.nom)
+            .join(user_permissions, user_permissions.c.permission_id == Permission.id)
+            .filter(user_permissions.c.user_id == utilisateur_id)
+            .all()
+        )
+        return (ligne.role_id, masque(nom for (nom,) in noms), ligne.permissions_epoch,
+                ligne.organisation_id, ligne.centre_id)
+
+    def _charger_role(self, db: Session, role_id: int) -> Tuple[int, int]:
+        from app.models.utilisateurs.permission import Permission
+        from app.models.utilisateurs.relations import role_permissions
+        from app.models.utilisateurs.role import Role
+
+        ligne = db.query(Role.nom, Role.permissions_epoch).filter(Role.id == role_id).first()
+        if ligne is None:
+            return 0, 0
+        if ligne.nom == RoleEnum.SUPER_ADMINISTRATEUR:
+            return TOUTES_PERMISSIONS, ligne.permissions_epoch
+        noms = (
+            db.query(Permission.nom)
+            .join(role_permissions, role_permissions.c.permission_id == Permission.id)
+            .filter(role_permissions.c.role_id == role_id)
+            .all()
+        )
+        return masque(nom for (nom,) in noms), ligne.permissions_epoch
+
+    def etat(self, db: Session, utilisateur_id: int) -> EtatPermissions:
+        """Droits effectifs et époques d'un utilisateur (masque nul s'il n'existe pas ou n'est pas actif)."""
+        if self._bus is None:
+            self._abonner()
+        utilisateur_id = int(utilisateur_id)
+        now = time.monotonic()
+        generation = self._generation
+
+        # Lectures sans verrou (dict.get est atomique) : seules les compilations prennent le verrou
+        entree = self._utilisateurs.get(utilisateur_id)
+        if entree is None or entree[-1] <= now:
+            entree = self._charger_utilisateur(db, utilisateur_id) + (now + self.ttl,)
+            with self._lock:
+                if self._generation == generation:
+                    self._utilisateurs[utilisateur_id] = entree
+                    while len(self._utilisateurs) > self.taille_max:
+                        self._utilisateurs.pop(next(iter(self._utilisateurs)))
+        role_id, propre, epoque_utilisateur, organisation_id, centre_id, _ = entree
+
+        if role_id is None:
+            return EtatPermissions(None, 0, epoque_utilisateur, 0, organisation_id, centre_id)
+        entree_role = self._roles.get(role_id)
+        if entree_role is None or entree_role[-1] <= now:
+            entree_role = self._charger_role(db, role_id) + (now + self.ttl,)
+            with self._lock:
+                if self._generation == generation:
+                    self._roles[role_id] = entree_role
+        masque_role, epoque_role, _ = entree_role
+        return EtatPermissions(role_id, masque_role | propre, epoque_utilisateur, epoque_role, organisation_id, centre_id)
+
+    def effective_mask(self, db: Session, utilisateur_id: int) -> int:
+        """Masque des permissions effectives d'un utilisateur (0 s'il n'existe pas ou n'est pas actif)."""
+        return self.etat(db, utilisateur_id).masque
+
+    def has_permissions(self, db: Session, utilisateur_id: int, requis: int) -> bool:
+        return self.effective_mask(db, utilisateur_id) & requis == requis
+
+    def _recevoir(self, message: Dict) -> None:
+        with self._lock:
+            self._generation += 1
+            if message.get("tout"):
+                self._utilisateurs.clear()
+                self._roles.clear()
+                return
+            for utilisateur_id in message.get("utilisateurs", []):
+                self._utilisateurs.pop(int(utilisateur_id), None)
+            for role_id in message.get("roles", []):
+                self._roles.pop(int(role_id), None)
+
+    def invalider(self, utilisateurs: Iterable[int] = (), roles: Iterable[int] = (), tout: bool = False) -> None:
+        """
+        Invalide les masques d'utilisateurs ou de rôles dans ce processus et dans les autres.
+        À appeler après le commit de la modification.
+        """
+        message = {"utilisateurs": [int(u) for u in utilisateurs], "roles": [int(r) for r in roles], "tout": tout}
+        if tout or message["utilisateurs"] or message["roles"]:
+            self._abonner()
+            get_event_bus().publish(CANAL_PERMISSIONS, message)
+
+
+def claims_utilisateur(etat: EtatPermissions) -> Dict:
+    """
+    Claims de droits d'un jeton d'accès :
+    - perm : masque des permissions effectives (hexadécimal) et pv : version de la table des bits ;
+    - org / cen : organisation et centre de l'utilisateur ;
+    - epo : [rôle, époque de l'utilisateur, époque du rôle] au moment de l'émission.
+    """
+    return {
+        "perm": format(etat.masque, "x"),
+        "pv": PERMISSIONS_VERSION,
+        "org": etat.organisation_id,
+        "cen": etat.centre_id,
+        "epo": etat.epoque,
+    }
+
+
+def masque_du_jeton(payload: Dict) -> Optional[int]:
+    """Masque porté par un jeton, ou None s'il n'en porte pas ou si la table des bits a changé depuis."""
+    if payload.get("pv") != PERMISSIONS_VERSION or "perm" not in payload:
+        return None
+    try:
+        return int(payload["perm"], 16)
+    except (TypeError, ValueError):
+        return None
+
+
+# Instance partagée par le processus
+permission_engine = PermissionEngine()
@@ -0,0 +1,192 @@
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+from app.configs.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    retry_after: float = 0.0
+
+
+def parse_rule(rule: str) -> Tuple[int, float]:
+    """Convertit une règle "5/300" (5 requêtes par 300 secondes) en (capacité, secondes)."""
+    capacite, periode = rule.split("/")
+    return int(capacite), float(periode)
+
+
+class RateLimiter:
+    """
+    Limiteur de débit par seau à jetons : chaque clé dispose de `capacite` jetons,
+    rechargés en continu sur `periode` secondes. Une requête consomme un jeton.
+    """
+
+    def hit(self, key: str, capacite: int, periode: float) -> RateLimitResult:
+        raise NotImplementedError
+
+
+class MemoryRateLimiter(RateLimiter):
+    """Seaux en mémoire : limite par processus (chaque worker uvicorn a ses propres compteurs)."""
+
+    def __init__(self):
+        self._seaux: Dict[str, Tuple[float, float, float]] = {}  # clé -> (jetons, dernier accès, durée de recharge)
+        self._lock = threading.Lock()
+        self._prochaine_purge = time.monotonic() + 60
+
+    def _purger(self, now: float) -> None:
+        # Un seau inutilisé depuis sa durée de recharge complète est plein : inutile de le garder
+        if now >= self._prochaine_purge:
+            for key in [k for k, (_, dernier, recharge) in self._seaux.items() if now - dernier >= recharge]:
+                del self._seaux[key]
+            self._prochaine_purge = now + 60
+
+    def hit(self, key: str, capacite: int, periode: float) -> RateLimitResult:
+        debit = capacite / periode
+        now = time.monotonic()
+        with self._lock:
+            self._purger(now)
+            jetons, dernier, _ = self._seaux.get(key, (capacite, now, periode))
+            jetons = min(capacite, jetons + (now - dernier) * debit)
+            if jetons >= 1:
+                self._seaux[key] = (jetons - 1, now, periode)
+                return RateLimitResult(True)
+            self._seaux[key] = (jetons, now, periode)
+            return RateLimitResult(False, (1 - jetons) / debit)
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Seaux partagés dans Redis : un script Lua lit, recharge et décrémente le seau de façon atomique,
+    avec l'horloge du serveur Redis (pas de dérive entre les instances de l'API).
+    """
+
+    PREFIX = "ratelimit:"
+    SCRIPT = """
+    local capacite = tonumber(ARGV[1])
+    local debit = tonumber(ARGV[2])
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+    local etat = redis.call('HMGET', KEYS[1], 'jetons', 'dernier')
+    local jetons = tonumber(etat[1]) or capacite
+    local dernier = tonumber(etat[2]) or now
+    jetons = math.min(capacite, jetons + math.max(0, now - dernier) * debit)
+    local autorise = 0
+    local attente = 0
+    if jetons >= 1 then
+        jetons = jetons - 1
+        autorise = 1
+    else
+        attente = math.ceil((1 - jetons) / debit)
+    end
+    redis.call('HSET', KEYS[1], 'jetons', tostring(jetons), 'dernier', tostring(now))
+    redis.call('PEXPIRE', KEYS[1], math.ceil(capacite / debit))
+    return {autorise, attente}
+    """
+
+    def __init__(self, client=None):
+        if client is None:
+            from app.configs.utils.redis_client import get_redis
+            client = get_redis()
+        self._script = client.register_script(self.SCRIPT)
+
+    def hit(self, key: str, capacite: int, periode: float) -> RateLimitResult:
+        debit_ms = capacite / (periode * 1000)
+        try:
+            autorise, attente_ms = self._script(keys=[f"{self.PREFIX}{key}"], args=[capacite, repr(debit_ms)])
+        except Exception as e:
+            # Redis indisponible : on laisse passer plutôt que de bloquer tous les clients
+            logger.error(f"❌ Limiteur de débit indisponible : {e}")
+            return RateLimitResult(True)
+        return RateLimitResult(bool(autorise), int(attente_ms) / 1000)
+
+
+_limiter: Optional[RateLimiter] = None
+_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Retourne le limiteur configuré (RATE_LIMIT_BACKEND : memory ou redis)."""
+    global _limiter
+    if _limiter is None:
+        with _lock:
+            if _limiter is None:
+                if settings.RATE_LIMIT_BACKEND == "redis":
+                    _limiter = RedisRateLimiter()
+                elif settings.RATE_LIMIT_BACKEND == "memory":
+                    _limiter = MemoryRateLimiter()
+                else:
+                    raise ValueError(f"Limiteur de débit inconnu : {settings.RATE_LIMIT_BACKEND}")
+    return _limiter
+
+
+def set_rate_limiter(limiter: Optional[RateLimiter]) -> None:
+    global _limiter
+    with _lock:
+        _limiter = limiter
+
+
+def client_ip(request: Request) -> str:
+    """Adresse IP du client ; X-Forwarded-For n'est pris en compte que derrière un proxy de confiance."""
+    if settings.RATE_LIMIT_TRUST_PROXY:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "inconnu"
+
+
+class RateLimit:
+    """
+    Dépendance FastAPI de limitation de débit. Chaque dimension reçoit sa propre règle "n/secondes" :
+    - ip : adresse du client ;
+    - session : paramètre de chemin `session_id` ;
+    - client : `client_id` (chemin ou corps JSON), sinon email ou téléphone du corps JSON.
+    Répond 429 avec l'en-tête Retry-After dès qu'une dimension est épuisée.
+
+    Exemple : dependencies=[Depends(RateLimit("otp", ip="30/300", session="3/300"))]
+    """
+
+    def __init__(self, name: str, ip: Optional[str] = None, session: Optional[str] = None, client: Optional[str] = None):
+        self.name = name
+        self.rules = {dimension: parse_rule(rule) for dimension, rule in
+                      (("ip", ip), ("session", session), ("client", client)) if rule}
+
+    async def _identifiant(self, dimension: str, request: Request) -> Optional[str]:
+        if dimension == "ip":
+            return client_ip(request)
+        if dimension == "session":
+            return request.path_params.get("session_id")
+        identifiant = request.path_params.get("client_id")
+        if identifiant is None and request.headers.get("content-type", "").startswith("application/json"):
+            try:
+                corps = await request.json()
+            except ValueError:
+                return None
+            if isinstance(corps, dict):
+                identifiant = corps.get("client_id") or corps.get("email") or corps.get("phone")
+        return str(identifiant).lower() if identifiant is not None else None
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        limiter = get_rate_limiter()
+        for dimension, (capacite, periode) in self.rules.items():
+            identifiant = await self._identifiant(dimension, request)
+            if identifiant is None:
+                continue
+            resultat = limiter.hit(f"{self.name}:{dimension}:{identifiant}", capacite, periode)
+            if not resultat.allowed:
+                logger.warning(f"⚠️ Limite atteinte ({self.name}, {dimension}={identifiant})")
+                raise HTTPException(
+                    status_code=429,
+                    detail="Trop de requêtes, veuillez réessayer plus tard.",
+                    headers={"Retry-After": str(max(1, math.ceil(resultat.retry_after)))},
+                )
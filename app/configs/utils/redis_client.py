@@ -0,0 +1,47 @@
+import logging
+import threading
+from typing import Optional
+
+import redis
+
+from app.configs.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[redis.Redis] = None
+_lock = threading.Lock()
+
+
+def get_redis() -> redis.Redis:
+    """
+    Client Redis partagé par toute l'application (pool de connexions commun).
+    Créé à la première utilisation à partir de REDIS_URL.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = redis.Redis.from_url(
+                    settings.REDIS_URL,
+                    decode_responses=True,
+                    max_connections=settings.REDIS_MAX_CONNECTIONS,
+                    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                    health_check_interval=30,
+                )
+                logger.info("✅ Client Redis initialisé")
+    return _client
+
+
+def set_redis(client: Optional[redis.Redis]) -> None:
+    """Remplace le client partagé (serveur de substitution dans les tests et benchmarks)."""
+    global _client
+    with _lock:
+        _client = client
+
+
+def close_redis() -> None:
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from app.configs.settings import settings
+from app.configs.utils.event_bus import get_event_bus
+
+logger = logging.getLogger(__name__)
+
+CANAL_REFERENCES = "references.invalidees"
+
+MOTIFS = "motifs"
+ROLES = "roles"
+PERMISSIONS = "permissions"
+ORGANISATIONS = "organisations"
+CENTRES = "centres"
+
+
+# Chargeurs : corps de réponse de la route de liste correspondante (imports différés : les services
+# importent ce module pour l'invalidation)
+def _motifs(db: Session) -> Any:
+    from app.schemas.demandes.motif_schema import MotifRead
+    from app.services.demandes.motif_service import MotifService
+
+    response = MotifService.get_all_motifs(db)
+    if response["code"] != 200:
+        raise RuntimeError(response["message"])
+    return [MotifRead.from_orm(m) for m in response["data"]]
+
+
+def _roles(db: Session) -> Any:
+    from app.services.utilisateurs.role_service import RoleService
+
+    return RoleService.get_all_roles(db)["data"]
+
+
+def _permissions(db: Session) -> Any:
+    from app.services.utilisateurs.permission_service import PermissionService
+
+    return PermissionService.get_all_permissions(db)
+
+
+def _organisations(db: Session) -> Any:
+    from app.services.organisations.organisation_service import OrganisationService
+
+    return OrganisationService.get_all_organisations(db)
+
+
+def _centres(db: Session) -> Any:
+    from app.schemas.organisations.centre_etat_civil_schema import CentreEtatCivilRead
+    from app.services.organisations.centre_etat_civil_service import CentreEtatCivilService
+
+    response = CentreEtatCivilService.get_all_centres(db)
+    return {**response, "data": [CentreEtatCivilRead.from_orm(c) for c in response["data"]]}
+
+
+CHARGEURS: Dict[str, Callable[[Session], Any]] = {
+    MOTIFS: _motifs,
+    ROLES: _roles,
+    PERMISSIONS: _permissions,
+    ORGANISATIONS: _organisations,
+    CENTRES: _centres,
+}
+
+
+class EntreeReference(NamedTuple):
+    corps: bytes
+    etag: str
+    expiration: float
+
+
+class ReferenceCache:
+    """
+    Données de référence (motifs, rôles, permissions, organisations, centres) servies depuis la mémoire.
+
+    Chaque liste est chargée une fois, sérialisée en JSON et gardée avec son empreinte (ETag) : une
+    requête ne lit plus la base et ne resérialise plus rien ; un client qui renvoie l'ETag reçu
+    (If-None-Match) obtient un 304 sans corps. Cache-Control laisse le client réutiliser sa copie
+    REFERENCES_CACHE_MAX_AGE secondes avant de revalider.
+
+    Les services invalident une liste après chaque écriture ; l'invalidation passe par le bus
+    d'événements (autres workers) et une durée de vie (REFERENCES_CACHE_TTL) borne l'écart si un
+    message est perdu.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_age: Optional[int] = None):
+        self.ttl = settings.REFERENCES_CACHE_TTL if ttl is None else ttl
+        self.max_age = settings.REFERENCES_CACHE_MAX_AGE if max_age is None else max_age
+        self._entrees: Dict[str, EntreeReference] = {}
+        self._lock = threading.Lock()
+        # Un seul chargement à la fois : les requêtes simultanées sur une liste absente attendent le premier
+        self._chargement = threading.Lock()
+        # Incrémentée à chaque invalidation : une liste chargée pendant une invalidation n'est pas gardée
+        self._generation = 0
+        self._bus = None
+
+    def _abonner(self) -> None:
+        bus = get_event_bus()
+        if self._bus is not bus:
+            with self._lock:
+                if self._bus is not bus:
+                    bus.subscribe(CANAL_REFERENCES, self._recevoir)
+                    self._bus = bus
+
+    def _charger(self, db: Session, nom: str) -> EntreeReference:
+        contenu = jsonable_encoder(CHARGEURS[nom](db))
+        corps = json.dumps(contenu, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        etag = '"' + hashlib.blake2b(corps, digest_size=16).hexdigest() + '"'
+        return EntreeReference(corps, etag, time.monotonic() + self.ttl)
+
+    def obtenir(self, db: Session, nom: str) -> EntreeReference:
+        if self._bus is None:
+            self._abonner()
+        entree = self._entrees.get(nom)
+        if entree is not None and entree.expiration > time.monotonic():
+            return entree
+        with self._chargement:
+            entree = self._entrees.get(nom)
+            if entree is not None and entree.expiration > time.monotonic():
+                return entree
+            generation = self._generation
+            entree = self._charger(db, nom)
+            with self._lock:
+                if self._generation == generation:
+                    self._entrees[nom] = entree
+        return entree
+
+    def reponse(self, request: Request, db: Session, nom: str) -> Response:
+        """Réponse de la route de liste : 304 si le client a déjà cette version, sinon le JSON en cache."""
+        entree = self.obtenir(db, nom)
+        headers = {"ETag": entree.etag, "Cache-Control": f"private, max-age={self.max_age}"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and entree.etag in {e.strip().removeprefix("W/") for e in if_none_match.split(",")}:
+            return Response(status_code=304, headers=headers)
+        return Response(content=entree.corps, media_type="application/json", headers=headers)
+
+    def prechauffer(self, db: Session) -> None:
+        """Charge toutes les listes (démarrage de l'application)."""
+        for nom in CHARGEURS:
+            try:
+                self.obtenir(db, nom)
+            except Exception as e:
+                logger.error(f"❌ Préchargement des données de référence « {nom} » impossible : {e}")
+        logger.info(f"✅ Données de référence en cache : {', '.join(sorted(self._entrees))}")
+
+    def _recevoir(self, message: Dict) -> None:
+        with self._lock:
+            self._generation += 1
+            for nom in message.get("references", []):
+                self._entrees.pop(nom, None)
+
+    def invalider(self, *noms: str) -> None:
+        """Invalide des listes dans ce processus et dans les autres (après le commit)."""
+        if noms:
+            self._abonner()
+            get_event_bus().publish(CANAL_REFERENCES, {"references": list(noms)})
+
+
+# Instance partagée par le processus
+reference_cache = ReferenceCache()
@@ -0,0 +1,133 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.configs.settings import settings
+from app.configs.utils.event_bus import get_event_bus
+
+logger = logging.getLogger(__name__)
+
+CANAL_REVOCATION_SESSIONS = "sessions.revoquees"
+
+
+def epoch(moment: datetime) -> float:
+    """Horodatage d'une date UTC naïve (convention des colonnes DateTime de l'application)."""
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+class BloomFilter:
+    """Filtre de Bloom (double hachage blake2b) : « absent » est certain, « présent » est probable."""
+
+    def __init__(self, capacite: int, taux_erreur: float):
+        self.taille = max(8, int(-capacite * math.log(taux_erreur) / (math.log(2) ** 2)))
+        self.nb_hachages = max(1, round(self.taille / capacite * math.log(2)))
+        self.bits = bytearray((self.taille + 7) // 8)
+
+    def _positions(self, valeur: str):
+        empreinte = hashlib.blake2b(valeur.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(empreinte[:8], "little")
+        h2 = int.from_bytes(empreinte[8:], "little") | 1
+        return ((h1 + i * h2) % self.taille for i in range(self.nb_hachages))
+
+    def add(self, valeur: str) -> None:
+        for position in self._positions(valeur):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, valeur: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(valeur))
+
+
+class SessionRevocationFilter:
+    """
+    Ensemble des sessions clients révoquées avant leur expiration, tenu en mémoire par chaque processus.
+
+    La vérification d'un jeton passe d'abord par le filtre de Bloom (réponse négative certaine, sans
+    accès à la table exacte) ; seul un positif consulte l'ensemble exact
+    `{session_id: (expiration, révoquée le)}`. Seuls les jetons émis avant la révocation sont refusés :
+    une session réactivée plus tard reçoit des jetons valides.
+    Les entrées expirées sont retirées, et le filtre reconstruit, lors des purges périodiques.
+    Les révocations sont diffusées aux autres processus par le bus d'événements.
+    """
+
+    def __init__(self, capacite: Optional[int] = None, taux_erreur: Optional[float] = None):
+        self.capacite = capacite or settings.SESSION_REVOCATION_CAPACITY
+        self.taux_erreur = taux_erreur or settings.SESSION_REVOCATION_ERROR_RATE
+        self._exact: Dict[str, Tuple[float, float]] = {}
+        self._bloom = BloomFilter(self.capacite, self.taux_erreur)
+        self._lock = threading.Lock()
+        self._prochaine_purge = time.time() + 60
+        self._bus = None
+
+    def _ajouter(self, session_id: str, expiration: float, revoquee_le: float) -> None:
+        with self._lock:
+            self._exact[session_id] = (expiration, revoquee_le)
+            self._bloom.add(session_id)
+            if len(self._exact) > self.capacite:
+                self._reconstruire(time.time())
+
+    def _reconstruire(self, now: float) -> None:
+        """Retire les sessions expirées (leurs jetons sont refusés de toute façon) et refait le filtre."""
+        self._exact = {sid: entree for sid, entree in self._exact.items() if entree[0] > now}
+        self.capacite = max(self.capacite, 2 * len(self._exact))
+        self._bloom = BloomFilter(self.capacite, self.taux_erreur)
+        for session_id in self._exact:
+            self._bloom.add(session_id)
+        self._prochaine_purge = now + 60
+
+    def revoke(self, revocations: Iterable[Tuple[int, datetime]]) -> None:
+        """Révoque des sessions (identifiant, expiration) dans ce processus et les diffuse aux autres."""
+        now = time.time()
+        sessions = [{"sid": str(session_id), "exp": epoch(expires_at), "rev": now} for session_id, expires_at in revocations]
+        if sessions:
+            get_event_bus().publish(CANAL_REVOCATION_SESSIONS, {"sessions": sessions})
+
+    def _recevoir(self, message: Dict) -> None:
+        for session in message.get("sessions", []):
+            self._ajouter(session["sid"], float(session["exp"]), float(session["rev"]))
+
+    def is_revoked(self, session_id, issued_at: float) -> bool:
+        """
+        Indique si un jeton de la session, émis à `issued_at`, a été révoqué. `issued_at` est le claim emi
+        (horodatage précis) : avec le claim iat, entier, un jeton émis dans la seconde d'une révocation
+        serait indiscernable d'un jeton antérieur.
+        """
+        session_id = str(session_id)
+        now = time.time()
+        if now >= self._prochaine_purge:
+            with self._lock:
+                self._reconstruire(now)
+        if session_id not in self._bloom:
+            return False
+        entree = self._exact.get(session_id)
+        return entree is not None and entree[0] > now and issued_at <= entree[1]
+
+    def start(self, db) -> int:
+        """
+        Abonne le filtre au bus et le charge depuis la base : sessions désactivées mais pas encore expirées.
+        :return: nombre de sessions révoquées chargées.
+        """
+        from app.models.clients.session import Session as ClientSession
+
+        bus = get_event_bus()
+        if self._bus is not bus:
+            bus.subscribe(CANAL_REVOCATION_SESSIONS, self._recevoir)
+            self._bus = bus
+        now = datetime.utcnow()
+        chargement = time.time()
+        lignes = (
+            db.query(ClientSession.id, ClientSession.expires_at)
+            .filter(ClientSession.is_active == False, ClientSession.expires_at > now)
+            .all()
+        )
+        for session_id, expires_at in lignes:
+            self._ajouter(str(session_id), epoch(expires_at), chargement)
+        logger.info(f"✅ {len(lignes)} session(s) révoquée(s) chargée(s)")
+        return len(lignes)
+
+
+# Instance partagée par le processus
+session_revocations = SessionRevocationFilter()
@@ -0,0 +1,262 @@
+import asyncio
+import logging
+import re
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import httpx
+
+from app.configs.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SMSMessage:
+    destinataire: str
+    texte: str
+
+
+@dataclass(frozen=True)
+class SMSResultat:
+    destinataire: str
+    envoye: bool
+    identifiant: Optional[str] = None
+    erreur: Optional[str] = None
+
+
+class SMSProvider:
+    """Interface d'un fournisseur SMS : envoi asynchrone d'un lot de messages."""
+
+    # Nombre maximum de messages acceptés par appel (1 = pas de lot côté fournisseur)
+    max_batch: int = 1
+    # Faux pour un fournisseur qui n'achemine rien (journalisation)
+    reel: bool = True
+
+    async def send_batch(self, messages: List[SMSMessage]) -> List[SMSResultat]:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+def masquer(texte: str) -> str:
+    """Masque les suites de chiffres (codes OTP) d'un texte destiné aux journaux."""
+    return re.sub(r"\d{4,}", lambda m: "•" * len(m.group()), texte)
+
+
+class LogSMSProvider(SMSProvider):
+    """
+    Fournisseur de développement : journalise les SMS (codes masqués) sans les envoyer.
+
+    Les SMS sont déclarés en échec, sauf si SMS_LOG_SIMULER_ENVOI est activé (développement).
+    """
+
+    max_batch = 1000
+    reel = False
+
+    async def send_batch(self, messages: List[SMSMessage]) -> List[SMSResultat]:
+        for message in messages:
+            logger.info(f"📱 SMS (non envoyé) à {message.destinataire} : {masquer(message.texte)}")
+        if settings.SMS_LOG_SIMULER_ENVOI:
+            return [SMSResultat(m.destinataire, True) for m in messages]
+        return [SMSResultat(m.destinataire, False, erreur="Aucun fournisseur SMS configuré (SMS_PROVIDER=log)")
+                for m in messages]
+
+
+class HTTPSMSProvider(SMSProvider):
+    """
+    Fournisseur SMS HTTP (API JSON) avec un client httpx partagé :
+    connexions keep-alive réutilisées entre les envois, et envoi par lots si le fournisseur l'accepte.
+
+    Contrat : POST {base_url}/messages {"sender": ..., "messages": [{"to": ..., "text": ...}]}
+    -> {"results": [{"to": ..., "id": ..., "status": "sent" | "failed", "error": ...}]}
+    (implémenté par le serveur local app/configs/utils/sms_stub_server.py).
+    """
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, sender: Optional[str] = None,
+                 max_batch: int = 100, max_connections: int = 10, timeout: float = 10.0):
+        self.sender = sender
+        self.max_batch = max(1, max_batch)
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=httpx.AsyncHTTPTransport(retries=2),
+        )
+
+    async def send_batch(self, messages: List[SMSMessage]) -> List[SMSResultat]:
+        payload = {"sender": self.sender, "messages": [{"to": m.destinataire, "text": m.texte} for m in messages]}
+        try:
+            response = await self.client.post("/messages", json=payload)
+            response.raise_for_status()
+            resultats = {r.get("to"): r for r in response.json().get("results", [])}
+        except (httpx.HTTPError, ValueError) as e:
+            return [SMSResultat(m.destinataire, False, erreur=str(e)) for m in messages]
+        sortie = []
+        for message in messages:
+            resultat = resultats.get(message.destinataire, {})
+            envoye = resultat.get("status") == "sent"
+            sortie.append(SMSResultat(message.destinataire, envoye, resultat.get("id"),
+                                      None if envoye else resultat.get("error", "Réponse du fournisseur incomplète")))
+        return sortie
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def get_sms_provider() -> SMSProvider:
+    """Instancie le fournisseur SMS configuré (SMS_PROVIDER)."""
+    if settings.SMS_PROVIDER == "http":
+        if not settings.SMS_API_URL:
+            raise ValueError("SMS_API_URL doit être défini pour SMS_PROVIDER=http")
+        return HTTPSMSProvider(settings.SMS_API_URL, settings.SMS_API_KEY, settings.SMS_SENDER,
+                               settings.SMS_MAX_BATCH, settings.SMS_MAX_CONNECTIONS, settings.SMS_TIMEOUT)
+    if settings.SMS_PROVIDER == "log":
+        return LogSMSProvider()
+    raise ValueError(f"Fournisseur SMS inconnu : {settings.SMS_PROVIDER}")
+
+
+class SMSService:
+    """
+    Service d'envoi de SMS utilisable depuis le code synchrone.
+
+    Les SMS sont confiés à une boucle asyncio dédiée (thread d'arrière-plan) qui regroupe
+    les messages arrivés dans une courte fenêtre en lots de `max_batch`, et limite le nombre
+    de requêtes simultanées vers le fournisseur.
+    """
+
+    def __init__(self, provider: Optional[SMSProvider] = None, fenetre_ms: Optional[int] = None,
+                 concurrence: Optional[int] = None):
+        self._provider = provider
+        self._provider_configure = provider is None
+        self.fenetre = (settings.SMS_BATCH_WINDOW_MS if fenetre_ms is None else fenetre_ms) / 1000
+        self.concurrence = concurrence or settings.SMS_MAX_CONNECTIONS
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def provider(self) -> SMSProvider:
+        if self._provider is None:
+            self._provider = get_sms_provider()
+        return self._provider
+
+    @property
+    def disponible(self) -> bool:
+        """Faux si les SMS ne sont pas réellement acheminés (fournisseur de journalisation sans simulation)."""
+        if settings.SMS_LOG_SIMULER_ENVOI:
+            return True
+        if self._provider is not None:
+            return self._provider.reel
+        return settings.SMS_PROVIDER != "log"
+
+    def _demarrer(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            pret = threading.Event()
+
+            def executer():
+                self._loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self._loop)
+                self._queue = asyncio.Queue()
+                self._loop.create_task(self._consommer())
+                pret.set()
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=executer, name="sms-dispatcher", daemon=True)
+            self._thread.start()
+            pret.wait()
+
+    async def _consommer(self) -> None:
+        semaphore = asyncio.Semaphore(self.concurrence)
+        while True:
+            premier = await self._queue.get()
+            if premier is None:
+                return
+            lot: List[Tuple[SMSMessage, Future]] = [premier]
+            # Fournisseur construit au premier envoi : une configuration invalide fait échouer
+            # les messages concernés sans arrêter la boucle
+            try:
+                max_batch = self.provider.max_batch
+            except Exception as e:
+                logger.error(f"❌ Fournisseur SMS indisponible : {e}")
+                for _, future in lot:
+                    future.set_exception(e)
+                continue
+            echeance = self._loop.time() + self.fenetre
+            while len(lot) < max_batch:
+                restant = echeance - self._loop.time()
+                if restant <= 0:
+                    break
+                try:
+                    suivant = await asyncio.wait_for(self._queue.get(), restant)
+                except asyncio.TimeoutError:
+                    break
+                if suivant is None:
+                    self._queue.put_nowait(None)
+                    break
+                lot.append(suivant)
+            await semaphore.acquire()
+            self._loop.create_task(self._envoyer_lot(lot, semaphore))
+
+    async def _envoyer_lot(self, lot: List[Tuple[SMSMessage, Future]], semaphore: asyncio.Semaphore) -> None:
+        try:
+            resultats = await self.provider.send_batch([message for message, _ in lot])
+            for (message, future), resultat in zip(lot, resultats):
+                if not resultat.envoye:
+                    logger.error(f"❌ Échec de l'envoi du SMS à {message.destinataire} : {resultat.erreur}")
+                future.set_result(resultat)
+        except Exception as e:
+            logger.error(f"❌ Erreur du fournisseur SMS : {e}")
+            for message, future in lot:
+                if not future.done():
+                    future.set_result(SMSResultat(message.destinataire, False, erreur=str(e)))
+        finally:
+            semaphore.release()
+
+    def send_sms(self, phone: str, text: str) -> Future:
+        """
+        Met un SMS dans la file d'envoi sans bloquer l'appelant.
+        :return: Future résolu avec un SMSResultat une fois le lot envoyé.
+        """
+        self._demarrer()
+        future: Future = Future()
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (SMSMessage(phone, text), future))
+        return future
+
+    def send_many(self, messages: List[Tuple[str, str]], timeout: Optional[float] = None) -> List[SMSResultat]:
+        """Envoie un ensemble de SMS (téléphone, texte) et attend leurs résultats."""
+        futures = [self.send_sms(phone, text) for phone, text in messages]
+        return [future.result(timeout) for future in futures]
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Vide la file, ferme les connexions du fournisseur et arrête la boucle d'envoi."""
+        with self._lock:
+            if self._thread is None:
+                return
+            loop, thread = self._loop, self._thread
+
+            async def arreter():
+                await self._queue.put(None)
+                while len(asyncio.all_tasks()) > 1:
+                    await asyncio.sleep(0.01)
+                if self._provider is not None:
+                    await self._provider.close()
+
+            asyncio.run_coroutine_threadsafe(arreter(), loop).result(timeout)
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            self._loop = self._queue = self._thread = None
+            if self._provider_configure:
+                self._provider = None
+
+
+# Instance partagée par l'application
+sms_service = SMSService()
@@ -0,0 +1,113 @@
+"""
+Serveur SMS local (bouchon) implémentant l'API attendue par HTTPSMSProvider, pour les tests et les benchmarks.
+
+Usage : python -m app.configs.utils.sms_stub_server [--port 8025] [--latence-ms 0]
+Puis : SMS_PROVIDER=http SMS_API_URL=http://127.0.0.1:8025
+
+- POST /messages : enregistre les messages et répond {"results": [...]}
+  (un numéro se terminant par "000" est refusé, pour simuler un échec)
+- GET /messages : liste des messages reçus
+- DELETE /messages : vide la liste
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+class SMSStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latence_ms: float = 0):
+        super().__init__((host, port), _SMSStubHandler)
+        self.latence = latence_ms / 1000
+        self.messages: List[Dict[str, Any]] = []
+        self.requetes = 0
+        self.lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "SMSStubServer":
+        """Démarre le serveur dans un thread d'arrière-plan (usage dans les tests)."""
+        self._thread = threading.Thread(target=self.serve_forever, name="sms-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _SMSStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, comme un vrai fournisseur
+    server: SMSStubServer
+
+    def _repondre(self, code: int, contenu: Any) -> None:
+        corps = json.dumps(contenu).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def do_POST(self):
+        if self.path != "/messages":
+            return self._repondre(404, {"error": "not found"})
+        try:
+            donnees = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            messages = donnees["messages"]
+        except (ValueError, KeyError):
+            return self._repondre(400, {"error": "invalid payload"})
+        if self.server.latence:
+            time.sleep(self.server.latence)
+        resultats = []
+        with self.server.lock:
+            self.server.requetes += 1
+            for message in messages:
+                if str(message.get("to", "")).endswith("000"):
+                    resultats.append({"to": message.get("to"), "status": "failed", "error": "invalid number"})
+                    continue
+                identifiant = str(uuid.uuid4())
+                self.server.messages.append({"id": identifiant, "sender": donnees.get("sender"), **message})
+                resultats.append({"to": message.get("to"), "id": identifiant, "status": "sent"})
+        self._repondre(200, {"results": resultats})
+
+    def do_GET(self):
+        if self.path != "/messages":
+            return self._repondre(404, {"error": "not found"})
+        with self.server.lock:
+            self._repondre(200, {"messages": list(self.server.messages), "requests": self.server.requetes})
+
+    def do_DELETE(self):
+        with self.server.lock:
+            self.server.messages.clear()
+            self.server.requetes = 0
+        self._repondre(200, {"messages": []})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur SMS local pour les tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latence-ms", type=float, default=0)
+    args = parser.parse_args()
+    serveur = SMSStubServer(args.host, args.port, args.latence_ms)
+    print(f"📱 Serveur SMS local en écoute sur {serveur.url}")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        serveur.server_close()
+
+
+if __name__ == "__main__":
+    main()
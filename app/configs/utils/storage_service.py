@@ -0,0 +1,318 @@
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.configs.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Taille des blocs lus/écrits : assez grande pour amortir les appels système et réseau
+CHUNK_SIZE = settings.STORAGE_CHUNK_SIZE
+
+# Valeur de Document.compression pour les documents archivés au niveau froid
+COMPRESSION_ZSTD = "zstd"
+
+
+def construire_cle(type_document: str, demande_id: int, extension: str, horodatage: Optional[datetime] = None) -> str:
+    """
+    Construit la clé d'un document en respectant l'arborescence datée existante :
+    documents/<TYPE_DOCUMENT>/<AAAA-MM-JJ>/<demande_id>_<timestamp>.<extension>
+    """
+    horodatage = horodatage or datetime.utcnow()
+    return f"documents/{type_document}/{horodatage:%Y-%m-%d}/{demande_id}_{int(horodatage.timestamp())}.{extension.lstrip('.')}"
+
+
+class StorageBackend:
+    """Interface commune des backends de stockage. Les URI ont la forme <scheme>://<clé>."""
+
+    scheme: str = ""
+    LOCAL = "local"
+    LOCAL_COLD = "cold"
+    S3 = "s3"
+    S3_COLD = "s3cold"
+
+    def uri(self, key: str) -> str:
+        return f"{self.scheme}://{key}"
+
+    def key(self, uri: str) -> str:
+        """Extrait la clé d'une URI (les anciens chemins sans schéma sont acceptés tels quels)."""
+        prefix = f"{self.scheme}://"
+        return uri[len(prefix):] if uri.startswith(prefix) else uri
+
+    async def save(self, key: str, chunks: AsyncIterator[bytes]) -> Tuple[str, int, str]:
+        """Enregistre un flux et retourne (uri, taille en octets, checksum SHA-256)."""
+        raise NotImplementedError
+
+    async def open(self, uri: str) -> AsyncIterator[bytes]:
+        """Lit un objet par blocs, sans le charger entièrement en mémoire."""
+        raise NotImplementedError
+        yield b""
+
+    async def read(self, uri: str) -> bytes:
+        return b"".join([chunk async for chunk in self.open(uri)])
+
+    async def delete(self, uri: str) -> None:
+        raise NotImplementedError
+
+    async def exists(self, uri: str) -> bool:
+        raise NotImplementedError
+
+
+class LocalStorageBackend(StorageBackend):
+    """Stockage sur disque local ; les entrées/sorties bloquantes sont déportées dans des threads."""
+
+    def __init__(self, root: str, scheme: str = StorageBackend.LOCAL):
+        self.root = os.path.abspath(root)
+        self.scheme = scheme
+
+    def key(self, uri: str) -> str:
+        key = super().key(uri)
+        # Chemin historique absolu sous la racine : ramené à une clé relative (les autres restent refusés)
+        if os.path.isabs(key) and os.path.commonpath([self.root, os.path.abspath(key)]) == self.root:
+            return os.path.relpath(os.path.abspath(key), self.root)
+        return key
+
+    def path(self, uri: str) -> str:
+        """Chemin absolu d'une URI, en refusant toute sortie de la racine de stockage (chemins absolus compris)."""
+        key = self.key(uri)
+        path = os.path.abspath(os.path.join(self.root, key))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise ValueError(f"Clé de stockage invalide : {key}")
+        return path
+
+    async def save(self, key: str, chunks: AsyncIterator[bytes]) -> Tuple[str, int, str]:
+        path = self.path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        await asyncio.to_thread(os.makedirs, os.path.dirname(path), exist_ok=True)
+        digest, size = hashlib.sha256(), 0
+        fichier = await asyncio.to_thread(open, tmp_path, "wb")
+        try:
+            async for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                await asyncio.to_thread(fichier.write, chunk)
+            await asyncio.to_thread(fichier.close)
+            await asyncio.to_thread(os.replace, tmp_path, path)
+        except BaseException:
+            fichier.close()
+            await asyncio.to_thread(_supprimer_si_existe, tmp_path)
+            raise
+        return self.uri(key), size, digest.hexdigest()
+
+    async def open(self, uri: str) -> AsyncIterator[bytes]:
+        fichier = await asyncio.to_thread(open, self.path(uri), "rb")
+        try:
+            while True:
+                chunk = await asyncio.to_thread(fichier.read, CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            fichier.close()
+
+    async def delete(self, uri: str) -> None:
+        await asyncio.to_thread(_supprimer_si_existe, self.path(uri))
+
+    async def exists(self, uri: str) -> bool:
+        return await asyncio.to_thread(os.path.isfile, self.path(uri))
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    Stockage objet compatible S3 (AWS, MinIO, Ceph...).
+    Un seul client boto3, thread-safe, partage un pool de connexions HTTP keep-alive ;
+    les objets volumineux sont envoyés en multipart au fil de l'eau.
+    """
+
+    MIN_PART_SIZE = 5 * 1024 * 1024  # Minimum imposé par S3 pour toutes les parties sauf la dernière
+
+    def __init__(self, bucket: str, endpoint_url: Optional[str] = None, access_key: Optional[str] = None,
+                 secret_key: Optional[str] = None, region: Optional[str] = None, max_pool_connections: int = 10,
+                 multipart_threshold: int = 8 * 1024 * 1024, scheme: str = StorageBackend.S3,
+                 storage_class: Optional[str] = None):
+        import boto3
+        from botocore.config import Config
+
+        self.scheme = scheme
+        self.bucket = bucket
+        # Classe de stockage S3 (ex. STANDARD_IA) utilisée pour le niveau froid
+        self.extra_args = {"StorageClass": storage_class} if storage_class else {}
+        self.part_size = max(multipart_threshold, self.MIN_PART_SIZE)
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            region_name=region,
+            config=Config(max_pool_connections=max_pool_connections, retries={"max_attempts": 3, "mode": "standard"}),
+        )
+
+    def key(self, uri: str) -> str:
+        parsed = urlparse(uri)
+        if parsed.scheme == self.scheme:
+            return parsed.path.lstrip("/") if parsed.netloc == self.bucket else f"{parsed.netloc}{parsed.path}"
+        return uri
+
+    def uri(self, key: str) -> str:
+        return f"{self.scheme}://{self.bucket}/{key}"
+
+    async def save(self, key: str, chunks: AsyncIterator[bytes]) -> Tuple[str, int, str]:
+        digest, size = hashlib.sha256(), 0
+        buffer = bytearray()
+        upload_id, parts = None, []
+        try:
+            async for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                buffer.extend(chunk)
+                if len(buffer) >= self.part_size:
+                    if upload_id is None:
+                        upload_id = (await asyncio.to_thread(
+                            self.client.create_multipart_upload, Bucket=self.bucket, Key=key, **self.extra_args
+                        ))["UploadId"]
+                    parts.append(await self._upload_part(key, upload_id, len(parts) + 1, bytes(buffer)))
+                    buffer.clear()
+
+            if upload_id is None:
+                await asyncio.to_thread(
+                    self.client.put_object, Bucket=self.bucket, Key=key, Body=bytes(buffer), **self.extra_args
+                )
+            else:
+                if buffer:
+                    parts.append(await self._upload_part(key, upload_id, len(parts) + 1, bytes(buffer)))
+                await asyncio.to_thread(
+                    self.client.complete_multipart_upload, Bucket=self.bucket, Key=key, UploadId=upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+        except BaseException:
+            if upload_id is not None:
+                await asyncio.to_thread(self.client.abort_multipart_upload, Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+        return self.uri(key), size, digest.hexdigest()
+
+    async def _upload_part(self, key: str, upload_id: str, number: int, data: bytes) -> Dict[str, object]:
+        response = await asyncio.to_thread(
+            self.client.upload_part, Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=data
+        )
+        return {"ETag": response["ETag"], "PartNumber": number}
+
+    async def open(self, uri: str) -> AsyncIterator[bytes]:
+        response = await asyncio.to_thread(self.client.get_object, Bucket=self.bucket, Key=self.key(uri))
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def delete(self, uri: str) -> None:
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=self.key(uri))
+
+    async def exists(self, uri: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            await asyncio.to_thread(self.client.head_object, Bucket=self.bucket, Key=self.key(uri))
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+
+async def compresser_flux(chunks: AsyncIterator[bytes], niveau: int = 10) -> AsyncIterator[bytes]:
+    """Compresse un flux en zstd, bloc par bloc ; la compression est déportée dans un thread."""
+    import zstandard
+
+    compresseur = zstandard.ZstdCompressor(level=niveau).compressobj()
+    async for chunk in chunks:
+        sortie = await asyncio.to_thread(compresseur.compress, chunk)
+        if sortie:
+            yield sortie
+    sortie = compresseur.flush()
+    if sortie:
+        yield sortie
+
+
+async def decompresser_flux(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Décompresse un flux zstd au fil de la lecture, sans matérialiser le fichier."""
+    import zstandard
+
+    decompresseur = zstandard.ZstdDecompressor().decompressobj()
+    async for chunk in chunks:
+        sortie = await asyncio.to_thread(decompresseur.decompress, chunk)
+        if sortie:
+            yield sortie
+
+
+def ouvrir_contenu(uri: str, compression: Optional[str] = None) -> AsyncIterator[bytes]:
+    """Flux du contenu original d'un document, décompressé si nécessaire."""
+    flux = get_storage_backend(uri).open(uri)
+    if compression == COMPRESSION_ZSTD:
+        return decompresser_flux(flux)
+    return flux
+
+
+def _supprimer_si_existe(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# Backends instanciés une seule fois par processus (le client S3 porte le pool de connexions)
+_backends: Dict[str, StorageBackend] = {}
+
+
+def _creer_backend(scheme: str) -> StorageBackend:
+    if scheme == StorageBackend.LOCAL:
+        return LocalStorageBackend(settings.DOCUMENTS_STORAGE_PATH)
+    if scheme == StorageBackend.LOCAL_COLD:
+        return LocalStorageBackend(settings.DOCUMENTS_COLD_STORAGE_PATH, scheme=StorageBackend.LOCAL_COLD)
+    if scheme in (StorageBackend.S3, StorageBackend.S3_COLD):
+        froid = scheme == StorageBackend.S3_COLD
+        bucket = (settings.S3_COLD_BUCKET or settings.S3_BUCKET) if froid else settings.S3_BUCKET
+        if not bucket:
+            raise ValueError("❌ S3_BUCKET n'est pas défini dans le fichier .env !")
+        return S3StorageBackend(
+            bucket=bucket,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            access_key=settings.S3_ACCESS_KEY,
+            secret_key=settings.S3_SECRET_KEY,
+            region=settings.S3_REGION,
+            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD,
+            scheme=scheme,
+            storage_class=settings.S3_COLD_STORAGE_CLASS if froid else None,
+        )
+    raise ValueError(f"Backend de stockage inconnu : {scheme}")
+
+
+def get_cold_storage_backend() -> StorageBackend:
+    """Backend du niveau froid (COLD_STORAGE_BACKEND : "cold" sur disque ou "s3cold")."""
+    return get_storage_backend(f"{settings.COLD_STORAGE_BACKEND}://")
+
+
+def get_storage_backend(uri: Optional[str] = None) -> StorageBackend:
+    """
+    Retourne le backend capable de lire `uri` (selon son schéma), ou le backend configuré
+    par défaut (STORAGE_BACKEND) pour les nouvelles écritures.
+    Les chemins historiques sans schéma sont servis par le backend local.
+    """
+    if uri is None:
+        scheme = settings.STORAGE_BACKEND
+    else:
+        scheme = urlparse(uri).scheme
+        if scheme not in (StorageBackend.LOCAL, StorageBackend.LOCAL_COLD, StorageBackend.S3, StorageBackend.S3_COLD):
+            scheme = StorageBackend.LOCAL
+    if scheme not in _backends:
+        _backends[scheme] = _creer_backend(scheme)
+    return _backends[scheme]
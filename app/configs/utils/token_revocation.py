@@ -0,0 +1,86 @@
+import heapq
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.configs.settings import settings
+
+
+class TokenRevocationStore:
+    """
+    Révocation des jetons d'accès par identifiant (claim jti). Une entrée n'a d'intérêt que jusqu'à
+    l'expiration du jeton (claim exp) : elle disparaît ensuite d'elle-même.
+    """
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        raise NotImplementedError
+
+    def is_revoked(self, jti: str) -> bool:
+        raise NotImplementedError
+
+
+class MemoryTokenRevocationStore(TokenRevocationStore):
+    """Révocations en mémoire, propres au processus ; les entrées expirées sont évincées au fil de l'eau."""
+
+    def __init__(self):
+        self._revoques: Dict[str, float] = {}
+        self._echeances: List[Tuple[float, str]] = []  # tas (expiration, jti) pour l'éviction
+        self._lock = threading.Lock()
+
+    def _evincer(self, now: float) -> None:
+        while self._echeances and self._echeances[0][0] <= now:
+            _, jti = heapq.heappop(self._echeances)
+            if self._revoques.get(jti, now + 1) <= now:
+                del self._revoques[jti]
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        now = time.time()
+        if expires_at <= now:
+            return
+        with self._lock:
+            self._evincer(now)
+            self._revoques[jti] = expires_at
+            heapq.heappush(self._echeances, (expires_at, jti))
+
+    def is_revoked(self, jti: str) -> bool:
+        expiration = self._revoques.get(jti)
+        return expiration is not None and expiration > time.time()
+
+
+class RedisTokenRevocationStore(TokenRevocationStore):
+    """Révocations partagées entre les workers : une clé Redis par jeton, expirant avec lui."""
+
+    PREFIX = "jwt:revoque:"
+
+    def __init__(self, client=None):
+        if client is None:
+            from app.configs.utils.redis_client import get_redis
+            client = get_redis()
+        self.client = client
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        ttl = int(expires_at - time.time()) + 1
+        if ttl > 0:
+            self.client.set(f"{self.PREFIX}{jti}", 1, ex=ttl)
+
+    def is_revoked(self, jti: str) -> bool:
+        return bool(self.client.exists(f"{self.PREFIX}{jti}"))
+
+
+_store: Optional[TokenRevocationStore] = None
+_lock = threading.Lock()
+
+
+def get_token_revocation_store() -> TokenRevocationStore:
+    """Stockage configuré (TOKEN_REVOCATION_BACKEND : memory ou redis), partagé par l'application."""
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                if settings.TOKEN_REVOCATION_BACKEND == "redis":
+                    _store = RedisTokenRevocationStore()
+                elif settings.TOKEN_REVOCATION_BACKEND == "memory":
+                    _store = MemoryTokenRevocationStore()
+                else:
+                    raise ValueError(f"Stockage de révocation inconnu : {settings.TOKEN_REVOCATION_BACKEND}")
+    return _store
@@ -0,0 +1,39 @@
+"""
+Ancrage Merkle journalier des documents émis.
+
+Usage : python -m app.jobs.ancrage_merkle [--jusqu-a AAAA-MM-JJ]
+À planifier une fois par jour, après minuit (UTC). Le job est incrémental :
+seuls les documents non encore ancrés sont traités.
+"""
+import argparse
+import logging
+from datetime import date
+
+from app.jobs.common import charger_modeles, configurer_logs
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ancre les checksums des documents dans un arbre de Merkle journalier.")
+    parser.add_argument("--jusqu-a", type=date.fromisoformat, default=None, help="Jour exclu (aujourd'hui par défaut).")
+    args = parser.parse_args()
+
+    configurer_logs()
+    charger_modeles()
+    from app.configs.database import SessionLocal
+    from app.services.documents.merkle_service import MerkleService
+
+    db = SessionLocal()
+    try:
+        result = MerkleService(db).ancrer_documents(args.jusqu_a)
+    finally:
+        db.close()
+    if result["code"] != 200:
+        logger.error(f"❌ {result['message']}")
+        raise SystemExit(1)
+    logger.info(f"✅ {result['message']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Archivage des documents des demandes clôturées au niveau de stockage froid.
+
+Usage : python -m app.jobs.archivage_documents [--jours 30] [--niveau 10]
+Les documents sont compressés en zstd puis déplacés ; la lecture les décompresse à la volée.
+"""
+import argparse
+import logging
+
+from app.jobs.common import charger_modeles, configurer_logs
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compresse et déplace au niveau froid les documents anciens des demandes clôturées.")
+    parser.add_argument("--jours", type=int, default=None, help="Ancienneté minimale en jours (DOCUMENTS_ARCHIVAGE_JOURS par défaut).")
+    parser.add_argument("--niveau", type=int, default=None, help="Niveau de compression zstd (DOCUMENTS_ZSTD_NIVEAU par défaut).")
+    args = parser.parse_args()
+
+    configurer_logs()
+    charger_modeles()
+    from app.configs.database import SessionLocal
+    from app.services.documents.archivage_service import ArchivageService
+
+    db = SessionLocal()
+    try:
+        result = ArchivageService(db, jours=args.jours, niveau=args.niveau).archiver()
+    finally:
+        db.close()
+    if result["code"] != 200:
+        logger.error(f"❌ {result['message']}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import logging
+
+def configurer_logs():
+    """Configuration des logs identique à celle de l'API."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+def charger_modeles():
+    """
+    Importe l'ensemble des modèles afin que les relations déclarées par nom
+    ("Utilisateur", "Session", ...) puissent être résolues hors de l'API.
+    """
+    import app.models.clients.client  # noqa: F401
+    import app.models.clients.otp  # noqa: F401
+    import app.models.clients.session  # noqa: F401
+    import app.models.demandes.demandes  # noqa: F401
+    import app.models.demandes.motif  # noqa: F401
+    import app.models.documents.ancrage  # noqa: F401
+    import app.models.documents.documents  # noqa: F401
+    import app.models.notifications.email_outbox  # noqa: F401
+    import app.models.organisations.centre_etat_civil  # noqa: F401
+    import app.models.organisations.organisations  # noqa: F401
+    import app.models.utilisateurs  # noqa: F401
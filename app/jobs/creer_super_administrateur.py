@@ -0,0 +1,104 @@
+"""
+Création du premier super administrateur d'un déploiement.
+
+Usage : python -m app.jobs.creer_super_administrateur --email admin@exemple.cm --nom NOM --prenom PRENOM
+        --organisation <id, référence ou nom> [--mot-de-passe] [--force]
+La création d'utilisateurs par l'API exige la permission CREER_UTILISATEUR : sur une base neuve, ce job
+crée le rôle SUPER_ADMINISTRATEUR s'il manque, puis le compte. L'organisation doit exister (POST /organisations).
+Par défaut le mot de passe est généré et envoyé par l'email de bienvenue (boîte d'envoi) ; avec --mot-de-passe,
+il est saisi au terminal et aucun email n'est envoyé.
+Sans --force, le job ne fait rien si un super administrateur existe déjà.
+"""
+import argparse
+import getpass
+import logging
+import sys
+
+from app.jobs.common import charger_modeles, configurer_logs
+
+logger = logging.getLogger(__name__)
+
+
+def saisir_mot_de_passe() -> str:
+    mot_de_passe = getpass.getpass("Mot de passe : ")
+    if len(mot_de_passe) < 8:
+        logger.error("❌ Le mot de passe doit contenir au moins 8 caractères")
+        sys.exit(1)
+    if getpass.getpass("Confirmation : ") != mot_de_passe:
+        logger.error("❌ Les mots de passe ne correspondent pas")
+        sys.exit(1)
+    return mot_de_passe
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crée le premier super administrateur (et son rôle s'il manque).")
+    parser.add_argument("--email", required=True, help="Email du super administrateur.")
+    parser.add_argument("--nom", required=True, help="Nom du super administrateur.")
+    parser.add_argument("--prenom", required=True, help="Prénom du super administrateur.")
+    parser.add_argument("--organisation", required=True, help="Organisation de rattachement : id, référence ou nom.")
+    parser.add_argument("--mot-de-passe", action="store_true", help="Saisir le mot de passe au terminal au lieu de l'envoyer par email.")
+    parser.add_argument("--force", action="store_true", help="Créer le compte même si un super administrateur existe déjà.")
+    args = parser.parse_args()
+
+    configurer_logs()
+    charger_modeles()
+    from app.configs.database import SessionLocal
+    from app.configs.enumerations.Comptes import ComptesEnum
+    from app.configs.enumerations.Roles import RoleEnum
+    from app.configs.utils.identifiants import ORGANISATION, ROLE, identifier_resolver
+    from app.configs.utils.password_hasher import password_hasher
+    from app.configs.utils.reference_cache import ROLES, reference_cache
+    from app.models.utilisateurs.role import Role
+    from app.models.utilisateurs.utilisateur import Utilisateur
+    from app.schemas.utilisateurs.utilisateur_schema import UtilisateurCreate
+    from app.services.utilisateurs.utilisateur_service import UtilisateurService
+
+    mot_de_passe = saisir_mot_de_passe() if args.mot_de_passe else None
+
+    db = SessionLocal()
+    try:
+        role = db.query(Role).filter(Role.nom == RoleEnum.SUPER_ADMINISTRATEUR).first()
+        if role is not None and not args.force:
+            existant = db.query(Utilisateur.email).filter(Utilisateur.role_id == role.id).first()
+            if existant is not None:
+                logger.info(f"ℹ️ Un super administrateur existe déjà ({existant[0]}) : rien à faire (--force pour en créer un autre)")
+                return
+
+        organisation_id = identifier_resolver.resoudre(db, ORGANISATION, args.organisation)
+        if organisation_id is None:
+            logger.error(f"❌ Organisation « {args.organisation} » non trouvée : créez-la d'abord (POST /organisations)")
+            sys.exit(1)
+
+        if role is None:
+            role = Role(nom=RoleEnum.SUPER_ADMINISTRATEUR)
+            db.add(role)
+            db.commit()
+            identifier_resolver.invalider(ROLE)
+            reference_cache.invalider(ROLES)
+            logger.info("✅ Rôle SUPER_ADMINISTRATEUR créé")
+
+        donnees = UtilisateurCreate(nom=args.nom, prenom=args.prenom, email=args.email,
+                                    role_id=role.id, organisation_id=organisation_id)
+        if mot_de_passe is None:
+            # Parcours standard : mot de passe généré, envoyé par l'email de bienvenue
+            result = UtilisateurService(db).create_utilisateur(donnees)
+            if result["code"] != 201:
+                logger.error(f"❌ {result['message']}")
+                sys.exit(1)
+            logger.info(f"✅ Super administrateur {args.email} créé, email de bienvenue en file d'envoi")
+            return
+
+        if db.query(Utilisateur.id).filter(Utilisateur.email == args.email).first() is not None:
+            logger.error("❌ L'email est déjà utilisé.")
+            sys.exit(1)
+        db.add(Utilisateur(**donnees.dict(exclude={"status"}), status=ComptesEnum.ACTIF,
+                           mot_de_passe=password_hasher.hash(mot_de_passe)))
+        db.commit()
+        logger.info(f"✅ Super administrateur {args.email} créé")
+    finally:
+        db.close()
+        password_hasher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Worker de la boîte d'envoi des emails, à lancer hors de l'API.
+
+Usage : python -m app.jobs.email_outbox [--une-fois]
+Mettre EMAIL_OUTBOX_WORKER_ENABLED=false pour ne pas démarrer aussi le worker intégré à l'API.
+"""
+import argparse
+
+from app.jobs.common import charger_modeles, configurer_logs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Envoie les emails en attente dans la boîte d'envoi.")
+    parser.add_argument("--une-fois", action="store_true", help="Traiter un seul lot puis s'arrêter.")
+    args = parser.parse_args()
+
+    configurer_logs()
+    charger_modeles()
+    from app.configs.database import SessionLocal
+    from app.services.notifications.email_outbox_service import EmailOutboxWorker
+
+    worker = EmailOutboxWorker(SessionLocal)
+    if args.une_fois:
+        worker.run_once()
+        return
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        worker.stop()
+
+
+if __name__ == "__main__":
+    main()
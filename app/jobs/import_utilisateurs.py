@@ -0,0 +1,54 @@
+"""
+Import en masse d'utilisateurs depuis un fichier CSV ou JSON.
+
+Usage : python -m app.jobs.import_utilisateurs utilisateurs.csv [--taille-lot 500] [--rapport rapport.json]
+Colonnes attendues : nom, prenom, email, role_id, organisation_id, centre_id (facultatif).
+Les emails de bienvenue sont mis en file dans la boîte d'envoi (worker de l'API ou app.jobs.email_outbox).
+"""
+import argparse
+import json
+import logging
+import sys
+
+from app.jobs.common import charger_modeles, configurer_logs
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crée des utilisateurs en masse depuis un fichier CSV ou JSON.")
+    parser.add_argument("fichier", help="Fichier .csv ou .json à importer.")
+    parser.add_argument("--taille-lot", type=int, default=None, help="Utilisateurs par INSERT (UTILISATEURS_IMPORT_BATCH_SIZE par défaut).")
+    parser.add_argument("--rapport", default=None, help="Écrire le rapport ligne par ligne dans ce fichier JSON.")
+    args = parser.parse_args()
+
+    configurer_logs()
+    charger_modeles()
+    from app.configs.database import SessionLocal
+    from app.services.utilisateurs.import_service import UtilisateurImportService
+
+    with open(args.fichier, "rb") as f:
+        try:
+            lignes = UtilisateurImportService.lire_fichier(f.read(), args.fichier)
+        except (ValueError, UnicodeDecodeError) as e:
+            logger.error(f"❌ Fichier invalide : {e}")
+            sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        result = UtilisateurImportService(db, taille_lot=args.taille_lot).importer(lignes)
+    finally:
+        db.close()
+
+    rapport = result["data"]
+    for ligne in rapport.lignes:
+        if ligne.statut != "cree":
+            logger.warning(f"⚠️ Ligne {ligne.ligne} ({ligne.email}) : {ligne.message}")
+    logger.info(f"✅ {result['message']} en {rapport.duree_s} s")
+    if args.rapport:
+        with open(args.rapport, "w", encoding="utf-8") as f:
+            json.dump(rapport.dict(), f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Purge des sessions clients, des OTP et des jetons de rafraîchissement expirés.
+
+Usage : python -m app.jobs.purge_sessions [--batch-size 1000] [--pause 0.2] [--boucle 300]
+Peut être planifié (cron) ou tourner en continu avec --boucle ; plusieurs instances peuvent
+être lancées sans risque : un verrou MySQL (GET_LOCK) garantit qu'une seule purge s'exécute.
+"""
+import argparse
+import json
+import logging
+import time
+
+from app.jobs.common import charger_modeles, configurer_logs
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Supprime par lots les sessions, OTP et jetons de rafraîchissement expirés.")
+    parser.add_argument("--batch-size", type=int, default=None, help="Lignes par lot (PURGE_BATCH_SIZE par défaut).")
+    parser.add_argument("--pause", type=float, default=None, help="Pause entre deux lots en secondes (PURGE_PAUSE_SECONDS par défaut).")
+    parser.add_argument("--boucle", type=float, default=None, help="Relancer la purge toutes les N secondes.")
+    args = parser.parse_args()
+
+    configurer_logs()
+    charger_modeles()
+    from app.configs.database import SessionLocal
+    from app.services.clients.purge_service import PurgeService
+
+    while True:
+        db = SessionLocal()
+        try:
+            result = PurgeService(db, batch_size=args.batch_size, pause=args.pause).purger()
+        finally:
+            db.close()
+        if result["code"] == 200:
+            logger.info(f"📊 {json.dumps(result['data'])}")
+        if args.boucle is None:
+            break
+        time.sleep(args.boucle)
+
+
+if __name__ == "__main__":
+    main()
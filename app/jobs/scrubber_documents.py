@@ -0,0 +1,50 @@
+"""
+Contrôle d'intégrité des documents stockés.
+
+Usage : python -m app.jobs.scrubber_documents [--workers 4] [--processus] [--debit-max-mo 50] [--pause 0.5]
+Le rapport (et le point de reprise) est écrit dans --rapport après chaque lot ;
+relancer la commande reprend là où le passage précédent s'est arrêté.
+"""
+import argparse
+import logging
+
+from app.jobs.common import charger_modeles, configurer_logs
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérifie les checksums des documents et détecte fichiers manquants et orphelins.")
+    parser.add_argument("--rapport", default="scrubber_documents.json", help="Fichier de rapport et de reprise.")
+    parser.add_argument("--lot", type=int, default=500, help="Nombre de documents lus par requête.")
+    parser.add_argument("--workers", type=int, default=4, help="Nombre de fichiers hachés en parallèle.")
+    parser.add_argument("--processus", action="store_true", help="Utiliser un pool de processus plutôt que de threads.")
+    parser.add_argument("--debit-max-mo", type=float, default=None, help="Débit de lecture maximal en Mo/s.")
+    parser.add_argument("--pause", type=float, default=0.0, help="Pause en secondes entre deux lots.")
+    parser.add_argument("--depuis-le-debut", action="store_true", help="Ignorer le point de reprise existant.")
+    args = parser.parse_args()
+
+    configurer_logs()
+    charger_modeles()
+    from app.configs.database import SessionLocal
+    from app.services.documents.scrubber_service import ScrubberService
+
+    db = SessionLocal()
+    try:
+        rapport = ScrubberService(
+            db,
+            checkpoint_path=args.rapport,
+            batch_size=args.lot,
+            workers=args.workers,
+            processus=args.processus,
+            octets_par_seconde=int(args.debit_max_mo * 1024 * 1024) if args.debit_max_mo else None,
+            pause=args.pause,
+        ).executer(reprendre=not args.depuis_le_debut)
+    finally:
+        db.close()
+    if rapport["corrompus"] or rapport["manquants"]:
+        raise SystemExit(2)
+
+
+if __name__ == "__main__":
+    main()
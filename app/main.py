@@ -3,7 +3,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 
-from app.configs.database import init_db
+from app.configs.database import init_db, SessionLocal
+from app.configs.settings import settings
+from app.configs.utils.email_templates import email_templates
+from app.configs.utils.event_bus import close_event_bus
+from app.configs.utils.password_hasher import password_hasher
+from app.configs.utils.redis_client import close_redis
+from app.configs.utils.reference_cache import reference_cache
+from app.configs.utils.session_revocation import session_revocations
+from app.configs.utils.sms_service import sms_service
+from app.services.notifications.email_outbox_service import EmailOutboxWorker
 
 # Importation des routes
 from app.routes.clients.client_routes import router as client_router
@@ -17,6 +26,8 @@ from app.routes.utilisateurs.permission_routes import router as permission_route
 from app.routes.utilisateurs.utilisateur_routes import router as utilisateur_router  # Importer la route pour les utilisateurs
 from app.routes.demandes.demande_routes import router as demande_routes  # Importer la route pour les utilisateurs
 from app.routes.demandes.motif_routes import router as motif_routes  # Importer la route pour les utilisateurs
+from app.routes.documents.document_routes import router as document_router  # Importer la route pour les documents
+from app.routes.verification import router as verification_router  # Importer la route de vérification des documents
 
 # Configuration du logger
 logging.basicConfig(
@@ -35,7 +46,47 @@ async def lifespan(app: FastAPI):
         logger.info("✅ Base de données initialisée avec succès")
     except Exception as e:
         logger.error(f"❌ Erreur lors de l'initialisation de la base de données: {e}")
+
+    # Chargement des sessions révoquées et abonnement aux révocations des autres processus
+    try:
+        db = SessionLocal()
+        try:
+            session_revocations.start(db)
+        finally:
+            db.close()
+    except Exception as e:
+        logger.error(f"❌ Erreur lors du chargement des sessions révoquées: {e}")
+
+    # Préchargement des données de référence (motifs, rôles, permissions, organisations, centres)
+    try:
+        db = SessionLocal()
+        try:
+            reference_cache.prechauffer(db)
+        finally:
+            db.close()
+    except Exception as e:
+        logger.error(f"❌ Erreur lors du préchargement des données de référence: {e}")
+
+    # Compilation des templates d'email une fois pour toutes
+    try:
+        email_templates.precompiler()
+    except Exception as e:
+        logger.error(f"❌ Erreur lors de la compilation des templates d'email: {e}")
+
+    if not sms_service.disponible:
+        logger.warning("⚠️ Aucun fournisseur SMS configuré (SMS_PROVIDER=log) : les OTP par SMS ne seront pas envoyés")
+
+    # Worker d'envoi des emails mis en file par les requêtes
+    email_worker = EmailOutboxWorker(SessionLocal) if settings.EMAIL_OUTBOX_WORKER_ENABLED else None
+    if email_worker:
+        email_worker.start()
     yield  # Actions supplémentaires peuvent être ajoutées ici
+    if email_worker:
+        email_worker.stop()
+    sms_service.close()
+    password_hasher.close()
+    close_event_bus()
+    close_redis()
 
 # Création de l'application FastAPI
 app = FastAPI(
@@ -70,6 +121,8 @@ app.include_router(permission_router)  # Inclusion des routes pour les permissio
 app.include_router(utilisateur_router)  # Inclusion des routes pour les utilisateurs
 app.include_router(demande_routes)  # Inclusion des routes pour les utilisateurs
 app.include_router(motif_routes)  # Inclusion des routes pour les utilisateurs
+app.include_router(document_router)  # Inclusion des routes pour les documents
+app.include_router(verification_router)  # Inclusion des routes de vérification des documents
 
 # Endpoint racine
 @app.get("/", tags=["Root"])
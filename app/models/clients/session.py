@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timedelta
 from app.configs.database import Base
@@ -13,3 +13,8 @@ class Session(Base):
     expires_at = Column(DateTime, default=lambda: datetime.utcnow() + timedelta(hours=2), index=True)
     client = relationship("Client", back_populates="sessions")
     otp = relationship("OTP", back_populates="session", uselist=False, cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Historique des sessions d'un client par catégorie (active / inactive, expirée ou non)
+        Index("ix_clients_sessions_client_actif_expiration", "client_id", "is_active", "expires_at"),
+    )
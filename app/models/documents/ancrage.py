@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, UniqueConstraint, func
+from sqlalchemy.orm import relationship
+from app.configs.database import Base
+
+class AncrageMerkle(Base):
+    """
+    Racine Merkle signée regroupant les checksums des documents émis un jour donné.
+    Un même jour peut avoir plusieurs lots si des documents arrivent après l'ancrage.
+    """
+    __tablename__ = "documents_ancrages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    jour = Column(Date, nullable=False, index=True)
+    lot = Column(Integer, nullable=False, default=1)
+    racine = Column(String(64), nullable=False)
+    signature = Column(String(64), nullable=False)
+    nb_feuilles = Column(Integer, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    documents = relationship("Document", back_populates="ancrage")
+
+    __table_args__ = (
+        UniqueConstraint("jour", "lot", name="unique_jour_lot"),
+    )
+
+    def __repr__(self):
+        return f"<AncrageMerkle {self.jour} lot {self.lot} - {self.racine}>"
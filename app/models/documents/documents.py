@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy.orm import relationship, backref
 from datetime import datetime
 from app.configs.database import Base
 
@@ -12,7 +12,17 @@ class Document(Base):
     file_type = Column(String(100), nullable=False)
     file_size = Column(Integer, nullable=False)
     checksum = Column(String(255), nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Archivage au niveau froid : file_size et checksum décrivent toujours le contenu original
+    compression = Column(String(20), nullable=True)
+    stored_size = Column(Integer, nullable=True)
+    archived_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    demande = relationship("Demande", back_populates="document")
+    # Ancrage Merkle journalier (renseigné par le job d'ancrage, jamais par l'API)
+    ancrage_id = Column(Integer, ForeignKey("documents_ancrages.id", ondelete="SET NULL"), nullable=True, index=True)
+    merkle_index = Column(Integer, nullable=True)
+    merkle_preuve = Column(Text, nullable=True)
+
+    demande = relationship("DemandeBase", backref=backref("document", uselist=False))
+    ancrage = relationship("AncrageMerkle", back_populates="documents")
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Index, Enum as SQLAlchemyEnum
+from datetime import datetime
+from app.configs.database import Base
+from app.configs.enumerations.Emails import EmailStatusEnum
+
+class EmailOutbox(Base):
+    """
+    File d'attente transactionnelle des emails : les requêtes se contentent d'insérer une ligne,
+    l'envoi SMTP est réalisé par le worker de la boîte d'envoi.
+    """
+    __tablename__ = "emails_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    destinataire = Column(String(255), nullable=False)
+    sujet = Column(String(255), nullable=False)
+    corps = Column(Text, nullable=True)  # Vidé après envoi ou échec définitif (peut contenir un mot de passe ou un OTP)
+    corps_texte = Column(Text, nullable=True)  # Alternative texte d'un corps HTML, vidée de même
+    html = Column(Boolean, default=False, nullable=False)
+    statut = Column(SQLAlchemyEnum(EmailStatusEnum), nullable=False, default=EmailStatusEnum.EN_ATTENTE)
+    tentatives = Column(Integer, nullable=False, default=0)
+    prochaine_tentative = Column(DateTime, nullable=False, default=datetime.utcnow)
+    derniere_erreur = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_emails_outbox_statut_prochaine_tentative", "statut", "prochaine_tentative"),
+    )
+
+    def __repr__(self):
+        return f"<EmailOutbox {self.id} - {self.destinataire} - {self.statut}>"
@@ -1,4 +1,5 @@
 from app.models.utilisateurs.permission import Permission
+from app.models.utilisateurs.refresh_token import RefreshToken
 from app.models.utilisateurs.role import Role
 from app.models.utilisateurs.utilisateur import Utilisateur
 from app.models.utilisateurs.relations import role_permissions, user_permissions
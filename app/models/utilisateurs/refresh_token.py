@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from datetime import datetime
+from app.configs.database import Base
+
+class RefreshToken(Base):
+    """
+    Jeton de rafraîchissement d'un utilisateur. Seule l'empreinte SHA-256 du jeton opaque est stockée.
+    Chaque utilisation le remplace par un nouveau jeton de la même famille ; la réutilisation d'un jeton
+    déjà remplacé révoque toute la famille (jeton probablement volé).
+    """
+    __tablename__ = "utilisateurs_refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    utilisateur_id = Column(Integer, ForeignKey("utilisateurs.id", ondelete="CASCADE"), nullable=False, index=True)
+    famille = Column(String(32), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    utilise_le = Column(DateTime, nullable=True)  # Renseigné quand le jeton est remplacé
+    revoque_le = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<RefreshToken {self.id} - Utilisateur {self.utilisateur_id} - Famille {self.famille}>"
@@ -10,6 +10,8 @@ class Role(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     nom = Column(SQLAlchemyEnum(RoleEnum), nullable=False)
+    # Incrémentée à chaque changement des permissions du rôle : invalide les jetons émis avant
+    permissions_epoch = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func, Enum as SQLAlchemyEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, func, Enum as SQLAlchemyEnum
 from sqlalchemy.orm import relationship
 from app.configs.database import Base
 from app.configs.enumerations.Comptes import ComptesEnum
@@ -12,6 +12,8 @@ class Utilisateur(Base):
     email = Column(String(255), unique=True, nullable=False)
     mot_de_passe = Column(String(255), nullable=False)
     status = Column(SQLAlchemyEnum(ComptesEnum), nullable=False, default=ComptesEnum.ACTIF)
+    # Incrémentée à chaque changement de droits (rôle, permissions, statut, affectations) : invalide les jetons émis avant
+    permissions_epoch = Column(Integer, nullable=False, default=0, server_default="0")
 
     date_creation = Column(DateTime, server_default=func.now(), nullable=False)
     date_modification = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -39,6 +41,14 @@ class Utilisateur(Base):
     centre_affecte_par_id = Column(Integer, ForeignKey("utilisateurs.id", ondelete="SET NULL"), nullable=True)
     date_affectation_centre = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        # Annuaire (/utilisateurs/recherche) : pagination par clé (nom, id), seule ou après un filtre d'égalité
+        Index("ix_utilisateurs_nom_id", "nom", "id"),
+        Index("ix_utilisateurs_organisation_nom_id", "organisation_id", "nom", "id"),
+        Index("ix_utilisateurs_centre_nom_id", "centre_id", "nom", "id"),
+        Index("ix_utilisateurs_role_nom_id", "role_id", "nom", "id"),
+    )
+
     def affecter_centre(self, centre_id, utilisateur_id):
         """Attribue un centre à un utilisateur et enregistre l'affectation"""
         self.centre_id = centre_id
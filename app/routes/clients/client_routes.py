@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.configs.database import get_db
+from app.configs.utils.rate_limiter import RateLimit
+from app.configs.settings import settings
 from app.schemas.clients.client_schema import ClientCreate
 from app.services.clients.client_services import ClientService
 
@@ -9,7 +11,11 @@ router = APIRouter(
     tags=["Clients"]
 )
 
-@router.post("", summary="Créer un client", description="Crée un nouveau client ou retourne un client existant.")
+# Chaque création de client ouvre une session et émet un OTP
+limite_otp = RateLimit("otp", ip=settings.RATE_LIMIT_OTP_IP, client=settings.RATE_LIMIT_OTP_CLIENT)
+
+@router.post("", summary="Créer un client", description="Crée un nouveau client ou retourne un client existant.",
+             dependencies=[Depends(limite_otp)])
 def create_client(client_in: ClientCreate, db: Session = Depends(get_db)):
     service = ClientService(db)
     response = service.create_client(client_in)
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.configs.database import get_db
+from app.configs.utils.rate_limiter import RateLimit
+from app.configs.settings import settings
 from app.services.clients.otp_services import OTPService
 
 router = APIRouter(
@@ -8,7 +10,11 @@ router = APIRouter(
     tags=["OTP"]
 )
 
-@router.post("/{session_id}", summary="Créer un OTP pour une session", description="Génère un OTP pour une session client.")
+limite_otp = RateLimit("otp", ip=settings.RATE_LIMIT_OTP_IP, session=settings.RATE_LIMIT_OTP_SESSION)
+limite_verification = RateLimit("verification", ip=settings.RATE_LIMIT_VERIFY_IP, session=settings.RATE_LIMIT_VERIFY_SESSION)
+
+@router.post("/{session_id}", summary="Créer un OTP pour une session", description="Génère un OTP pour une session client.",
+             dependencies=[Depends(limite_otp)])
 def create_otp_for_session(session_id: int, db: Session = Depends(get_db)):
     service = OTPService(db)
     response = service.create_otp_for_session(session_id)
@@ -24,7 +30,8 @@ def get_otp_by_session_id(session_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=response["code"], detail=response["message"])
     return response
 
-@router.post("/{session_id}/validate", summary="Valider un OTP", description="Vérifie si un OTP est valide pour une session.")
+@router.post("/{session_id}/validate", summary="Valider un OTP", description="Vérifie si un OTP est valide pour une session.",
+             dependencies=[Depends(limite_verification)])
 def validate_otp(session_id: int, otp_code: str, db: Session = Depends(get_db)):
     service = OTPService(db)
     response = service.validate_otp(session_id, otp_code)
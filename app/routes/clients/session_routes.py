@@ -1,6 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.configs.database import get_db
+from app.configs.utils.dependencies import verify_client_session
+from app.configs.utils.rate_limiter import RateLimit
+from app.configs.settings import settings
 from app.schemas.clients.session_schema import SessionCreate
 from app.services.clients.session_services import SessionService
 
@@ -9,7 +14,11 @@ router = APIRouter(
     tags=["Sessions"]
 )
 
-@router.post("", summary="Créer une session", description="Crée une nouvelle session pour un client.")
+limite_otp = RateLimit("otp", ip=settings.RATE_LIMIT_OTP_IP, client=settings.RATE_LIMIT_OTP_CLIENT)
+limite_verification = RateLimit("verification", ip=settings.RATE_LIMIT_VERIFY_IP, session=settings.RATE_LIMIT_VERIFY_SESSION)
+
+@router.post("", summary="Créer une session", description="Crée une nouvelle session pour un client.",
+             dependencies=[Depends(limite_otp)])
 def create_session(session_in: SessionCreate, db: Session = Depends(get_db)):
     service = SessionService(db)
     response = service.create_session(session_in)
@@ -17,7 +26,8 @@ def create_session(session_in: SessionCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=response["code"], detail=response["message"])
     return response
 
-@router.post("/{session_id}/activate", summary="Activer une session", description="Active une session avec un OTP.")
+@router.post("/{session_id}/activate", summary="Activer une session", description="Active une session avec un OTP.",
+             dependencies=[Depends(limite_verification)])
 def activate_session(session_id: int, otp_code: str, db: Session = Depends(get_db)):
     service = SessionService(db)
     response = service.activate_session(session_id, otp_code)
@@ -25,6 +35,27 @@ def activate_session(session_id: int, otp_code: str, db: Session = Depends(get_d
         raise HTTPException(status_code=response["code"], detail=response["message"])
     return response
 
+@router.get("/courante", summary="Session courante", description="Retourne la session du jeton présenté, sans lecture en base.")
+def get_current_session(payload: dict = Depends(verify_client_session)):
+    return {
+        "code": 200,
+        "message": "Session courante.",
+        "data": {
+            "session_id": payload["sid"],
+            "client_id": payload.get("cid"),
+            "identifiant": payload.get("email"),
+            "expires_at": datetime.utcfromtimestamp(payload["exp"]),
+        },
+    }
+
+@router.post("/courante/deconnexion", summary="Déconnexion", description="Désactive la session du jeton présenté et révoque ses jetons.")
+def deactivate_current_session(payload: dict = Depends(verify_client_session), db: Session = Depends(get_db)):
+    service = SessionService(db)
+    response = service.deactivate_session(payload["sid"])
+    if response["code"] != 200:
+        raise HTTPException(status_code=response["code"], detail=response["message"])
+    return response
+
 @router.get("/{session_id}", summary="Obtenir une session", description="Retourne une session via son identifiant.")
 def get_session_by_id(session_id: int, db: Session = Depends(get_db)):
     service = SessionService(db)
@@ -33,10 +64,19 @@ def get_session_by_id(session_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=response["code"], detail=response["message"])
     return response
 
-@router.get("/client/{client_id}", summary="Obtenir les sessions d'un client", description="Retourne toutes les sessions d'un client.")
-def get_sessions_by_client(client_id: int, db: Session = Depends(get_db)):
+@router.get("/client/{client_id}", summary="Obtenir les sessions d'un client",
+            description="Retourne le nombre de sessions actives, expirées et inactives d'un client, et une page de chaque catégorie.")
+def get_sessions_by_client(
+    client_id: int,
+    statut: Optional[str] = Query(None, description="Catégorie à lister : actives, expirées ou inactives"),
+    page: int = Query(1, ge=1),
+    taille: int = Query(20, ge=1, le=100),
+    du: Optional[datetime] = Query(None, description="Sessions créées à partir de cette date"),
+    au: Optional[datetime] = Query(None, description="Sessions créées avant cette date"),
+    db: Session = Depends(get_db),
+):
     service = SessionService(db)
-    response = service.get_sessions_by_client(client_id)
+    response = service.get_sessions_by_client(client_id, statut, page, taille, du, au)
     if response["code"] != 200:
         raise HTTPException(status_code=response["code"], detail=response["message"])
     return response
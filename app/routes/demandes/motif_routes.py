@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Request
 from sqlalchemy.orm import Session
 from app.configs.database import get_db
+from app.configs.utils.reference_cache import MOTIFS, reference_cache
 from app.schemas.demandes.motif_schema import MotifCreate, MotifRead
 from app.services.demandes.motif_service import MotifService
 
@@ -26,12 +27,9 @@ def get_motif_by_id(motif_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=response["code"], detail=response["message"])
     return response["data"]
 
-@router.get("", summary="Obtenir tous les motifs", response_model=list[MotifRead])
-def get_all_motifs(db: Session = Depends(get_db)):
-    response = MotifService.get_all_motifs(db)
-    if response["code"] != 200:
-        raise HTTPException(status_code=response["code"], detail=response["message"])
-    return response["data"]
+@router.get("", summary="Obtenir tous les motifs", description="Liste servie depuis le cache des données de référence (ETag / Cache-Control)", response_model=list[MotifRead])
+def get_all_motifs(request: Request, db: Session = Depends(get_db)):
+    return reference_cache.reponse(request, db, MOTIFS)
 
 @router.delete("/{motif_id}", summary="Supprimer un motif")
 def delete_motif(motif_id: int, db: Session = Depends(get_db)):
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.configs.database import get_db
+from app.configs.enumerations.Persmissions import PermissionEnum
+from app.configs.utils.dependencies import require_permission
+from app.services.documents.document_service import DocumentService
+
+router = APIRouter(
+    prefix="/documents",
+    tags=["Documents"]
+)
+
+@router.post("/{demande_id}", summary="Enregistrer le document d'une demande", description="Stocke le fichier sur le backend configuré (disque local ou S3) et enregistre son URI.", dependencies=[Depends(require_permission(PermissionEnum.CREER_DOCUMENT))])
+async def enregistrer_document(demande_id: int, fichier: UploadFile = File(...), db: Session = Depends(get_db)):
+    response = await DocumentService(db).enregistrer_document(demande_id, fichier)
+    if response["code"] != 201:
+        raise HTTPException(status_code=response["code"], detail=response["message"])
+    return response
+
+@router.get("/{document_id}/contenu", summary="Télécharger un document", description="Retourne le contenu du document en streaming.", dependencies=[Depends(require_permission(PermissionEnum.LIRE_DOCUMENT))])
+async def telecharger_document(document_id: int, db: Session = Depends(get_db)):
+    service = DocumentService(db)
+    response = await run_in_threadpool(service.get_document, document_id)
+    if response["code"] != 200:
+        raise HTTPException(status_code=response["code"], detail=response["message"])
+    document = response["data"]
+    return StreamingResponse(
+        service.ouvrir_document(document),
+        media_type=document.file_type,
+        headers={"Content-Length": str(document.file_size)},
+    )
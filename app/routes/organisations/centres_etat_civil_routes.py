@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from app.configs.database import get_db
+from app.configs.utils.reference_cache import CENTRES, reference_cache
 from app.schemas.organisations.centre_etat_civil_schema import CentreEtatCivilCreate
 from app.services.organisations.centre_etat_civil_service import CentreEtatCivilService
 
@@ -23,9 +24,9 @@ def get_centre_by_id(centre_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=response["code"], detail=response["message"])
     return response
 
-@router.get("", summary="Obtenir tous les centres", description="Retourne la liste de tous les centres d'état civil.")
-def get_all_centres(db: Session = Depends(get_db)):
-    return CentreEtatCivilService.get_all_centres(db)
+@router.get("", summary="Obtenir tous les centres", description="Retourne la liste de tous les centres d'état civil (depuis le cache des données de référence, avec ETag / Cache-Control).")
+def get_all_centres(request: Request, db: Session = Depends(get_db)):
+    return reference_cache.reponse(request, db, CENTRES)
 
 @router.put("/{centre_id}", summary="Mettre à jour un centre", description="Met à jour les informations d'un centre d'état civil existant.")
 def update_centre(centre_id: int, updates: dict, db: Session = Depends(get_db)):
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from app.configs.database import get_db
+from app.configs.utils.reference_cache import ORGANISATIONS, reference_cache
 from app.schemas.organisations.organisation_schema import OrganisationCreate
 from app.services.organisations.organisation_service import OrganisationService
 
@@ -23,9 +24,9 @@ def get_organisation_by_id(organisation_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=response["code"], detail=response["message"])
     return response
 
-@router.get("", summary="Obtenir toutes les organisations", description="Retourne la liste de toutes les organisations.")
-def get_all_organisations(db: Session = Depends(get_db)):
-    return OrganisationService.get_all_organisations(db)
+@router.get("", summary="Obtenir toutes les organisations", description="Retourne la liste de toutes les organisations (depuis le cache des données de référence, avec ETag / Cache-Control).")
+def get_all_organisations(request: Request, db: Session = Depends(get_db)):
+    return reference_cache.reponse(request, db, ORGANISATIONS)
 
 @router.put("/{organisation_id}", summary="Mettre à jour une organisation", description="Met à jour les informations d'une organisation existante.")
 def update_organisation(organisation_id: int, updates: dict, db: Session = Depends(get_db)):
@@ -1,6 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Body, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.configs.database import get_db
+from app.configs.enumerations.Persmissions import PermissionEnum
+from app.configs.utils.dependencies import require_permission
+from app.configs.utils.password_hasher import password_hasher
 from app.schemas.utilisateurs.utilisateur_schema import UtilisateurRead
 from app.services.utilisateurs.auth_service import AuthService
 
@@ -10,15 +14,24 @@ router = APIRouter(
 )
 
 @router.post("/login", summary="Authentifier un utilisateur", description="Authentifie un utilisateur avec son email et mot de passe.")
-def login_user(email: str, password: str, db: Session = Depends(get_db)):
-    response = AuthService.authenticate_user(db, email, password)
+async def login_user(email: str, password: str, db: Session = Depends(get_db)):
+    response = await AuthService.authenticate_user_async(db, email, password)
+    if response["code"] == 503:
+        raise HTTPException(status_code=503, detail=response["message"], headers={"Retry-After": "1"})
     if response["code"] != 200:
         raise HTTPException(status_code=response["code"], detail=response["message"])
     return response
 
-@router.post("/logout", summary="Déconnexion d'un utilisateur", description="Déconnecte un utilisateur en invalidant son token.")
-def logout_user(user_id: str, token: str, db: Session = Depends(get_db)):
-    response = AuthService.logout_user(user_id, token)
+@router.post("/refresh", summary="Renouveler le token d'accès", description="Échange un jeton de rafraîchissement contre un nouveau token d'accès et un nouveau jeton de rafraîchissement (l'ancien devient inutilisable).")
+def refresh_token(refresh_token: str = Body(..., embed=True), db: Session = Depends(get_db)):
+    response = AuthService.refresh_access_token(db, refresh_token)
+    if response["code"] != 200:
+        raise HTTPException(status_code=response["code"], detail=response["message"])
+    return response
+
+@router.post("/logout", summary="Déconnexion d'un utilisateur", description="Déconnecte un utilisateur en invalidant son token et, s'il est fourni, son jeton de rafraîchissement.")
+def logout_user(user_id: str, token: str, refresh_token: Optional[str] = Body(None, embed=True), db: Session = Depends(get_db)):
+    response = AuthService.logout_user(user_id, token, db, refresh_token)
     if response["code"] != 200:
         raise HTTPException(status_code=response["code"], detail=response["message"])
     return response
@@ -27,3 +40,8 @@ def logout_user(user_id: str, token: str, db: Session = Depends(get_db)):
 def check_token(user_id: str, token: str, db: Session = Depends(get_db)):
     is_blacklisted = AuthService.is_token_blacklisted(user_id, token)
     return {"blacklisted": is_blacklisted}
+
+@router.get("/hachage/statistiques", summary="Statistiques du pool de hachage", description="Profondeur de la file de hachage des mots de passe, rejets et temps moyens.",
+            dependencies=[Depends(require_permission(PermissionEnum.CONSULTER_STATISTIQUES))])
+def password_hasher_stats():
+    return {"code": 200, "message": "Statistiques du pool de hachage", "data": password_hasher.stats()}
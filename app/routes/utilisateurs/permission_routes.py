@@ -1,7 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from app.configs.database import get_db
+from app.configs.enumerations.Persmissions import PermissionEnum
+from app.configs.utils.dependencies import require_permission
+from app.configs.utils.reference_cache import PERMISSIONS, reference_cache
+from app.schemas.utilisateurs.attribution_schema import AttributionPermissions, AttributionRapport
 from app.schemas.utilisateurs.permission_schema import PermissionCreate, PermissionRead
+from app.services.utilisateurs.attribution_service import AttributionService
 from app.services.utilisateurs.permission_service import PermissionService
 
 router = APIRouter(
@@ -9,7 +15,7 @@ router = APIRouter(
     tags=["Permissions"]
 )
 
-@router.post("", summary="Créer une permission", description="Crée une nouvelle permission.")
+@router.post("", summary="Créer une permission", description="Crée une nouvelle permission.", dependencies=[Depends(require_permission(PermissionEnum.ASSIGNER_PERMISSION))])
 def create_permission(permission_data: PermissionCreate, db: Session = Depends(get_db)):
     response = PermissionService.create_permission(db, permission_data)
     if response["code"] != 201:
@@ -23,21 +29,34 @@ def get_permission_by_id(permission_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=response["code"], detail=response["message"])
     return response
 
-@router.get("", summary="Obtenir toutes les permissions", description="Retourne une liste de toutes les permissions.")
-def get_all_permissions(db: Session = Depends(get_db)):
-    response = PermissionService.get_all_permissions(db)
-    return response
+@router.get("", summary="Obtenir toutes les permissions", description="Retourne une liste de toutes les permissions (depuis le cache des données de référence, avec ETag / Cache-Control).")
+def get_all_permissions(request: Request, db: Session = Depends(get_db)):
+    return reference_cache.reponse(request, db, PERMISSIONS)
 
-@router.put("/{permission_id}", summary="Mettre à jour une permission", description="Met à jour une permission existante.")
+@router.put("/{permission_id}", summary="Mettre à jour une permission", description="Met à jour une permission existante.", dependencies=[Depends(require_permission(PermissionEnum.ASSIGNER_PERMISSION))])
 def update_permission(permission_id: int, updates: dict, db: Session = Depends(get_db)):
     response = PermissionService.update_permission(db, permission_id, updates)
     if response["code"] != 200:
         raise HTTPException(status_code=response["code"], detail=response["message"])
     return response
 
-@router.delete("/{permission_id}", summary="Supprimer une permission", description="Supprime une permission par son identifiant.")
+@router.delete("/{permission_id}", summary="Supprimer une permission", description="Supprime une permission par son identifiant.", dependencies=[Depends(require_permission(PermissionEnum.ASSIGNER_PERMISSION))])
 def delete_permission(permission_id: int, db: Session = Depends(get_db)):
     response = PermissionService.delete_permission(db, permission_id)
     if response["code"] != 200:
         raise HTTPException(status_code=response["code"], detail=response["message"])
     return response
+
+@router.post("/{type_cible}/accorder", response_model=AttributionRapport, summary="Accorder des permissions en masse", description="Accorde toutes les permissions listées à tous les utilisateurs ou rôles listés ; les permissions déjà présentes sont laissées telles quelles. Retourne la différence par cible.", dependencies=[Depends(require_permission(PermissionEnum.ASSIGNER_PERMISSION))])
+def accorder_permissions(type_cible: Literal["utilisateurs", "roles"], attribution: AttributionPermissions, db: Session = Depends(get_db)):
+    response = AttributionService.accorder(db, type_cible, attribution.cibles, attribution.permissions)
+    if response["code"] != 200:
+        raise HTTPException(status_code=response["code"], detail=response["message"])
+    return response["data"]
+
+@router.post("/{type_cible}/retirer", response_model=AttributionRapport, summary="Retirer des permissions en masse", description="Retire toutes les permissions listées de tous les utilisateurs ou rôles listés ; les permissions déjà absentes sont ignorées. Retourne la différence par cible.", dependencies=[Depends(require_permission(PermissionEnum.ASSIGNER_PERMISSION))])
+def retirer_permissions(type_cible: Literal["utilisateurs", "roles"], attribution: AttributionPermissions, db: Session = Depends(get_db)):
+    response = AttributionService.retirer(db, type_cible, attribution.cibles, attribution.permissions)
+    if response["code"] != 200:
+        raise HTTPException(status_code=response["code"], detail=response["message"])
+    return response["data"]
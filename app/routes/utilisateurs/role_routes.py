@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from app.configs.database import get_db
+from app.configs.enumerations.Persmissions import PermissionEnum
+from app.configs.utils.dependencies import require_permission
+from app.configs.utils.reference_cache import ROLES, reference_cache
 from app.schemas.utilisateurs.role_schema import RoleCreate, RoleRead
 from app.services.utilisateurs.role_service import RoleService
 
@@ -9,7 +12,7 @@ router = APIRouter(
     tags=["Roles"]
 )
 
-@router.post("", summary="Créer un rôle", response_model=RoleRead)
+@router.post("", summary="Créer un rôle", response_model=RoleRead, dependencies=[Depends(require_permission(PermissionEnum.CREER_ROLE))])
 def create_role(role_in: RoleCreate, db: Session = Depends(get_db)):
     response = RoleService.create_role(db, role_in)
     if response["code"] != 201:
@@ -23,28 +26,25 @@ def get_role_by_id(role_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=response["code"], detail=response["message"])
     return response["data"]
 
-@router.get("", summary="Obtenir tous les rôles", response_model=list[RoleRead])
-def get_all_roles(db: Session = Depends(get_db)):
-    response = RoleService.get_all_roles(db)
-    if response["code"] != 200:
-        raise HTTPException(status_code=response["code"], detail=response["message"])
-    return response["data"]
+@router.get("", summary="Obtenir tous les rôles", description="Liste servie depuis le cache des données de référence (ETag / Cache-Control)", response_model=list[RoleRead])
+def get_all_roles(request: Request, db: Session = Depends(get_db)):
+    return reference_cache.reponse(request, db, ROLES)
 
-@router.put("/{role_id}/permissions", summary="Assigner des permissions à un rôle", response_model=RoleRead)
+@router.put("/{role_id}/permissions", summary="Assigner des permissions à un rôle", response_model=RoleRead, dependencies=[Depends(require_permission(PermissionEnum.ASSIGNER_PERMISSION))])
 def assign_permissions_to_role(role_id: int, permission_ids: list[int], db: Session = Depends(get_db)):
     response = RoleService.assign_permissions_to_role(db, role_id, permission_ids)
     if response["code"] != 200:
         raise HTTPException(status_code=response["code"], detail=response["message"])
     return response["data"]
 
-@router.put("/{role_id}/permissions/remove", summary="Retirer des permissions d'un rôle", response_model=RoleRead)
+@router.put("/{role_id}/permissions/remove", summary="Retirer des permissions d'un rôle", response_model=RoleRead, dependencies=[Depends(require_permission(PermissionEnum.ASSIGNER_PERMISSION))])
 def remove_permissions_from_role(role_id: int, permission_ids: list[int], db: Session = Depends(get_db)):
     response = RoleService.remove_permissions_from_role(db, role_id, permission_ids)
     if response["code"] != 200:
         raise HTTPException(status_code=response["code"], detail=response["message"])
     return response["data"]
 
-@router.delete("/{role_id}", summary="Supprimer un rôle")
+@router.delete("/{role_id}", summary="Supprimer un rôle", dependencies=[Depends(require_permission(PermissionEnum.SUPPRIMER_ROLE))])
 def delete_role(role_id: int, db: Session = Depends(get_db)):
     response = RoleService.delete_role(db, role_id)
     if response["code"] != 200:
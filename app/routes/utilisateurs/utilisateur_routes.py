@@ -1,14 +1,18 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Body
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Body, File, Query, UploadFile
 from sqlalchemy.orm import Session
 from app.configs.database import get_db
+from app.configs.settings import settings
 from app.configs.enumerations.Comptes import ComptesEnum
-from app.schemas.utilisateurs.utilisateur_schema import UtilisateurCreate, UtilisateurRead
+from app.configs.enumerations.Persmissions import PermissionEnum
+from app.configs.utils.dependencies import require_permission
+from app.schemas.utilisateurs.utilisateur_schema import UtilisateurCreate, UtilisateurImportRapport, UtilisateurPage, UtilisateurRead
+from app.services.utilisateurs.import_service import UtilisateurImportService
 from app.services.utilisateurs.utilisateur_service import UtilisateurService
 
 router = APIRouter(prefix="/utilisateurs", tags=["Utilisateurs"])
 
-@router.post("/", response_model=UtilisateurRead, summary="Créer un utilisateur", description="Créer un nouvel utilisateur et envoyer un email de bienvenue")
+@router.post("/", response_model=UtilisateurRead, summary="Créer un utilisateur", description="Créer un nouvel utilisateur et envoyer un email de bienvenue", dependencies=[Depends(require_permission(PermissionEnum.CREER_UTILISATEUR))])
 def create_utilisateur(utilisateur_data: UtilisateurCreate = Body(..., example={
     "nom": "Doe",
     "prenom": "John",
@@ -17,55 +21,78 @@ def create_utilisateur(utilisateur_data: UtilisateurCreate = Body(..., example={
     "organisation_id": 1,
     "status": ComptesEnum.ACTIF
 }), db: Session = Depends(get_db)):
-    # Permission: CREER_UTILISATEUR
     service = UtilisateurService(db)
     result = service.create_utilisateur(utilisateur_data)
     if result["code"] != 201:
         raise HTTPException(status_code=result["code"], detail=result["message"])
     return result["data"]
 
-@router.get("/{param}", response_model=UtilisateurRead, summary="Obtenir un utilisateur", description="Obtenir un utilisateur par ID ou par email")
+@router.post("/import", response_model=UtilisateurImportRapport, summary="Importer des utilisateurs", description="Créer des utilisateurs en masse depuis un fichier CSV ou JSON (nom, prenom, email, role_id, organisation_id, centre_id) ; les emails de bienvenue sont mis en file et le rapport donne le résultat de chaque ligne", dependencies=[Depends(require_permission(PermissionEnum.CREER_UTILISATEUR, PermissionEnum.IMPORTER_DONNEES))])
+def import_utilisateurs(fichier: UploadFile = File(...), db: Session = Depends(get_db)):
+    try:
+        lignes = UtilisateurImportService.lire_fichier(fichier.file.read(), fichier.filename or "")
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Fichier invalide : {e}")
+    if len(lignes) > settings.UTILISATEURS_IMPORT_MAX_LIGNES:
+        raise HTTPException(status_code=413, detail=f"Fichier trop volumineux : {settings.UTILISATEURS_IMPORT_MAX_LIGNES} lignes maximum (utiliser la commande app.jobs.import_utilisateurs)")
+    result = UtilisateurImportService(db).importer(lignes)
+    if result["code"] != 200:
+        raise HTTPException(status_code=result["code"], detail=result["message"])
+    return result["data"]
+
+@router.get("/recherche", response_model=UtilisateurPage, summary="Rechercher des utilisateurs", description="Annuaire paginé des utilisateurs, trié par nom : filtres combinables et curseur 'suivant' à repasser dans 'apres' pour la page suivante", dependencies=[Depends(require_permission(PermissionEnum.LIRE_UTILISATEUR))])
+def rechercher_utilisateurs(
+    role_id: Optional[int] = Query(None, description="Identifiant du rôle"),
+    organisation_id: Optional[int] = Query(None, description="Identifiant de l'organisation"),
+    centre_id: Optional[int] = Query(None, description="Identifiant du centre d'état civil"),
+    status: Optional[ComptesEnum] = Query(None, description="Statut du compte"),
+    nom: Optional[str] = Query(None, min_length=1, max_length=255, description="Début du nom"),
+    apres: Optional[str] = Query(None, max_length=1024, description="Curseur 'suivant' de la page précédente"),
+    limite: int = Query(settings.UTILISATEURS_PAGE_TAILLE, ge=1, le=settings.UTILISATEURS_PAGE_TAILLE_MAX, description="Taille de la page"),
+    db: Session = Depends(get_db),
+):
+    result = UtilisateurService.rechercher_utilisateurs(db, role_id, organisation_id, centre_id, status, nom, apres, limite)
+    if result["code"] != 200:
+        raise HTTPException(status_code=result["code"], detail=result["message"])
+    return result["data"]
+
+@router.get("/{param}", response_model=UtilisateurRead, summary="Obtenir un utilisateur", description="Obtenir un utilisateur par ID ou par email", dependencies=[Depends(require_permission(PermissionEnum.LIRE_UTILISATEUR))])
 def get_utilisateur(param: str, db: Session = Depends(get_db)):
-    # Permission: VOIR_UTILISATEUR
     result = UtilisateurService.get_utilisateur(db, param)  # Appel de la méthode de classe
     if result["code"] != 200:
         raise HTTPException(status_code=result["code"], detail=result["message"])
     return result["data"]
 
-@router.get("/", response_model=List[UtilisateurRead], summary="Obtenir tous les utilisateurs", description="Récupérer la liste de tous les utilisateurs")
+@router.get("/", response_model=List[UtilisateurRead], summary="Obtenir tous les utilisateurs", description="Récupérer la liste de tous les utilisateurs", dependencies=[Depends(require_permission(PermissionEnum.LIRE_UTILISATEUR))])
 def get_all_utilisateurs(db: Session = Depends(get_db)):
-    # Permission: LISTER_UTILISATEURS
     service = UtilisateurService(db)  # Créer une instance avec la session
     result = service.get_all_utilisateurs()
     if result["code"] != 200:
         raise HTTPException(status_code=result["code"], detail=result["message"])
     return result["data"]
 
-@router.get("/role/{role}", response_model=List[UtilisateurRead], summary="Obtenir les utilisateurs par rôle")
+@router.get("/role/{role}", response_model=List[UtilisateurRead], summary="Obtenir les utilisateurs par rôle", dependencies=[Depends(require_permission(PermissionEnum.LIRE_UTILISATEUR))])
 def get_utilisateurs_by_role(role: str, db: Session = Depends(get_db)):
-    # Permission: LISTER_UTILISATEURS_PAR_ROLE
     result = UtilisateurService.get_utilisateurs_by_role(db, role)
     if result["code"] != 200:
         raise HTTPException(status_code=result["code"], detail=result["message"])
     return result["data"]
 
-@router.get("/organisation/{organisation}", response_model=List[UtilisateurRead], summary="Obtenir des utilisateurs par organisation", description="Récupérer les utilisateurs en fonction de leur organisation")
+@router.get("/organisation/{organisation}", response_model=List[UtilisateurRead], summary="Obtenir des utilisateurs par organisation", description="Récupérer les utilisateurs en fonction de leur organisation", dependencies=[Depends(require_permission(PermissionEnum.CONSULTER_UTILISATEURS_ORGANISATION))])
 def get_utilisateurs_by_organisation(organisation: str, db: Session = Depends(get_db)):
-    # Permission: LISTER_UTILISATEURS_PAR_ORGANISATION
     result = UtilisateurService.get_utilisateurs_by_organisation(db, organisation)
     if result["code"] != 200:
         raise HTTPException(status_code=result["code"], detail=result["message"])
     return result["data"]
 
-@router.get("/centre/{centre}", response_model=List[UtilisateurRead], summary="Obtenir des utilisateurs par centre", description="Récupérer les utilisateurs en fonction de leur centre d'état civil")
+@router.get("/centre/{centre}", response_model=List[UtilisateurRead], summary="Obtenir des utilisateurs par centre", description="Récupérer les utilisateurs en fonction de leur centre d'état civil", dependencies=[Depends(require_permission(PermissionEnum.CONSULTER_UTILISATEURS_CENTRE))])
 def get_utilisateurs_by_centre(centre: str, db: Session = Depends(get_db)):
-    # Permission: LISTER_UTILISATEURS_PAR_CENTRE
     result = UtilisateurService.get_utilisateurs_by_centre(db, centre)
     if result["code"] != 200:
         raise HTTPException(status_code=result["code"], detail=result["message"])
     return result["data"]
 
-@router.put("/{utilisateur_id}", response_model=UtilisateurRead, summary="Mettre à jour un utilisateur", description="Mettre à jour les informations d'un utilisateur existant")
+@router.put("/{utilisateur_id}", response_model=UtilisateurRead, summary="Mettre à jour un utilisateur", description="Mettre à jour les informations d'un utilisateur existant", dependencies=[Depends(require_permission(PermissionEnum.MODIFIER_UTILISATEUR))])
 def update_utilisateur(utilisateur_id: int, updates: UtilisateurCreate = Body(..., example={
     "nom": "Doe",
     "prenom": "John",
@@ -74,27 +101,24 @@ def update_utilisateur(utilisateur_id: int, updates: UtilisateurCreate = Body(..
     "organisation_id": 1,
     "status": ComptesEnum.ACTIF
 }), db: Session = Depends(get_db)):
-    # Permission: MODIFIER_UTILISATEUR
     result = UtilisateurService.update_utilisateur(db, utilisateur_id, updates.dict())
     if result["code"] != 200:
         raise HTTPException(status_code=result["code"], detail=result["message"])
     return result["data"]
 
-@router.delete("/{utilisateur_id}", summary="Supprimer un utilisateur", description="Supprimer un utilisateur existant")
+@router.delete("/{utilisateur_id}", summary="Supprimer un utilisateur", description="Supprimer un utilisateur existant", dependencies=[Depends(require_permission(PermissionEnum.SUPPRIMER_UTILISATEUR))])
 def delete_utilisateur(utilisateur_id: int, db: Session = Depends(get_db)):
-    # Permission: SUPPRIMER_UTILISATEUR
     result = UtilisateurService.delete_utilisateur(db, utilisateur_id)
     if result["code"] != 200:
         raise HTTPException(status_code=result["code"], detail=result["message"])
     return result
 
-@router.put("/organisation/assign", summary="Affecter un utilisateur à une organisation", description="Assigner un utilisateur à une organisation en précisant l'utilisateur assignant et l'utilisateur affecté")
+@router.put("/organisation/assign", summary="Affecter un utilisateur à une organisation", description="Assigner un utilisateur à une organisation en précisant l'utilisateur assignant et l'utilisateur affecté", dependencies=[Depends(require_permission(PermissionEnum.MODIFIER_UTILISATEUR))])
 def assign_user_to_organisation(data: dict = Body(..., example={
     "assigner_id": 1,
     "utilisateur_id": 2,
     "organisation_id": 1
 }), db: Session = Depends(get_db)):
-    # Permission: AFFECTER_UTILISATEUR_A_ORGANISATION
     assigner_id = data.get("assigner_id")
     utilisateur_id = data.get("utilisateur_id")
     organisation_id = data.get("organisation_id")
@@ -109,13 +133,12 @@ def assign_user_to_organisation(data: dict = Body(..., example={
     # Retour des données après succès
     return result
 
-@router.put("/centre/assign", summary="Affecter un utilisateur à un centre", description="Assigner un utilisateur à un centre en précisant l'utilisateur assignant et l'utilisateur affecté")
+@router.put("/centre/assign", summary="Affecter un utilisateur à un centre", description="Assigner un utilisateur à un centre en précisant l'utilisateur assignant et l'utilisateur affecté", dependencies=[Depends(require_permission(PermissionEnum.MODIFIER_UTILISATEUR))])
 def assign_user_to_centre(data: dict = Body(..., example={
     "assigner_id": 1,
     "utilisateur_id": 2,
     "centre_id": 1
 }), db: Session = Depends(get_db)):
-    # Permission: AFFECTER_UTILISATEUR_A_CENTRE
     assigner_id = data.get("assigner_id")
     utilisateur_id = data.get("utilisateur_id")
     centre_id = data.get("centre_id")
@@ -126,13 +149,12 @@ def assign_user_to_centre(data: dict = Body(..., example={
         raise HTTPException(status_code=result["code"], detail=result["message"])
     return result["data"]
 
-@router.put("/permissions/assign", summary="Affecter des permissions à un utilisateur", description="Assigner des permissions à un utilisateur en précisant l'utilisateur assignant et les permissions à affecter")
+@router.put("/permissions/assign", summary="Affecter des permissions à un utilisateur", description="Assigner des permissions à un utilisateur en précisant l'utilisateur assignant et les permissions à affecter", dependencies=[Depends(require_permission(PermissionEnum.ASSIGNER_PERMISSION))])
 def assign_permissions_to_user(data: dict = Body(..., example={
     "assigner_id": 1,
     "utilisateur_id": 2,
     "permissions": [1, 2, 3]
 }), db: Session = Depends(get_db)):
-    # Permission: AFFECTER_PERMISSIONS_A_UTILISATEUR
     assigner_id = data.get("assigner_id")
     utilisateur_id = data.get("utilisateur_id")
     permissions = data.get("permissions")
@@ -145,7 +167,7 @@ def assign_permissions_to_user(data: dict = Body(..., example={
 
 
 # Route pour retirer un utilisateur d'un centre@router.delete("/utilisateur/{utilisateur_id}/centre", response_model=dict)
-@router.delete("/utilisateur/{utilisateur_id}/centre", response_model=dict)
+@router.delete("/utilisateur/{utilisateur_id}/centre", response_model=dict, dependencies=[Depends(require_permission(PermissionEnum.MODIFIER_UTILISATEUR))])
 def remove_utilisateur_from_centre(utilisateur_id: int, db: Session = Depends(get_db)):
     utilisateur_service = UtilisateurService(db)  # Instancie le service avec db
     result = utilisateur_service.remove_utilisateur_from_centre(utilisateur_id)  # Passe correctement utilisateur_id
@@ -153,7 +175,7 @@ def remove_utilisateur_from_centre(utilisateur_id: int, db: Session = Depends(ge
         raise HTTPException(status_code=result["code"], detail=result["message"])
     return result
 
-@router.put("/utilisateur/{utilisateur_id}/role", summary="Changer le rôle d'un utilisateur", description="Cette route permet de modifier le rôle d'un utilisateur en spécifiant son ID et le nouvel ID du rôle. Seules les personnes autorisées peuvent effectuer cette action.")
+@router.put("/utilisateur/{utilisateur_id}/role", summary="Changer le rôle d'un utilisateur", description="Cette route permet de modifier le rôle d'un utilisateur en spécifiant son ID et le nouvel ID du rôle. Seules les personnes autorisées peuvent effectuer cette action.", dependencies=[Depends(require_permission(PermissionEnum.MODIFIER_UTILISATEUR))])
 def change_role(utilisateur_id: int, data: dict = Body(..., example={"new_role_id": 2}), db: Session = Depends(get_db)):
     new_role_id = data.get("new_role_id")
     if not new_role_id:
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.configs.database import get_db
+from app.schemas.documents.ancrage_schema import PreuveMerkleVerification
+from app.services.documents.merkle_service import MerkleService
+
+router = APIRouter(
+    prefix="/verification",
+    tags=["Vérification"]
+)
+
+@router.get("/documents/{document_id}/preuve", summary="Obtenir la preuve d'inclusion d'un document", description="Retourne la racine Merkle signée du jour et le chemin d'inclusion du document.")
+def get_preuve_document(document_id: int, db: Session = Depends(get_db)):
+    response = MerkleService(db).get_preuve_document(document_id)
+    if response["code"] != 200:
+        raise HTTPException(status_code=response["code"], detail=response["message"])
+    return response
+
+@router.post("/documents/preuve", summary="Vérifier un document", description="Vérifie un checksum à partir de sa preuve d'inclusion et de la racine signée mise en cache.")
+def verifier_preuve(verification: PreuveMerkleVerification, db: Session = Depends(get_db)):
+    response = MerkleService(db).verifier_preuve(verification.checksum, verification.ancrage_id, verification.preuve)
+    if response["code"] != 200:
+        raise HTTPException(status_code=response["code"], detail=response["message"])
+    return response
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from datetime import date
+from typing import List
+
+class PreuveMerkleRead(BaseModel):
+    document_id: int = Field(..., description="Identifiant du document")
+    checksum: str = Field(..., description="Checksum du document ancré")
+    ancrage_id: int = Field(..., description="Identifiant de l'ancrage journalier")
+    jour: date = Field(..., description="Jour de l'ancrage")
+    lot: int = Field(..., description="Numéro du lot pour ce jour")
+    racine: str = Field(..., description="Racine Merkle signée")
+    signature: str = Field(..., description="Signature de la racine")
+    index: int = Field(..., description="Position du document dans l'arbre")
+    preuve: List[List[str]] = Field(..., description="Chemin d'inclusion : [côté du voisin, hash]")
+
+class PreuveMerkleVerification(BaseModel):
+    checksum: str = Field(..., description="Checksum du document à vérifier")
+    ancrage_id: int = Field(..., description="Identifiant de l'ancrage journalier")
+    preuve: List[List[str]] = Field(..., description="Chemin d'inclusion fourni avec le document")
@@ -18,6 +18,9 @@ class DocumentCreate(DocumentBase):
 
 class DocumentRead(DocumentBase):
     id: int = Field(..., description="Identifiant unique du document")
+    compression: Optional[str] = Field(None, description="Algorithme de compression si le document est archivé")
+    stored_size: Optional[int] = Field(None, description="Taille occupée sur le stockage, en octets")
+    archived_at: Optional[datetime] = Field(None, description="Date d'archivage au niveau froid")
     created_at: datetime = Field(..., description="Date de création du document")
     updated_at: datetime = Field(..., description="Date de dernière mise à jour du document")
 
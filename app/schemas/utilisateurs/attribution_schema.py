@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class AttributionPermissions(BaseModel):
+    cibles: List[int] = Field(..., min_length=1, description="Identifiants des utilisateurs ou des rôles")
+    permissions: List[int] = Field(..., min_length=1, description="Identifiants des permissions à accorder ou retirer")
+
+class AttributionCible(BaseModel):
+    id: int = Field(..., description="Identifiant de l'utilisateur ou du rôle")
+    modifiees: List[int] = Field(..., description="Permissions ajoutées (accord) ou retirées (retrait)")
+    inchangees: List[int] = Field(..., description="Permissions déjà présentes (accord) ou déjà absentes (retrait)")
+
+class AttributionRapport(BaseModel):
+    operation: str = Field(..., description="accord ou retrait")
+    type_cible: str = Field(..., description="utilisateurs ou roles")
+    modifiees: int = Field(..., description="Nombre de couples (cible, permission) ajoutés ou retirés")
+    inchangees: int = Field(..., description="Nombre de couples déjà dans l'état demandé")
+    cibles: List[AttributionCible] = Field(..., description="Différence par cible")
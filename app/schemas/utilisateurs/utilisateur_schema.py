@@ -36,3 +36,22 @@ class UtilisateurRead(BaseModel):
 
     class Config:
         from_attributes = True
+
+class UtilisateurImportResultat(BaseModel):
+    ligne: int = Field(..., description="Numéro de la ligne dans le fichier importé (à partir de 1)")
+    email: Optional[str] = Field(None, description="Adresse email de la ligne")
+    statut: str = Field(..., description="Résultat de la ligne : cree ou erreur")
+    message: str = Field(..., description="Détail du résultat")
+    id: Optional[int] = Field(None, description="Identifiant de l'utilisateur créé")
+
+class UtilisateurImportRapport(BaseModel):
+    total: int = Field(..., description="Nombre de lignes lues")
+    crees: int = Field(..., description="Nombre d'utilisateurs créés")
+    erreurs: int = Field(..., description="Nombre de lignes rejetées")
+    duree_s: float = Field(..., description="Durée de l'import en secondes")
+    lignes: List[UtilisateurImportResultat] = Field(..., description="Résultat ligne par ligne")
+
+class UtilisateurPage(BaseModel):
+    elements: List[UtilisateurRead] = Field(..., description="Utilisateurs de la page, triés par nom puis identifiant")
+    suivant: Optional[str] = Field(None, description="Curseur de la page suivante (absent sur la dernière page)")
+    limite: int = Field(..., description="Nombre maximal d'utilisateurs par page")
@@ -2,7 +2,6 @@ from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
 from app.models.clients.client import Client
 from app.schemas.clients.client_schema import ClientCreate
-from app.schemas.clients.session_schema import SessionCreate
 from app.services.clients.session_services import SessionService
 
 class ClientService:
@@ -21,17 +20,15 @@ class ClientService:
         try:
             client = self._find_client(email=client_in.email, phone=client_in.phone)
             if not client:
+                # Le client est validé avec sa session et son OTP, dans la transaction de open_session
                 client = Client(email=client_in.email, phone=client_in.phone)
                 self.db.add(client)
-                self.db.commit()
-                self.db.refresh(client)
+                self.db.flush()
                 message = "Votre client a été créé avec succès."
+                session_response = SessionService(self.db).open_session(client, new_client=True)
             else:
                 message = "Le client existe déjà."
-
-            session_response = SessionService(self.db).create_session(
-                SessionCreate(client_id=client.id)
-            )
+                session_response = SessionService(self.db).open_session(client)
             if session_response.get("code") != 200 or not session_response.get("data"):
                 return {"code": 500, "message": "La création de la session a échoué.", "data": None}
 
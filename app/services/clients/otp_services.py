@@ -1,15 +1,22 @@
+import logging
 import random
-from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, Optional, Tuple
+from datetime import timedelta
 from sqlalchemy.orm import Session
+from app.configs.settings import settings
 from app.configs.utils.email_service import EmailService
+from app.configs.utils.email_templates import email_templates
+from app.configs.utils.sms_service import sms_service
 from app.models.clients.session import Session as SessionModel
-from app.models.clients.otp import OTP
+from app.services.clients.otp_store import OTPRecord, get_otp_store
+
+logger = logging.getLogger(__name__)
 
 class OTPService:
     def __init__(self, db: Session):
         self.db = db
         self.email_service = EmailService()
+        self.store = get_otp_store(db)
         
     def get_user_email_by_session(self, session_id: int) -> Optional[str]:
         session_obj = self.db.query(SessionModel).filter(SessionModel.id == session_id).first()
@@ -17,35 +24,46 @@ class OTPService:
             return session_obj.client.email
         return None
 
-    def create_otp_for_session(self, session_id: int) -> Dict[str, Any]:
-        try:
-            receiver_email = self.get_user_email_by_session(session_id)
-            print(f"Email: {receiver_email}")
+    def get_user_contact_by_session(self, session_id: int) -> Tuple[Optional[str], Optional[str]]:
+        """Retourne (email, téléphone) du client de la session."""
+        session_obj = self.db.query(SessionModel).filter(SessionModel.id == session_id).first()
+        if session_obj and session_obj.client:
+            return session_obj.client.email, session_obj.client.phone
+        return None, None
 
-            otps = self.db.query(OTP).filter(OTP.session_id == session_id).all()
-            current_time = datetime.utcnow()
-            expiration_time = current_time - timedelta(seconds=20)
-            for otp in otps:
-                otp.expires_at = expiration_time
-            self.db.commit()
+    def issue_otp(self, session_id: int, receiver_email: Optional[str], receiver_phone: Optional[str],
+                  replace: bool = True) -> Tuple[OTPRecord, str, Optional[Callable[[], None]]]:
+        """
+        Génère un OTP et prépare son envoi, sans commit : l'OTP (stockage en base) et l'email
+        (boîte d'envoi) rejoignent la transaction de l'appelant.
+        :return: (OTP, message, envoi à déclencher après le commit — SMS — ou None)
+        """
+        # Le nouvel OTP remplace le précédent ; son expiration est gérée par le stockage
+        otp_code = str(random.randint(10000, 99999))
+        ttl = timedelta(minutes=settings.OTP_TTL_MINUTES)
+        new_otp = self.store.save(session_id, otp_code, ttl, replace=replace)
+
+        # Canal choisi selon le contact du client : email (mis en file dans la même transaction)
+        # ou, à défaut, SMS (confié au service SMS une fois la transaction validée)
+        context = {"otp_code": otp_code, "validite_minutes": settings.OTP_TTL_MINUTES}
+        if receiver_email:
+            self.email_service.queue_template_email(self.db, receiver_email, "otp", context)
+            return new_otp, "OTP généré, email en cours d'envoi", None
+        if receiver_phone and not sms_service.disponible:
+            logger.warning(f"⚠️ Aucun fournisseur SMS configuré : OTP non envoyé pour la session {session_id}")
+            return new_otp, "OTP généré, aucun fournisseur SMS configuré : SMS non envoyé", None
+        if receiver_phone:
+            texte = email_templates.render_sms("otp", context)
+            return new_otp, "OTP généré, SMS en cours d'envoi", lambda: sms_service.send_sms(receiver_phone, texte)
+        return new_otp, "OTP généré, aucun email ni téléphone trouvé pour l'envoi", None
 
-            otp_code = str(random.randint(10000, 99999))
-            new_otp = OTP(session_id=session_id, otp_code=otp_code, expires_at=current_time + timedelta(minutes=70))
-            self.db.add(new_otp)
+    def create_otp_for_session(self, session_id: int) -> Dict[str, Any]:
+        try:
+            receiver_email, receiver_phone = self.get_user_contact_by_session(session_id)
+            new_otp, message, apres_commit = self.issue_otp(session_id, receiver_email, receiver_phone)
             self.db.commit()
-            self.db.refresh(new_otp)
-            
-            if receiver_email:
-                subject = "Votre code OTP"
-                body = (
-                    f"Bonjour,\n\n"
-                    f"Votre code OTP est : {new_otp.otp_code}\n\n"
-                    "Il expirera bientôt."
-                )
-                success = self.email_service.send_email(receiver_email, subject, body)
-                message = "OTP généré et email envoyé avec succès" if success else "OTP généré mais échec de l'envoi de l'email"
-            else:
-                message = "OTP généré, aucun email trouvé pour l'envoi"
+            if apres_commit:
+                apres_commit()
             
             return {"code": 200, "message": message, "data": new_otp}
         except Exception as e:
@@ -54,7 +72,7 @@ class OTPService:
 
     def get_otp_by_session_id(self, session_id: int) -> Dict[str, Any]:
         try:
-            otp = self.db.query(OTP).filter(OTP.session_id == session_id).first()
+            otp = self.store.get(session_id)
             if otp:
                 return {"code": 200, "message": "OTP récupéré avec succès.", "data": otp}
             else:
@@ -63,14 +81,14 @@ class OTPService:
             return {"code": 500, "message": f"Erreur lors de la récupération de l'OTP: {str(e)}.", "data": None}
 
     def validate_otp(self, session_id: int, otp_code: str) -> Dict[str, Any]:
+        """Vérifie et consomme l'OTP en une seule opération atomique : un code ne peut servir qu'une fois."""
         try:
-            result = self.get_otp_by_session_id(session_id)
-            otp = result.get("data")
-            if not otp:
-                return {"code": 404, "message": "OTP non trouvé.", "data": None}
-            if otp.otp_code == otp_code and otp.expires_at > datetime.utcnow():
-                return {"code": 200, "message": "OTP valide.", "data": otp}
+            valide = self.store.consume(session_id, otp_code)
+            self.db.commit()
+            if valide:
+                return {"code": 200, "message": "OTP valide.", "data": None}
             else:
                 return {"code": 400, "message": "OTP invalide ou expiré.", "data": None}
         except Exception as e:
+            self.db.rollback()
             return {"code": 500, "message": f"Erreur lors de la validation de l'OTP: {str(e)}.", "data": None}
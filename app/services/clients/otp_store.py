@@ -0,0 +1,188 @@
+import calendar
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.configs.settings import settings
+from app.models.clients.otp import OTP
+
+
+@dataclass(frozen=True)
+class OTPRecord:
+    session_id: int
+    otp_code: str
+    created_at: datetime
+    expires_at: datetime
+
+
+class OTPStore:
+    """
+    Stockage des OTP, un seul OTP valide par session.
+    - save : enregistre un nouvel OTP (remplace le précédent) avec une durée de vie ;
+    - get : OTP courant non expiré ;
+    - consume : vérification atomique « comparer puis supprimer » (un OTP ne sert qu'une fois).
+    """
+
+    def save(self, session_id: int, otp_code: str, ttl: timedelta, replace: bool = True) -> OTPRecord:
+        """`replace=False` indique une session neuve, sans OTP précédent à remplacer."""
+        raise NotImplementedError
+
+    def get(self, session_id: int) -> Optional[OTPRecord]:
+        raise NotImplementedError
+
+    def consume(self, session_id: int, otp_code: str) -> bool:
+        raise NotImplementedError
+
+
+class MemoryOTPStore(OTPStore):
+    """OTP en mémoire avec expiration : pour un déploiement à un seul processus."""
+
+    def __init__(self):
+        self._otps: Dict[int, OTPRecord] = {}
+        self._lock = threading.Lock()
+        self._prochaine_purge = datetime.utcnow()
+
+    def _purger(self, now: datetime) -> None:
+        # Purge des OTP expirés au plus une fois par minute, pour borner la mémoire
+        if now >= self._prochaine_purge:
+            for session_id in [s for s, r in self._otps.items() if r.expires_at <= now]:
+                del self._otps[session_id]
+            self._prochaine_purge = now + timedelta(minutes=1)
+
+    def save(self, session_id: int, otp_code: str, ttl: timedelta, replace: bool = True) -> OTPRecord:
+        now = datetime.utcnow()
+        record = OTPRecord(session_id, otp_code, now, now + ttl)
+        with self._lock:
+            self._purger(now)
+            self._otps[session_id] = record
+        return record
+
+    def get(self, session_id: int) -> Optional[OTPRecord]:
+        record = self._otps.get(session_id)
+        if record and record.expires_at > datetime.utcnow():
+            return record
+        return None
+
+    def consume(self, session_id: int, otp_code: str) -> bool:
+        with self._lock:
+            record = self._otps.get(session_id)
+            if record is None or record.otp_code != otp_code:
+                return False
+            del self._otps[session_id]
+            return record.expires_at > datetime.utcnow()
+
+
+def vers_epoch(moment: datetime) -> int:
+    """Secondes epoch d'une date UTC naïve, indépendamment du fuseau du serveur."""
+    return calendar.timegm(moment.utctimetuple())
+
+
+def depuis_epoch(secondes: int) -> datetime:
+    """Date UTC naïve (convention des colonnes DateTime) correspondant à des secondes epoch."""
+    return datetime.utcfromtimestamp(secondes)
+
+
+class RedisOTPStore(OTPStore):
+    """
+    OTP dans Redis, partagés entre les processus : l'expiration est celle de la clé (SET EX),
+    la consommation est un script Lua exécuté atomiquement par le serveur.
+    """
+
+    PREFIX = "otp:"
+    # Valeur stockée : "<code>:<création epoch>:<expiration epoch>"
+    CONSUME_SCRIPT = """
+    local valeur = redis.call('GET', KEYS[1])
+    if valeur and string.sub(valeur, 1, string.len(ARGV[1]) + 1) == ARGV[1] .. ':' then
+        redis.call('DEL', KEYS[1])
+        return 1
+    end
+    return 0
+    """
+
+    def __init__(self, client=None):
+        if client is None:
+            from app.configs.utils.redis_client import get_redis
+            client = get_redis()
+        self.client = client
+        self._consume = client.register_script(self.CONSUME_SCRIPT)
+
+    def save(self, session_id: int, otp_code: str, ttl: timedelta, replace: bool = True) -> OTPRecord:
+        now = datetime.utcnow()
+        record = OTPRecord(session_id, otp_code, now, now + ttl)
+        valeur = f"{otp_code}:{vers_epoch(now)}:{vers_epoch(record.expires_at)}"
+        self.client.set(f"{self.PREFIX}{session_id}", valeur, ex=max(1, int(ttl.total_seconds())))
+        return record
+
+    def get(self, session_id: int) -> Optional[OTPRecord]:
+        valeur = self.client.get(f"{self.PREFIX}{session_id}")
+        if not valeur:
+            return None
+        otp_code, created, expires = valeur.split(":")
+        return OTPRecord(session_id, otp_code, depuis_epoch(int(created)), depuis_epoch(int(expires)))
+
+    def consume(self, session_id: int, otp_code: str) -> bool:
+        return bool(self._consume(keys=[f"{self.PREFIX}{session_id}"], args=[otp_code]))
+
+
+class DatabaseOTPStore(OTPStore):
+    """
+    OTP dans la table clients_otps (comportement historique).
+    Les écritures se font dans la transaction de l'appelant, qui reste responsable du commit.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def save(self, session_id: int, otp_code: str, ttl: timedelta, replace: bool = True) -> OTPRecord:
+        now = datetime.utcnow()
+        # Une seule ligne par session (contrainte unique) : l'ancien OTP est remplacé
+        if replace:
+            self.db.query(OTP).filter(OTP.session_id == session_id).delete(synchronize_session=False)
+        otp = OTP(session_id=session_id, otp_code=otp_code, created_at=now, expires_at=now + ttl)
+        self.db.add(otp)
+        return OTPRecord(session_id, otp_code, now, otp.expires_at)
+
+    def get(self, session_id: int) -> Optional[OTPRecord]:
+        otp = (
+            self.db.query(OTP)
+            .filter(OTP.session_id == session_id, OTP.expires_at > datetime.utcnow())
+            .first()
+        )
+        if otp:
+            return OTPRecord(otp.session_id, otp.otp_code, otp.created_at, otp.expires_at)
+        return None
+
+    def consume(self, session_id: int, otp_code: str) -> bool:
+        # DELETE conditionnel : une seule requête, et un seul appelant peut obtenir rowcount == 1
+        supprimes = (
+            self.db.query(OTP)
+            .filter(OTP.session_id == session_id, OTP.otp_code == otp_code, OTP.expires_at > datetime.utcnow())
+            .delete(synchronize_session=False)
+        )
+        return supprimes == 1
+
+
+_memory_store: Optional[MemoryOTPStore] = None
+_redis_store: Optional[RedisOTPStore] = None
+_lock = threading.Lock()
+
+
+def get_otp_store(db: Session) -> OTPStore:
+    """Retourne le stockage d'OTP configuré (OTP_STORE_BACKEND : database, memory ou redis)."""
+    global _memory_store, _redis_store
+    backend = settings.OTP_STORE_BACKEND
+    if backend == "database":
+        return DatabaseOTPStore(db)
+    with _lock:
+        if backend == "memory":
+            if _memory_store is None:
+                _memory_store = MemoryOTPStore()
+            return _memory_store
+        if backend == "redis":
+            if _redis_store is None:
+                _redis_store = RedisOTPStore()
+            return _redis_store
+    raise ValueError(f"Stockage d'OTP inconnu : {backend}")
@@ -0,0 +1,96 @@
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.configs.settings import settings
+from app.models.clients.otp import OTP
+from app.models.clients.session import Session as ClientSession
+from app.models.utilisateurs.refresh_token import RefreshToken
+
+logger = logging.getLogger(__name__)
+
+# Verrou MySQL nommé : une seule purge à la fois, quel que soit le nombre de workers qui la lancent
+VERROU_PURGE = "angara_purge_sessions_otps"
+
+
+class PurgeService:
+    """
+    Purge des sessions, OTP et jetons de rafraîchissement expirés, par lots bornés avec une pause entre deux lots
+    (les transactions restent courtes et ne bloquent pas les écritures de l'API).
+    """
+
+    def __init__(self, db: Session, batch_size: Optional[int] = None, pause: Optional[float] = None,
+                 sessions_retention: Optional[timedelta] = None, otps_retention: Optional[timedelta] = None):
+        self.engine = db.get_bind()
+        self.batch_size = batch_size or settings.PURGE_BATCH_SIZE
+        self.pause = settings.PURGE_PAUSE_SECONDS if pause is None else pause
+        self.sessions_retention = sessions_retention if sessions_retention is not None else timedelta(days=settings.PURGE_SESSIONS_RETENTION_JOURS)
+        self.otps_retention = otps_retention if otps_retention is not None else timedelta(minutes=settings.PURGE_OTPS_RETENTION_MINUTES)
+
+    def _verrouiller(self, conn: Connection) -> bool:
+        if conn.dialect.name != "mysql":
+            return True  # pas de verrou nommé hors MySQL (développement)
+        return conn.execute(text("SELECT GET_LOCK(:nom, 0)"), {"nom": VERROU_PURGE}).scalar() == 1
+
+    def _deverrouiller(self, conn: Connection) -> None:
+        if conn.dialect.name == "mysql":
+            conn.execute(text("SELECT RELEASE_LOCK(:nom)"), {"nom": VERROU_PURGE})
+
+    def _retard(self, conn: Connection, table, limite: datetime) -> Optional[float]:
+        """Ancienneté (secondes) de la plus vieille ligne purgeable restante : 0 si la purge est à jour."""
+        plus_ancienne = conn.execute(select(func.min(table.c.expires_at)).where(table.c.expires_at < limite)).scalar()
+        conn.commit()
+        if plus_ancienne is None:
+            return 0.0
+        return (limite - plus_ancienne).total_seconds()
+
+    def _purger_table(self, conn: Connection, table, limite: datetime) -> Dict[str, Any]:
+        lots = supprimes = 0
+        while True:
+            if conn.dialect.name == "mysql":
+                # DELETE ... WHERE expires_at < ? LIMIT n : parcours de l'index expires_at, lot borné
+                requete = (delete(table).where(table.c.expires_at < limite)
+                           .with_dialect_options(mysql_limit=self.batch_size))
+            else:
+                ids = select(table.c.id).where(table.c.expires_at < limite).limit(self.batch_size)
+                requete = delete(table).where(table.c.id.in_(ids))
+            nombre = conn.execute(requete).rowcount
+            conn.commit()
+            lots += 1
+            supprimes += nombre
+            if nombre < self.batch_size:
+                break
+            time.sleep(self.pause)
+        return {"supprimes": supprimes, "lots": lots}
+
+    def purger(self) -> Dict[str, Any]:
+        debut = time.monotonic()
+        now = datetime.utcnow()
+        cibles = {
+            "otps": (OTP.__table__, now - self.otps_retention),
+            "sessions": (ClientSession.__table__, now - self.sessions_retention),
+            "refresh_tokens": (RefreshToken.__table__, now),
+        }
+        with self.engine.connect() as conn:
+            if not self._verrouiller(conn):
+                conn.commit()
+                logger.info("⏭️ Purge déjà en cours sur un autre worker")
+                return {"code": 409, "message": "Purge déjà en cours sur un autre worker.", "data": None}
+            try:
+                stats: Dict[str, Any] = {}
+                for nom, (table, limite) in cibles.items():
+                    retard_avant = self._retard(conn, table, limite)
+                    resultat = self._purger_table(conn, table, limite)
+                    stats[nom] = {**resultat, "retard_avant_s": retard_avant, "retard_apres_s": self._retard(conn, table, limite)}
+                    logger.info(f"🧹 {nom} : {resultat['supprimes']} ligne(s) supprimée(s) en {resultat['lots']} lot(s), "
+                                f"retard {retard_avant:.0f} s -> {stats[nom]['retard_apres_s']:.0f} s")
+            finally:
+                self._deverrouiller(conn)
+                conn.commit()
+        stats["duree_s"] = round(time.monotonic() - debut, 3)
+        return {"code": 200, "message": "Purge terminée.", "data": stats}
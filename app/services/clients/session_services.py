@@ -1,8 +1,11 @@
+import time
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import jwt
+from sqlalchemy import and_, case, func, or_
 from sqlalchemy.orm import Session
 from app.configs.settings import settings
+from app.configs.utils.session_revocation import session_revocations
 from app.models.clients.client import Client
 from app.models.clients.session import Session as ClientSession
 from app.schemas.clients.session_schema import SessionCreate
@@ -14,8 +17,11 @@ class SessionService:
     def __init__(self, db: Session):
         self.db = db
     
-    def generate_token(self, email: str, expires_at: datetime) -> str:
-        payload = {"email": email, "exp": expires_at}
+    def generate_token(self, email: str, expires_at: datetime, session_id: Optional[int] = None,
+                       client_id: Optional[int] = None) -> str:
+        # sid/cid permettent de vérifier la session sans lecture en base (voir verify_client_session) ;
+        # emi, horodatage précis de l'émission, distingue le jeton d'une réactivation d'un jeton révoqué la même seconde
+        payload = {"email": email, "exp": expires_at, "iat": datetime.utcnow(), "emi": time.time(), "sid": session_id, "cid": client_id}
         return jwt.encode(payload, settings.SECRET_KEY, algorithm=ALGORITHM)
 
     def create_session(self, session_in: SessionCreate) -> Dict[str, Any]:
@@ -23,44 +29,55 @@ class SessionService:
             client = self.db.query(Client).filter(Client.id == session_in.client_id).first()
             if not client:
                 return {"code": 404, "message": "Client introuvable.", "data": None}
+            return self.open_session(client)
+        except Exception as e:
+            self.db.rollback()
+            return {"code": 500, "message": f"Erreur lors de la création de la session: {str(e)}.", "data": None}
 
-            active_session = (
-                self.db.query(ClientSession)
-                .filter(
-                    ClientSession.client_id == session_in.client_id,
-                    ClientSession.is_active == True,
-                    ClientSession.expires_at > datetime.utcnow()
+    def open_session(self, client: Client, new_client: bool = False) -> Dict[str, Any]:
+        """
+        Ouvre une session pour le client et émet son OTP en une seule transaction (un flush, un commit).
+        `new_client=True` (client tout juste ajouté) évite de chercher des sessions qui ne peuvent pas exister.
+        """
+        try:
+            current_time = datetime.utcnow()
+            if not new_client:
+                active_session = (
+                    self.db.query(ClientSession)
+                    .filter(
+                        ClientSession.client_id == client.id,
+                        ClientSession.is_active == True,
+                        ClientSession.expires_at > current_time
+                    )
+                    .first()
                 )
-                .first()
-            )
-            if active_session:
-                return {"code": 200, "message": "Session active trouvée.", "data": {"client": client, "session": active_session}}
+                if active_session:
+                    return {"code": 200, "message": "Session active trouvée.", "data": {"client": client, "session": active_session}}
 
-            current_time = datetime.utcnow()
-            expiration_time = current_time - timedelta(seconds=20)
-            self.db.query(ClientSession).filter(ClientSession.client_id == session_in.client_id).update({
-                ClientSession.is_active: False,
-                ClientSession.expires_at: expiration_time
-            })
-            self.db.commit()
+                # Invalidation des anciennes sessions, dans la transaction de la nouvelle session
+                expiration_time = current_time - timedelta(seconds=20)
+                self.db.query(ClientSession).filter(ClientSession.client_id == client.id).update({
+                    ClientSession.is_active: False,
+                    ClientSession.expires_at: expiration_time
+                }, synchronize_session=False)
 
             new_session = ClientSession(
-                client_id=session_in.client_id,
+                client_id=client.id,
                 is_active=False,
+                created_at=current_time,
                 expires_at=current_time
             )
             self.db.add(new_session)
-            self.db.commit()
-            self.db.refresh(new_session)
-
-            otp_response = OTPService(self.db).create_otp_for_session(new_session.id)
-            if otp_response.get("code") != 200:
-                self.db.delete(new_session)
-                self.db.commit()
-                return {"code": 500, "message": "Échec de la création de l'OTP, session annulée.", "data": None}
+            self.db.flush()  # seul aller-retour intermédiaire : l'identifiant de la session porte l'OTP
 
+            _, _, apres_commit = OTPService(self.db).issue_otp(new_session.id, client.email, client.phone, replace=False)
             user_identifier = client.email if client.email else client.phone
-            token = self.generate_token(user_identifier, new_session.expires_at)
+            token = self.generate_token(user_identifier, new_session.expires_at, new_session.id, client.id)
+            self.db.commit()
+
+            # Envois hors transaction (SMS) une fois les données validées
+            if apres_commit:
+                apres_commit()
             return {"code": 200, "message": "Nouvelle session créée.", "data": {"client": client, "session": new_session, "token": token}}
         except Exception as e:
             self.db.rollback()
@@ -76,22 +93,56 @@ class SessionService:
         except Exception as e:
             return {"code": 500, "message": f"Erreur lors de la récupération de la session: {str(e)}.", "data": None}
 
-    def get_sessions_by_client(self, client_id: int) -> Dict[str, Any]:
+    def _bucket_conditions(self, current_time: datetime) -> Dict[str, Any]:
+        """Conditions SQL des trois catégories de sessions (mêmes règles que le regroupement historique)."""
+        return {
+            "actives": and_(ClientSession.is_active == True, ClientSession.expires_at > current_time),
+            "expirées": ClientSession.expires_at <= current_time,
+            "inactives": and_(or_(ClientSession.is_active == False, ClientSession.is_active.is_(None)),
+                              ClientSession.expires_at > current_time),
+        }
+
+    def get_sessions_by_client(self, client_id: int, statut: Optional[str] = None, page: int = 1, taille: int = 20,
+                               du: Optional[datetime] = None, au: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Historique des sessions d'un client : effectifs par catégorie (une requête d'agrégation)
+        et une page de sessions par catégorie, ou pour la seule catégorie `statut`.
+        `du` / `au` filtrent sur la date de création.
+        """
         try:
             current_time = datetime.utcnow()
-            sessions = self.db.query(ClientSession).filter(ClientSession.client_id == client_id).all()
-
-            if not sessions:
+            conditions = self._bucket_conditions(current_time)
+            if statut is not None and statut not in conditions:
+                return {"code": 400, "message": f"Statut inconnu : {statut}.", "data": None}
+
+            filtres = [ClientSession.client_id == client_id]
+            if du:
+                filtres.append(ClientSession.created_at >= du)
+            if au:
+                filtres.append(ClientSession.created_at < au)
+
+            compteurs = self.db.query(
+                *[func.coalesce(func.sum(case((condition, 1), else_=0)), 0).label(nom) for nom, condition in conditions.items()]
+            ).filter(*filtres).one()
+            compteurs = {nom: int(valeur) for nom, valeur in zip(conditions, compteurs)}
+            if not any(compteurs.values()):
                 return {"code": 404, "message": "Aucune session trouvée pour ce client.", "data": None}
 
-            sessions_grouped = {"actives": [], "expirées": [], "inactives": []}
-            for session in sessions:
-                if session.is_active and session.expires_at > current_time:
-                    sessions_grouped["actives"].append(session)
-                elif session.expires_at <= current_time:
-                    sessions_grouped["expirées"].append(session)
-                else:
-                    sessions_grouped["inactives"].append(session)
+            sessions_grouped: Dict[str, Any] = {"compteurs": compteurs, "pagination": {"page": page, "taille": taille}}
+            for nom, condition in conditions.items():
+                if statut is not None and nom != statut:
+                    continue
+                if not compteurs[nom] or (page - 1) * taille >= compteurs[nom]:
+                    sessions_grouped[nom] = []
+                    continue
+                sessions_grouped[nom] = (
+                    self.db.query(ClientSession)
+                    .filter(*filtres, condition)
+                    .order_by(ClientSession.expires_at.desc(), ClientSession.id.desc())
+                    .offset((page - 1) * taille)
+                    .limit(taille)
+                    .all()
+                )
 
             return {"code": 200, "message": "Sessions récupérées avec succès.", "data": sessions_grouped}
         except Exception as e:
@@ -112,21 +163,37 @@ class SessionService:
             if session.is_active and session.expires_at > current_time:
                 return {"code": 200, "message": "Cette session est déjà active.", "data": session}
 
-            self.db.query(ClientSession).filter(
-                ClientSession.client_id == session.client_id,
-                ClientSession.is_active == True
-            ).update({ClientSession.is_active: False})
+            # Les autres sessions actives du client sont désactivées : leurs jetons sont révoqués
+            autres_sessions = ClientSession.client_id == session.client_id, ClientSession.is_active == True, ClientSession.id != session.id
+            revoquees = self.db.query(ClientSession.id, ClientSession.expires_at).filter(*autres_sessions).all()
+            if revoquees:
+                self.db.query(ClientSession).filter(*autres_sessions).update({ClientSession.is_active: False}, synchronize_session=False)
             
             session.is_active = True
             session.expires_at = current_time + timedelta(hours=2)
             self.db.commit()
             self.db.refresh(session)
+            session_revocations.revoke(revoquees)
             
             token = None
             if session.client:
                 user_identifier = session.client.email if session.client.email else session.client.phone
-                token = self.generate_token(user_identifier, session.expires_at)
+                token = self.generate_token(user_identifier, session.expires_at, session.id, session.client_id)
             return {"code": 200, "message": "Session activée avec succès.", "data": {"session": session, "token": token}}
         except Exception as e:
             self.db.rollback()
             return {"code": 500, "message": f"Erreur lors de l'activation de la session: {str(e)}.", "data": None}
+
+    def deactivate_session(self, session_id: int) -> Dict[str, Any]:
+        """Désactive une session (déconnexion du client) et révoque ses jetons dans tous les processus."""
+        try:
+            session = self.db.query(ClientSession).filter(ClientSession.id == session_id).first()
+            if not session:
+                return {"code": 404, "message": "Session introuvable.", "data": None}
+            session.is_active = False
+            self.db.commit()
+            session_revocations.revoke([(session.id, session.expires_at)])
+            return {"code": 200, "message": "Session désactivée avec succès.", "data": None}
+        except Exception as e:
+            self.db.rollback()
+            return {"code": 500, "message": f"Erreur lors de la désactivation de la session: {str(e)}.", "data": None}
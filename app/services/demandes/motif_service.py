@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from typing import Dict, Any
 from app.configs.enumerations.Motifs import MotifEnum
+from app.configs.utils.reference_cache import MOTIFS, reference_cache
 from app.models.demandes.motif import Motif
 from app.schemas.demandes.motif_schema import MotifCreate
 
@@ -17,6 +18,7 @@ class MotifService:
             motif = Motif(**motif_data.dict())
             db.add(motif)
             db.commit()
+            reference_cache.invalider(MOTIFS)
             db.refresh(motif)
             return {"code": 201, "message": "Motif créé avec succès", "data": motif}
         except SQLAlchemyError as e:
@@ -51,6 +53,7 @@ class MotifService:
             if motif:
                 db.delete(motif)
                 db.commit()
+                reference_cache.invalider(MOTIFS)
                 return {"code": 200, "message": "Motif supprimé avec succès", "data": motif}
             return {"code": 404, "message": "Motif introuvable", "data": None}
         except SQLAlchemyError as e:
@@ -0,0 +1,132 @@
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.configs.enumerations.Status import StatusEnum
+from app.configs.settings import settings
+from app.configs.utils.storage_service import (
+    COMPRESSION_ZSTD,
+    compresser_flux,
+    get_cold_storage_backend,
+    get_storage_backend,
+)
+from app.models.demandes.demandes import DemandeBase
+from app.models.documents.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# Une demande validée ou rejetée est clôturée : son document n'est presque plus relu
+STATUTS_CLOTURES = [StatusEnum.VALIDE, StatusEnum.REJETE]
+
+
+class ArchivageService:
+    """
+    Déplace vers le niveau froid, compressés en zstd, les documents des demandes clôturées
+    depuis plus de N jours. La lecture reste transparente (décompression en streaming).
+    """
+
+    def __init__(self, db: Session, jours: Optional[int] = None, niveau: Optional[int] = None, batch_size: int = 100):
+        self.db = db
+        self.jours = settings.DOCUMENTS_ARCHIVAGE_JOURS if jours is None else jours
+        self.niveau = settings.DOCUMENTS_ZSTD_NIVEAU if niveau is None else niveau
+        self.batch_size = batch_size
+
+    def _lot_suivant(self, dernier_id: int, limite: datetime) -> List[Tuple[int, str, str]]:
+        return (
+            self.db.query(Document.id, Document.file_path, Document.checksum)
+            .join(DemandeBase, DemandeBase.id == Document.demande_id)
+            .filter(
+                Document.id > dernier_id,
+                Document.compression.is_(None),
+                Document.created_at < limite,
+                DemandeBase.status.in_(STATUTS_CLOTURES),
+            )
+            .order_by(Document.id)
+            .limit(self.batch_size)
+            .all()
+        )
+
+    def archiver(self) -> Dict[str, Any]:
+        """Archive tous les documents éligibles et retourne les statistiques de compression."""
+        limite = datetime.utcnow() - timedelta(days=self.jours)
+        stats = {"archives": 0, "ignores": 0, "echecs": 0, "octets_originaux": 0, "octets_stockes": 0}
+        dernier_id = 0
+        try:
+            while True:
+                lot = self._lot_suivant(dernier_id, limite)
+                if not lot:
+                    break
+                for document_id, file_path, checksum in lot:
+                    self._archiver_document(document_id, file_path, checksum, stats)
+                dernier_id = lot[-1][0]
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            return {"code": 500, "message": f"Erreur lors de l'archivage des documents: {str(e)}.", "data": stats}
+
+        stats["ratio"] = round(stats["octets_stockes"] / stats["octets_originaux"], 4) if stats["octets_originaux"] else None
+        logger.info(
+            f"✅ Archivage terminé : {stats['archives']} document(s), {stats['octets_originaux']} → "
+            f"{stats['octets_stockes']} octets (ratio {stats['ratio']}), {stats['ignores']} ignoré(s), {stats['echecs']} échec(s)"
+        )
+        return {"code": 200, "message": f"{stats['archives']} document(s) archivé(s).", "data": stats}
+
+    def _archiver_document(self, document_id: int, file_path: str, checksum: str, stats: Dict[str, Any]) -> None:
+        source = get_storage_backend(file_path)
+        destination = get_cold_storage_backend()
+        cle = f"{source.key(file_path)}.zst"
+        try:
+            uri, taille_stockee, taille_originale, empreinte = asyncio.run(self._copier_compresse(file_path, cle))
+        except Exception as e:
+            stats["echecs"] += 1
+            logger.error(f"❌ Archivage du document {document_id} impossible : {e}")
+            return
+
+        if empreinte != checksum:
+            # Ne jamais archiver un contenu qui ne correspond plus à son checksum
+            asyncio.run(destination.delete(uri))
+            stats["echecs"] += 1
+            logger.error(f"❌ Document {document_id} non archivé : checksum différent du contenu stocké")
+            return
+
+        try:
+            modifies = self.db.query(Document).filter(Document.id == document_id, Document.file_path == file_path).update({
+                Document.file_path: uri,
+                Document.compression: COMPRESSION_ZSTD,
+                Document.stored_size: taille_stockee,
+                Document.archived_at: datetime.utcnow(),
+            }, synchronize_session=False)
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()
+            asyncio.run(destination.delete(uri))
+            raise
+        if modifies == 0:
+            # Document modifié ou supprimé entre-temps : la copie froide est abandonnée, la source reste en place
+            asyncio.run(destination.delete(uri))
+            stats["ignores"] += 1
+            logger.warning(f"⚠️ Document {document_id} non archivé : modifié pendant l'archivage")
+            return
+        # L'original n'est supprimé qu'une fois la nouvelle URI enregistrée
+        asyncio.run(source.delete(file_path))
+        stats["archives"] += 1
+        stats["octets_originaux"] += taille_originale
+        stats["octets_stockes"] += taille_stockee
+
+    async def _copier_compresse(self, file_path: str, cle: str) -> Tuple[str, int, int, str]:
+        """Copie un document vers le niveau froid en le compressant ; vérifie le checksum au passage."""
+        digest = hashlib.sha256()
+        compteur = {"taille": 0}
+
+        async def lire_en_hachant() -> AsyncIterator[bytes]:
+            async for chunk in get_storage_backend(file_path).open(file_path):
+                digest.update(chunk)
+                compteur["taille"] += len(chunk)
+                yield chunk
+
+        uri, taille_stockee, _ = await get_cold_storage_backend().save(cle, compresser_flux(lire_en_hachant(), self.niveau))
+        return uri, taille_stockee, compteur["taille"], digest.hexdigest()
@@ -0,0 +1,76 @@
+import logging
+import os
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.configs.utils.storage_service import CHUNK_SIZE, construire_cle, get_storage_backend, ouvrir_contenu
+from app.models.demandes.demandes import DemandeBase
+from app.models.documents.documents import Document
+from app.schemas.documents.document_schema import DocumentRead
+
+logger = logging.getLogger(__name__)
+
+
+async def _lire_upload(fichier: UploadFile) -> AsyncIterator[bytes]:
+    """Lit un fichier reçu par blocs, sans le charger entièrement en mémoire."""
+    while True:
+        chunk = await fichier.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+class DocumentService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    async def enregistrer_document(self, demande_id: int, fichier: UploadFile) -> Dict[str, Any]:
+        """Enregistre le fichier d'une demande sur le backend de stockage configuré et crée le document associé."""
+        demande = await run_in_threadpool(
+            lambda: self.db.query(DemandeBase.id, DemandeBase.type_document).filter(DemandeBase.id == demande_id).first()
+        )
+        if not demande:
+            return {"code": 404, "message": "Demande introuvable.", "data": None}
+        existant = await run_in_threadpool(lambda: self.db.query(Document.id).filter(Document.demande_id == demande_id).first())
+        if existant:
+            return {"code": 409, "message": "Un document est déjà associé à cette demande.", "data": None}
+
+        backend = get_storage_backend()
+        extension = os.path.splitext(fichier.filename or "")[1] or ".bin"
+        cle = construire_cle(demande.type_document.name, demande_id, extension)
+        uri, taille, checksum = await backend.save(cle, _lire_upload(fichier))
+
+        document = Document(
+            demande_id=demande_id,
+            file_path=uri,
+            file_type=fichier.content_type or "application/octet-stream",
+            file_size=taille,
+            checksum=checksum,
+        )
+        try:
+            await run_in_threadpool(self._sauvegarder, document)
+        except SQLAlchemyError as e:
+            await run_in_threadpool(self.db.rollback)
+            await backend.delete(uri)
+            return {"code": 500, "message": f"Erreur lors de l'enregistrement du document: {str(e)}.", "data": None}
+        logger.info(f"✅ Document de la demande {demande_id} enregistré : {uri} ({taille} octets)")
+        return {"code": 201, "message": "Document enregistré avec succès.", "data": DocumentRead.from_orm(document)}
+
+    def _sauvegarder(self, document: Document) -> None:
+        self.db.add(document)
+        self.db.commit()
+        self.db.refresh(document)
+
+    def get_document(self, document_id: int) -> Dict[str, Any]:
+        document = self.db.query(Document).filter(Document.id == document_id).first()
+        if not document:
+            return {"code": 404, "message": "Document introuvable.", "data": None}
+        return {"code": 200, "message": "Document trouvé.", "data": document}
+
+    def ouvrir_document(self, document: Document) -> AsyncIterator[bytes]:
+        """Retourne le contenu original d'un document sous forme de flux, quel que soit son niveau de stockage."""
+        return ouvrir_contenu(document.file_path, document.compression)
@@ -0,0 +1,196 @@
+import hashlib
+import hmac
+import json
+import logging
+from datetime import date, datetime, timedelta
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.configs.settings import settings
+from app.models.documents.ancrage import AncrageMerkle
+from app.models.documents.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# Préfixes de domaine (RFC 6962) : une feuille ne peut pas être confondue avec un nœud interne
+PREFIXE_FEUILLE = b"\x00"
+PREFIXE_NOEUD = b"\x01"
+
+# Cache des racines dont la signature a déjà été vérifiée : ancrage_id -> racine (hex)
+_racines_cache: Dict[int, str] = {}
+_racines_lock = Lock()
+
+
+def hacher_feuille(checksum: str) -> bytes:
+    """Hache le checksum d'un document pour en faire une feuille de l'arbre."""
+    return hashlib.sha256(PREFIXE_FEUILLE + checksum.encode("utf-8")).digest()
+
+
+def hacher_noeud(gauche: bytes, droite: bytes) -> bytes:
+    """Hache deux nœuds enfants pour obtenir leur parent."""
+    return hashlib.sha256(PREFIXE_NOEUD + gauche + droite).digest()
+
+
+def construire_niveaux(feuilles: List[bytes]) -> List[List[bytes]]:
+    """
+    Construit tous les niveaux de l'arbre, des feuilles jusqu'à la racine.
+    Un nœud sans voisin est promu tel quel au niveau supérieur.
+    """
+    niveaux = [feuilles]
+    while len(niveaux[-1]) > 1:
+        courant = niveaux[-1]
+        suivant = []
+        for i in range(0, len(courant), 2):
+            if i + 1 < len(courant):
+                suivant.append(hacher_noeud(courant[i], courant[i + 1]))
+            else:
+                suivant.append(courant[i])
+        niveaux.append(suivant)
+    return niveaux
+
+
+def generer_preuve(niveaux: List[List[bytes]], index: int) -> List[List[str]]:
+    """Retourne le chemin d'inclusion d'une feuille : liste de [côté du voisin ("g"/"d"), hash hex]."""
+    preuve = []
+    for niveau in niveaux[:-1]:
+        voisin = index ^ 1
+        if voisin < len(niveau):
+            preuve.append(["g" if voisin < index else "d", niveau[voisin].hex()])
+        index //= 2
+    return preuve
+
+
+def calculer_racine_depuis_preuve(checksum: str, preuve: List[List[str]]) -> str:
+    """Recalcule la racine à partir du checksum et de sa preuve, en O(log n) et sans base de données."""
+    courant = hacher_feuille(checksum)
+    for cote, voisin in preuve:
+        voisin_bytes = bytes.fromhex(voisin)
+        courant = hacher_noeud(voisin_bytes, courant) if cote == "g" else hacher_noeud(courant, voisin_bytes)
+    return courant.hex()
+
+
+def signer_racine(jour: date, lot: int, racine: str) -> str:
+    """Signe (HMAC-SHA256) la racine d'un lot avec la clé secrète de l'application."""
+    message = f"{jour.isoformat()}:{lot}:{racine}".encode("utf-8")
+    return hmac.new(settings.SECRET_KEY.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+class MerkleService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ancrer_documents(self, jusqu_a: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Job incrémental : ancre, jour par jour, les documents qui ne le sont pas encore.
+        Seuls les jours entièrement écoulés (strictement avant `jusqu_a`, aujourd'hui par défaut) sont traités.
+        """
+        jusqu_a = jusqu_a or datetime.utcnow().date()
+        limite = datetime.combine(jusqu_a, datetime.min.time())
+        try:
+            jours = [
+                jour if isinstance(jour, date) else date.fromisoformat(str(jour))
+                for (jour,) in self.db.query(func.date(Document.created_at))
+                .filter(Document.ancrage_id.is_(None), Document.created_at < limite)
+                .distinct()
+                .order_by(func.date(Document.created_at))
+                .all()
+            ]
+            ancrages = [self._ancrer_jour(jour) for jour in jours]
+            return {"code": 200, "message": f"{len(ancrages)} lot(s) ancré(s).", "data": ancrages}
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            return {"code": 500, "message": f"Erreur lors de l'ancrage des documents: {str(e)}.", "data": None}
+
+    def _ancrer_jour(self, jour: date) -> Dict[str, Any]:
+        """Construit l'arbre d'un jour, signe sa racine et enregistre la preuve de chaque document."""
+        debut = datetime.combine(jour, datetime.min.time())
+        documents = (
+            self.db.query(Document.id, Document.checksum)
+            .filter(
+                Document.ancrage_id.is_(None),
+                Document.created_at >= debut,
+                Document.created_at < debut + timedelta(days=1),
+            )
+            .order_by(Document.id)
+            .all()
+        )
+        niveaux = construire_niveaux([hacher_feuille(checksum) for _, checksum in documents])
+        racine = niveaux[-1][0].hex()
+
+        dernier_lot = self.db.query(func.max(AncrageMerkle.lot)).filter(AncrageMerkle.jour == jour).scalar()
+        lot = (dernier_lot or 0) + 1
+        ancrage = AncrageMerkle(
+            jour=jour, lot=lot, racine=racine, signature=signer_racine(jour, lot, racine), nb_feuilles=len(documents)
+        )
+        self.db.add(ancrage)
+        self.db.flush()
+
+        self.db.bulk_update_mappings(Document, [
+            {"id": document_id, "ancrage_id": ancrage.id, "merkle_index": index,
+             "merkle_preuve": json.dumps(generer_preuve(niveaux, index))}
+            for index, (document_id, _) in enumerate(documents)
+        ])
+        self.db.commit()
+        logger.info(f"✅ Ancrage Merkle du {jour} (lot {lot}) : {len(documents)} document(s), racine {racine}")
+        return {"ancrage_id": ancrage.id, "jour": jour, "lot": lot, "racine": racine, "nb_feuilles": len(documents)}
+
+    def get_preuve_document(self, document_id: int) -> Dict[str, Any]:
+        """Retourne la preuve d'inclusion d'un document, à remettre au vérificateur."""
+        try:
+            document = self.db.query(Document).filter(Document.id == document_id).first()
+            if not document:
+                return {"code": 404, "message": "Document introuvable.", "data": None}
+            if document.ancrage_id is None:
+                return {"code": 409, "message": "Ce document n'a pas encore été ancré.", "data": None}
+            ancrage = document.ancrage
+            return {"code": 200, "message": "Preuve d'inclusion récupérée avec succès.", "data": {
+                "document_id": document.id,
+                "checksum": document.checksum,
+                "ancrage_id": ancrage.id,
+                "jour": ancrage.jour,
+                "lot": ancrage.lot,
+                "racine": ancrage.racine,
+                "signature": ancrage.signature,
+                "index": document.merkle_index,
+                "preuve": json.loads(document.merkle_preuve),
+            }}
+        except SQLAlchemyError as e:
+            return {"code": 500, "message": f"Erreur lors de la récupération de la preuve: {str(e)}.", "data": None}
+
+    def get_racine(self, ancrage_id: int) -> Optional[str]:
+        """
+        Retourne la racine d'un ancrage depuis le cache.
+        La base n'est consultée (et la signature vérifiée) qu'au premier accès.
+        """
+        racine = _racines_cache.get(ancrage_id)
+        if racine is not None:
+            return racine
+        ancrage = self.db.query(AncrageMerkle).filter(AncrageMerkle.id == ancrage_id).first()
+        if not ancrage:
+            return None
+        if not hmac.compare_digest(ancrage.signature, signer_racine(ancrage.jour, ancrage.lot, ancrage.racine)):
+            logger.error(f"❌ Signature invalide pour l'ancrage {ancrage_id} : racine altérée ?")
+            return None
+        with _racines_lock:
+            _racines_cache[ancrage_id] = ancrage.racine
+        return ancrage.racine
+
+    def verifier_preuve(self, checksum: str, ancrage_id: int, preuve: List[List[str]]) -> Dict[str, Any]:
+        """Vérifie qu'un checksum appartient bien à un ancrage à partir de sa preuve d'inclusion."""
+        try:
+            racine = self.get_racine(ancrage_id)
+            if racine is None:
+                return {"code": 404, "message": "Ancrage introuvable ou signature invalide.", "data": None}
+            racine_calculee = calculer_racine_depuis_preuve(checksum, preuve)
+        except (ValueError, TypeError):
+            return {"code": 400, "message": "Preuve d'inclusion mal formée.", "data": None}
+        except SQLAlchemyError as e:
+            return {"code": 500, "message": f"Erreur lors de la vérification de la preuve: {str(e)}.", "data": None}
+
+        if hmac.compare_digest(racine, racine_calculee):
+            return {"code": 200, "message": "Document authentique.", "data": {"ancrage_id": ancrage_id, "racine": racine}}
+        return {"code": 400, "message": "La preuve ne correspond pas à l'ancrage : document non authentique.", "data": None}
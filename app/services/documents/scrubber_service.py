@@ -0,0 +1,226 @@
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.configs.utils.storage_service import (
+    COMPRESSION_ZSTD,
+    LocalStorageBackend,
+    StorageBackend,
+    get_storage_backend,
+    ouvrir_contenu,
+)
+from app.models.documents.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# Taille des tranches hachées depuis la projection mémoire (évite de toucher tout le fichier d'un coup)
+TRANCHE_MMAP = 64 * 1024 * 1024
+
+
+def hacher_fichier(uri: str, compression: Optional[str] = None) -> Tuple[Optional[str], int, Optional[str]]:
+    """
+    Calcule le SHA-256 et la taille du contenu original d'un document (décompressé si archivé).
+    Exécuté dans un thread ou un processus du pool. Retourne (empreinte, taille, erreur) :
+    (None, 0, None) si le fichier est absent, (None, 0, message) s'il est illisible (clé invalide,
+    archive corrompue, droits insuffisants...) ; une erreur n'interrompt jamais le passage.
+    """
+    try:
+        return (*_hacher_fichier(uri, compression), None)
+    except Exception as e:
+        return None, 0, f"{type(e).__name__}: {e}"
+
+
+def _hacher_fichier(uri: str, compression: Optional[str]) -> Tuple[Optional[str], int]:
+    """
+    Les fichiers locaux sont projetés en mémoire (mmap) : pas de copie dans l'espace utilisateur
+    et hashlib relâche le GIL sur les gros blocs.
+    """
+    backend = get_storage_backend(uri)
+    if isinstance(backend, LocalStorageBackend):
+        path = backend.path(uri)
+        try:
+            with open(path, "rb") as fichier:
+                taille_stockee = os.fstat(fichier.fileno()).st_size
+                digest, taille = hashlib.sha256(), 0
+                decompresseur = None
+                if compression == COMPRESSION_ZSTD:
+                    import zstandard
+                    decompresseur = zstandard.ZstdDecompressor().decompressobj()
+                if taille_stockee:
+                    with mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ) as projection:
+                        vue = memoryview(projection)
+                        try:
+                            for debut in range(0, taille_stockee, TRANCHE_MMAP):
+                                tranche = vue[debut:debut + TRANCHE_MMAP]
+                                try:
+                                    contenu = decompresseur.decompress(tranche) if decompresseur else tranche
+                                    digest.update(contenu)
+                                    taille += len(contenu)
+                                finally:
+                                    # Une tranche encore exportée empêcherait de fermer la projection
+                                    tranche.release()
+                        finally:
+                            vue.release()
+                return digest.hexdigest(), taille
+        except FileNotFoundError:
+            return None, 0
+    return asyncio.run(_hacher_flux(uri, compression))
+
+
+async def _hacher_flux(uri: str, compression: Optional[str]) -> Tuple[Optional[str], int]:
+    """Hachage d'un objet distant lu par gros blocs."""
+    if not await get_storage_backend(uri).exists(uri):
+        return None, 0
+    digest, taille = hashlib.sha256(), 0
+    async for chunk in ouvrir_contenu(uri, compression):
+        digest.update(chunk)
+        taille += len(chunk)
+    return digest.hexdigest(), taille
+
+
+class ScrubberService:
+    """
+    Vérifie périodiquement que les fichiers stockés correspondent toujours à Document.checksum.
+
+    - parcours de la table par lots (pagination par clé sur `id`, sans OFFSET) ;
+    - hachage parallèle dans un pool de threads ou de processus ;
+    - reprise possible grâce à un fichier de point de contrôle écrit après chaque lot ;
+    - débit limité (octets/s) et pause entre les lots pour tourner en heures ouvrées.
+    """
+
+    def __init__(self, db: Session, checkpoint_path: str, batch_size: int = 500, workers: int = 4,
+                 processus: bool = False, octets_par_seconde: Optional[int] = None, pause: float = 0.0):
+        self.db = db
+        self.checkpoint_path = checkpoint_path
+        self.batch_size = batch_size
+        self.workers = workers
+        self.processus = processus
+        self.octets_par_seconde = octets_par_seconde
+        self.pause = pause
+
+    def _etat_initial(self) -> Dict[str, Any]:
+        return {"dernier_id": 0, "termine": False, "verifies": 0, "octets": 0,
+                "corrompus": [], "manquants": [], "orphelins": []}
+
+    def _charger_etat(self, reprendre: bool) -> Dict[str, Any]:
+        if reprendre and os.path.isfile(self.checkpoint_path):
+            with open(self.checkpoint_path, "r", encoding="utf-8") as fichier:
+                etat = json.load(fichier)
+            if not etat.get("termine"):
+                logger.info(f"🔄 Reprise du contrôle d'intégrité après le document {etat['dernier_id']}")
+                return etat
+        return self._etat_initial()
+
+    def _sauver_etat(self, etat: Dict[str, Any]) -> None:
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fichier:
+            json.dump(etat, fichier, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _lot_suivant(self, dernier_id: int) -> List[Tuple[int, str, Optional[str], int, str]]:
+        return (
+            self.db.query(Document.id, Document.file_path, Document.compression, Document.file_size, Document.checksum)
+            .filter(Document.id > dernier_id)
+            .order_by(Document.id)
+            .limit(self.batch_size)
+            .all()
+        )
+
+    def executer(self, reprendre: bool = True) -> Dict[str, Any]:
+        """Lance (ou reprend) un passage complet et retourne le rapport."""
+        etat = self._charger_etat(reprendre)
+        pool: Executor = ProcessPoolExecutor(self.workers) if self.processus else ThreadPoolExecutor(self.workers)
+        try:
+            while True:
+                lot = self._lot_suivant(etat["dernier_id"])
+                if not lot:
+                    break
+                debut = time.monotonic()
+                resultats = pool.map(hacher_fichier, [ligne[1] for ligne in lot], [ligne[2] for ligne in lot])
+                octets_lot = 0
+                for (document_id, file_path, _, taille_attendue, checksum), (empreinte, taille, erreur) in zip(lot, resultats):
+                    etat["verifies"] += 1
+                    octets_lot += taille
+                    if erreur is not None:
+                        # Fichier illisible (archive corrompue, clé invalide...) : signalé comme corrompu
+                        etat["corrompus"].append({"document_id": document_id, "file_path": file_path,
+                                                  "checksum_attendu": checksum, "erreur": erreur})
+                    elif empreinte is None:
+                        etat["manquants"].append({"document_id": document_id, "file_path": file_path})
+                    elif empreinte != checksum or taille != taille_attendue:
+                        etat["corrompus"].append({"document_id": document_id, "file_path": file_path,
+                                                  "checksum_attendu": checksum, "checksum_obtenu": empreinte,
+                                                  "taille_attendue": taille_attendue, "taille_obtenue": taille})
+                etat["octets"] += octets_lot
+                etat["dernier_id"] = lot[-1][0]
+                self._sauver_etat(etat)
+                self._temporiser(octets_lot, time.monotonic() - debut)
+
+            etat["orphelins"] = self._trouver_orphelins()
+            etat["termine"] = True
+            self._sauver_etat(etat)
+        finally:
+            pool.shutdown()
+
+        logger.info(
+            f"✅ Contrôle d'intégrité terminé : {etat['verifies']} document(s), {len(etat['corrompus'])} corrompu(s), "
+            f"{len(etat['manquants'])} manquant(s), {len(etat['orphelins'])} orphelin(s)"
+        )
+        return etat
+
+    def _temporiser(self, octets: int, duree: float) -> None:
+        """Respecte le débit maximal configuré puis la pause entre lots."""
+        attente = self.pause
+        if self.octets_par_seconde:
+            attente += max(0.0, octets / self.octets_par_seconde - duree)
+        if attente > 0:
+            time.sleep(attente)
+
+    def _trouver_orphelins(self) -> List[str]:
+        """Fichiers présents sur les stockages locaux (chaud et froid) mais référencés par aucun document."""
+        racines = [
+            os.path.join(backend.root, "documents")
+            for backend in (get_storage_backend(f"{scheme}://") for scheme in (StorageBackend.LOCAL, StorageBackend.LOCAL_COLD))
+            if isinstance(backend, LocalStorageBackend)
+        ]
+        racines = [racine for racine in racines if os.path.isdir(racine)]
+        if not racines:
+            return []
+
+        connus: Set[str] = set()
+        dernier_id = 0
+        while True:
+            lot = (
+                self.db.query(Document.id, Document.file_path)
+                .filter(Document.id > dernier_id)
+                .order_by(Document.id)
+                .limit(self.batch_size * 10)
+                .all()
+            )
+            if not lot:
+                break
+            for _, file_path in lot:
+                backend = get_storage_backend(file_path)
+                if isinstance(backend, LocalStorageBackend):
+                    try:
+                        connus.add(backend.path(file_path))
+                    except ValueError:
+                        continue  # Clé hors de la racine : déjà signalée par le passage principal
+            dernier_id = lot[-1][0]
+
+        orphelins = []
+        for racine in racines:
+            for dossier, _, fichiers in os.walk(racine):
+                for nom in fichiers:
+                    chemin = os.path.join(dossier, nom)
+                    if chemin not in connus and not nom.endswith(".tmp"):
+                        orphelins.append(chemin)
+        return orphelins
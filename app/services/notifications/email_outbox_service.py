@@ -0,0 +1,141 @@
+import logging
+import random
+import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.configs.enumerations.Emails import EmailStatusEnum
+from app.configs.settings import settings
+from app.configs.utils.email_service import SMTPConnectionPool
+from app.models.notifications.email_outbox import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+# Erreurs définitives : inutile de réessayer (destinataire refusé, etc.)
+ERREURS_DEFINITIVES = (smtplib.SMTPRecipientsRefused,)
+
+
+class EmailOutboxWorker:
+    """
+    Worker de la boîte d'envoi : réserve des lots d'emails en attente, les envoie en parallèle
+    via un pool de connexions SMTP authentifiées, puis réessaie les échecs avec un délai exponentiel.
+
+    Plusieurs workers (threads ou processus uvicorn) peuvent tourner en même temps :
+    la réservation utilise SELECT ... FOR UPDATE SKIP LOCKED et un bail (lease) qui rend
+    l'email de nouveau disponible si un worker s'arrête en cours d'envoi.
+    """
+
+    def __init__(self, session_factory: sessionmaker, concurrency: Optional[int] = None, batch_size: Optional[int] = None,
+                 max_attempts: Optional[int] = None, lease_seconds: int = 300):
+        self.session_factory = session_factory
+        self.concurrency = concurrency or settings.EMAIL_OUTBOX_CONCURRENCY
+        self.batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+        self.lease = timedelta(seconds=lease_seconds)
+        self.pool = SMTPConnectionPool(max_size=self.concurrency)
+        self.executor = ThreadPoolExecutor(self.concurrency, thread_name_prefix="email-outbox")
+        self._stop = threading.Event()
+
+    def _reserver_lot(self, db: Session) -> List[Tuple[int, str, str, str, bool, Optional[str], int]]:
+        """Réserve un lot d'emails à envoyer et retourne leurs données."""
+        now = datetime.utcnow()
+        emails = (
+            db.query(EmailOutbox)
+            .filter(
+                EmailOutbox.statut.in_([EmailStatusEnum.EN_ATTENTE, EmailStatusEnum.EN_COURS]),
+                EmailOutbox.prochaine_tentative <= now,
+            )
+            .order_by(EmailOutbox.prochaine_tentative, EmailOutbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        for email in emails:
+            email.statut = EmailStatusEnum.EN_COURS
+            email.prochaine_tentative = now + self.lease
+        lot = [(e.id, e.destinataire, e.sujet, e.corps or "", e.html, e.corps_texte, e.tentatives) for e in emails]
+        db.commit()
+        return lot
+
+    def _envoyer(self, email: Tuple[int, str, str, str, bool, Optional[str], int]) -> Tuple[int, int, Optional[Exception]]:
+        email_id, destinataire, sujet, corps, html, texte, tentatives = email
+        try:
+            self.pool.send(destinataire, sujet, corps, html, texte)
+            return email_id, tentatives, None
+        except Exception as e:
+            return email_id, tentatives, e
+
+    def _delai(self, tentatives: int) -> timedelta:
+        """Délai exponentiel plafonné, avec une part aléatoire pour étaler les reprises."""
+        base = min(settings.EMAIL_OUTBOX_BACKOFF_SECONDS * (2 ** (tentatives - 1)), 3600)
+        return timedelta(seconds=base * random.uniform(0.8, 1.2))
+
+    def run_once(self) -> Dict[str, Any]:
+        """Traite un lot ; retourne le nombre d'emails envoyés, replanifiés et en échec définitif."""
+        stats = {"envoyes": 0, "replanifies": 0, "echecs": 0}
+        db = self.session_factory()
+        try:
+            lot = self._reserver_lot(db)
+            if not lot:
+                return stats
+            resultats = list(self.executor.map(self._envoyer, lot))
+            now = datetime.utcnow()
+            for email_id, tentatives, erreur in resultats:
+                tentatives += 1
+                if erreur is None:
+                    valeurs = {EmailOutbox.statut: EmailStatusEnum.ENVOYE, EmailOutbox.sent_at: now,
+                               EmailOutbox.tentatives: tentatives, EmailOutbox.corps: None, EmailOutbox.corps_texte: None,
+                               EmailOutbox.derniere_erreur: None}
+                    stats["envoyes"] += 1
+                elif isinstance(erreur, ERREURS_DEFINITIVES) or tentatives >= self.max_attempts:
+                    # Corps effacés comme pour un envoi réussi : ils contiennent mots de passe et codes OTP
+                    valeurs = {EmailOutbox.statut: EmailStatusEnum.ECHEC, EmailOutbox.tentatives: tentatives,
+                               EmailOutbox.corps: None, EmailOutbox.corps_texte: None,
+                               EmailOutbox.derniere_erreur: str(erreur)}
+                    stats["echecs"] += 1
+                    logger.error(f"❌ Email {email_id} abandonné après {tentatives} tentative(s) : {erreur}")
+                else:
+                    valeurs = {EmailOutbox.statut: EmailStatusEnum.EN_ATTENTE, EmailOutbox.tentatives: tentatives,
+                               EmailOutbox.prochaine_tentative: now + self._delai(tentatives),
+                               EmailOutbox.derniere_erreur: str(erreur)}
+                    stats["replanifies"] += 1
+                    logger.warning(f"⚠️ Email {email_id} replanifié (tentative {tentatives}) : {erreur}")
+                db.query(EmailOutbox).filter(EmailOutbox.id == email_id).update(valeurs, synchronize_session=False)
+            db.commit()
+            logger.info(f"✅ Boîte d'envoi : {stats['envoyes']} envoyé(s), {stats['replanifies']} replanifié(s), {stats['echecs']} échec(s)")
+            return stats
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def run_forever(self, interval: Optional[float] = None) -> None:
+        """Boucle du worker : enchaîne les lots tant qu'il y en a, puis attend `interval` secondes."""
+        interval = settings.EMAIL_OUTBOX_POLL_INTERVAL if interval is None else interval
+        logger.info("🚀 Worker de la boîte d'envoi démarré")
+        while not self._stop.is_set():
+            try:
+                stats = self.run_once()
+                traites = sum(stats.values())
+            except Exception as e:
+                logger.error(f"❌ Erreur du worker de la boîte d'envoi : {e}")
+                traites = 0
+            if traites < self.batch_size:
+                self._stop.wait(interval)
+        self.executor.shutdown()
+        self.pool.close()
+        logger.info("🛑 Worker de la boîte d'envoi arrêté")
+
+    def start(self) -> threading.Thread:
+        """Démarre le worker dans un thread d'arrière-plan (utilisé par le cycle de vie de l'API)."""
+        thread = threading.Thread(target=self.run_forever, name="email-outbox", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._stop.set()
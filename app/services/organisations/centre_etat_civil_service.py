@@ -1,9 +1,12 @@
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from app.configs.utils.identifiants import CENTRE, identifier_resolver
+from app.configs.utils.reference_cache import CENTRES, reference_cache
 from app.models.organisations.centre_etat_civil import CentreEtatCivil
 from app.models.utilisateurs.utilisateur import Utilisateur
 from app.schemas.organisations.centre_etat_civil_schema import CentreEtatCivilCreate, CentreEtatCivilRead
 from app.schemas.utilisateurs.utilisateur_schema import UtilisateurRead
+from app.services.utilisateurs.utilisateur_service import options_lecture
 
 class CentreEtatCivilService:
     @staticmethod
@@ -28,6 +31,8 @@ class CentreEtatCivilService:
             new_centre = CentreEtatCivil(**centre_data.dict())
             db.add(new_centre)
             db.commit()
+            identifier_resolver.invalider(CENTRE)
+            reference_cache.invalider(CENTRES)
             db.refresh(new_centre)
             return {"code": 201, "message": "Centre créé avec succès", "data": CentreEtatCivilRead.from_orm(new_centre)}
 
@@ -52,6 +57,8 @@ class CentreEtatCivilService:
         for key, value in updates.items():
             setattr(centre, key, value)
         db.commit()
+        identifier_resolver.invalider(CENTRE)
+        reference_cache.invalider(CENTRES)
         db.refresh(centre)
         return {"code": 200, "message": "Centre mis à jour avec succès", "data": CentreEtatCivilRead.from_orm(centre)}
 
@@ -62,20 +69,16 @@ class CentreEtatCivilService:
             return {"code": 404, "message": "Centre d'état civil non trouvé.", "data": None}
         db.delete(centre)
         db.commit()
+        identifier_resolver.invalider(CENTRE)
+        reference_cache.invalider(CENTRES)
         return {"code": 200, "message": "Centre supprimé avec succès", "data": None}
 
     @staticmethod
     def get_users_by_centre(db: Session, identifier: str):
-        centre = db.query(CentreEtatCivil).filter(
-            (CentreEtatCivil.reference == identifier) |
-            (CentreEtatCivil.nom == identifier) |
-            (CentreEtatCivil.email == identifier) |
-            (CentreEtatCivil.id == identifier) |
-            (CentreEtatCivil.telephone == identifier)
-        ).first()
-
-        if not centre:
+        # Id, référence, nom, email ou téléphone : résolu sans requête
+        centre_id = identifier_resolver.resoudre(db, CENTRE, identifier)
+        if centre_id is None:
             return {"code": 404, "message": "Centre d'état civil non trouvé.", "data": None}
 
-        users = db.query(Utilisateur).filter(Utilisateur.centre_id == centre.id).all()
+        users = db.query(Utilisateur).options(*options_lecture()).filter(Utilisateur.centre_id == centre_id).all()
         return {"code": 200, "message": "Utilisateurs récupérés avec succès", "data": [UtilisateurRead.from_orm(user) for user in users]}
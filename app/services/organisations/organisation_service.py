@@ -2,10 +2,14 @@ from datetime import datetime
 import uuid
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from app.configs.utils.email_templates import email_templates
+from app.configs.utils.identifiants import ORGANISATION, identifier_resolver
+from app.configs.utils.reference_cache import ORGANISATIONS, reference_cache
 from app.models.organisations.organisations import Organisation
 from app.models.utilisateurs.utilisateur import Utilisateur
 from app.schemas.organisations.organisation_schema import OrganisationCreate, OrganisationRead
 from app.schemas.utilisateurs.utilisateur_schema import UtilisateurRead
+from app.services.utilisateurs.utilisateur_service import options_lecture
 
 
 def generate_reference() -> str:
@@ -39,6 +43,8 @@ class OrganisationService:
             new_organisation = Organisation(**organisation_dict, reference=reference)
             db.add(new_organisation)
             db.commit()
+            identifier_resolver.invalider(ORGANISATION)
+            reference_cache.invalider(ORGANISATIONS)
             db.refresh(new_organisation)
 
             return {"code": 201, "message": "Organisation créée avec succès", "data": OrganisationRead.from_orm(new_organisation)}
@@ -79,6 +85,9 @@ class OrganisationService:
                 setattr(organisation, key, value)
 
         db.commit()
+        identifier_resolver.invalider(ORGANISATION)
+        reference_cache.invalider(ORGANISATIONS)
+        email_templates.invalider(organisation_id)
         db.refresh(organisation)
         return {"code": 200, "message": "Organisation mise à jour avec succès", "data": OrganisationRead.from_orm(organisation)}
 
@@ -91,17 +100,17 @@ class OrganisationService:
 
         db.delete(organisation)
         db.commit()
+        identifier_resolver.invalider(ORGANISATION)
+        reference_cache.invalider(ORGANISATIONS)
+        email_templates.invalider(organisation_id)
         return {"code": 200, "message": "Organisation supprimée avec succès", "data": None}
 
     @staticmethod
     def get_organisation_users(db: Session, identifier: str):
         """Récupère les utilisateurs d'une organisation à partir de son ID, son nom ou sa référence."""
-        organisation = db.query(Organisation).filter(
-            (Organisation.id == identifier) | (Organisation.nom == identifier) | (Organisation.reference == identifier)
-        ).scalar()
-
-        if not organisation:
+        organisation_id = identifier_resolver.resoudre(db, ORGANISATION, identifier)
+        if organisation_id is None:
             return {"code": 404, "message": "Organisation non trouvée.", "data": None}
 
-        users = db.query(Utilisateur).filter(Utilisateur.organisation_id == organisation.id).all()
+        users = db.query(Utilisateur).options(*options_lecture()).filter(Utilisateur.organisation_id == organisation_id).all()
         return {"code": 200, "message": "Utilisateurs récupérés avec succès", "data": [UtilisateurRead.from_orm(user) for user in users]}
@@ -0,0 +1,150 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import delete, exists, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.configs.utils.permissions import permission_engine
+from app.configs.utils.reference_cache import ROLES, reference_cache
+from app.models.utilisateurs.permission import Permission
+from app.models.utilisateurs.relations import role_permissions, user_permissions
+from app.models.utilisateurs.role import Role
+from app.models.utilisateurs.utilisateur import Utilisateur
+from app.schemas.utilisateurs.attribution_schema import AttributionCible, AttributionRapport
+
+CIBLE_UTILISATEURS = "utilisateurs"
+CIBLE_ROLES = "roles"
+
+# type de cible -> (modèle, table d'association, colonne de la cible dans la table)
+CIBLES = {
+    CIBLE_UTILISATEURS: (Utilisateur, user_permissions, user_permissions.c.user_id),
+    CIBLE_ROLES: (Role, role_permissions, role_permissions.c.role_id),
+}
+
+
+class AttributionService:
+    """
+    Accord et retrait de permissions en masse (N permissions à M utilisateurs ou rôles).
+
+    Chaque opération est ensembliste : deux requêtes IN pour vérifier les identifiants, une pour l'état
+    actuel, puis un seul INSERT ... SELECT (sans les couples déjà présents) ou un seul DELETE ... IN sur
+    la table d'association, au lieu de réécrire les collections de relations. Les opérations sont
+    idempotentes : rejouées, elles ne modifient rien et le rapport le dit.
+
+    Seules les cibles réellement modifiées voient leur époque de permissions incrémentée (jetons émis
+    avant refusés) et leur masque invalidé.
+    """
+
+    @staticmethod
+    def _verifier(db: Session, type_cible: str, cibles: Iterable[int], permissions: Iterable[int]):
+        modele = CIBLES[type_cible][0]
+        cibles, permissions = sorted(set(cibles)), sorted(set(permissions))
+        cibles_existantes = {i for (i,) in db.query(modele.id).filter(modele.id.in_(cibles))}
+        permissions_existantes = {i for (i,) in db.query(Permission.id).filter(Permission.id.in_(permissions))}
+        cibles_inconnues = [i for i in cibles if i not in cibles_existantes]
+        if cibles_inconnues:
+            nature = "Utilisateurs" if type_cible == CIBLE_UTILISATEURS else "Rôles"
+            return None, {"code": 404, "message": f"{nature} non trouvés: {', '.join(map(str, cibles_inconnues))}", "data": None}
+        permissions_inconnues = [i for i in permissions if i not in permissions_existantes]
+        if permissions_inconnues:
+            return None, {"code": 400, "message": f"Les permissions suivantes n'existent pas: {', '.join(map(str, permissions_inconnues))}", "data": None}
+        return (cibles, permissions), None
+
+    @staticmethod
+    def _couples_existants(db: Session, type_cible: str, cibles: List[int], permissions: List[int]) -> Set[Tuple[int, int]]:
+        _, table, colonne = CIBLES[type_cible]
+        return set(
+            db.execute(
+                select(colonne, table.c.permission_id)
+                .where(colonne.in_(cibles), table.c.permission_id.in_(permissions))
+            ).all()
+        )
+
+    @staticmethod
+    def _finaliser(db: Session, type_cible: str, modifiees: Dict[int, List[int]]) -> None:
+        """Incrémente l'époque des cibles modifiées (dans la transaction), valide, puis invalide les caches."""
+        modele = CIBLES[type_cible][0]
+        if modifiees:
+            db.execute(
+                update(modele)
+                .where(modele.id.in_(list(modifiees)))
+                .values(permissions_epoch=modele.permissions_epoch + 1)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+        if not modifiees:
+            return
+        if type_cible == CIBLE_UTILISATEURS:
+            permission_engine.invalider(utilisateurs=modifiees)
+        else:
+            permission_engine.invalider(roles=modifiees)
+            # Les rôles sont servis avec leurs permissions
+            reference_cache.invalider(ROLES)
+
+    @staticmethod
+    def _rapport(operation: str, type_cible: str, cibles: List[int], permissions: List[int],
+                 existants: Set[Tuple[int, int]], modifies_si_existant: bool) -> Tuple[AttributionRapport, Dict[int, List[int]]]:
+        modifiees: Dict[int, List[int]] = defaultdict(list)
+        inchangees: Dict[int, List[int]] = defaultdict(list)
+        for cible in cibles:
+            for permission in permissions:
+                if ((cible, permission) in existants) == modifies_si_existant:
+                    modifiees[cible].append(permission)
+                else:
+                    inchangees[cible].append(permission)
+        rapport = AttributionRapport(
+            operation=operation,
+            type_cible=type_cible,
+            modifiees=sum(map(len, modifiees.values())),
+            inchangees=sum(map(len, inchangees.values())),
+            cibles=[AttributionCible(id=c, modifiees=modifiees.get(c, []), inchangees=inchangees.get(c, [])) for c in cibles],
+        )
+        return rapport, dict(modifiees)
+
+    @staticmethod
+    def accorder(db: Session, type_cible: str, cibles: Iterable[int], permissions: Iterable[int]):
+        """Accorde toutes les permissions à toutes les cibles (les couples déjà présents sont ignorés)."""
+        ids, erreur = AttributionService._verifier(db, type_cible, cibles, permissions)
+        if erreur:
+            return erreur
+        cibles, permissions = ids
+        modele, table, colonne = CIBLES[type_cible]
+        try:
+            existants = AttributionService._couples_existants(db, type_cible, cibles, permissions)
+            rapport, modifiees = AttributionService._rapport("accord", type_cible, cibles, permissions, existants, False)
+            if modifiees:
+                deja = exists().where(colonne == modele.id, table.c.permission_id == Permission.id)
+                couples = (
+                    select(modele.id, Permission.id)
+                    .where(modele.id.in_(cibles), Permission.id.in_(permissions), ~deja)
+                )
+                # IGNORE (MySQL) : un couple ajouté entre-temps par une autre requête ne fait pas échouer l'ensemble
+                db.execute(insert(table).from_select([colonne, table.c.permission_id], couples).prefix_with("IGNORE", dialect="mysql"))
+            AttributionService._finaliser(db, type_cible, modifiees)
+            return {"code": 200, "message": f"{rapport.modifiees} permission(s) accordée(s), {rapport.inchangees} déjà présente(s)", "data": rapport}
+        except IntegrityError as e:
+            db.rollback()
+            return {"code": 409, "message": f"Conflit lors de l'attribution des permissions, veuillez réessayer: {str(e)}", "data": None}
+        except Exception as e:
+            db.rollback()
+            return {"code": 500, "message": f"Erreur inattendue lors de l'attribution des permissions: {str(e)}", "data": None}
+
+    @staticmethod
+    def retirer(db: Session, type_cible: str, cibles: Iterable[int], permissions: Iterable[int]):
+        """Retire toutes les permissions de toutes les cibles (les couples absents sont ignorés)."""
+        ids, erreur = AttributionService._verifier(db, type_cible, cibles, permissions)
+        if erreur:
+            return erreur
+        cibles, permissions = ids
+        _, table, colonne = CIBLES[type_cible]
+        try:
+            existants = AttributionService._couples_existants(db, type_cible, cibles, permissions)
+            rapport, modifiees = AttributionService._rapport("retrait", type_cible, cibles, permissions, existants, True)
+            if modifiees:
+                db.execute(delete(table).where(colonne.in_(cibles), table.c.permission_id.in_(permissions)))
+            AttributionService._finaliser(db, type_cible, modifiees)
+            return {"code": 200, "message": f"{rapport.modifiees} permission(s) retirée(s), {rapport.inchangees} déjà absente(s)", "data": rapport}
+        except Exception as e:
+            db.rollback()
+            return {"code": 500, "message": f"Erreur inattendue lors du retrait des permissions: {str(e)}", "data": None}
@@ -1,63 +1,180 @@
+import hashlib
+import logging
+import secrets
+import time
+import uuid
 import jwt
 from datetime import datetime, timedelta
-from passlib.context import CryptContext
+from typing import Optional
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.configs.settings import settings
+from app.configs.utils.password_hasher import PasswordHasherBusy, password_hasher
+from app.configs.utils.permissions import claims_utilisateur, permission_engine
+from app.configs.utils.token_revocation import get_token_revocation_store
+from app.models.utilisateurs.refresh_token import RefreshToken
 from app.models.utilisateurs.utilisateur import Utilisateur
-from app.schemas.utilisateurs.utilisateur_schema import UtilisateurRead
+from app.services.utilisateurs.utilisateur_service import lire_utilisateur
+
+logger = logging.getLogger(__name__)
 
 # Paramètres de configuration du JWT depuis settings
 SECRET_KEY=settings.SECRET_KEY
 ALGORITHM=settings.ALGORITHM
-# ACCESS_TOKEN_EXPIRE_MINUTES=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-ACCESS_TOKEN_EXPIRE_MINUTES = 120
-
-# Initialisation du contexte de hachage pour les mots de passe
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-# Liste noire des tokens, par utilisateur
-token_blacklist = {}
+ACCESS_TOKEN_EXPIRE_MINUTES=settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-# Vérifie si le mot de passe fourni correspond au mot de passe haché
+# Vérifie si le mot de passe fourni correspond au mot de passe haché (dans le pool de hachage)
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
 
 # Crée un token JWT avec une expiration définie
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta if expires_delta else timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    # jti : identifiant unique du jeton, utilisé pour le révoquer à la déconnexion
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+# Empreinte stockée d'un jeton de rafraîchissement : le jeton est aléatoire (256 bits), SHA-256 suffit
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+# Crée un jeton de rafraîchissement opaque : nouvelle famille à la connexion, même famille à la rotation
+def create_refresh_token(db: Session, utilisateur_id: int, famille: Optional[str] = None) -> str:
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        utilisateur_id=utilisateur_id,
+        famille=famille or uuid.uuid4().hex,
+        token_hash=hash_refresh_token(token),
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
 class AuthService:
     # Authentifie un utilisateur en vérifiant l'email et le mot de passe
     @staticmethod
     def authenticate_user(db: Session, email: str, password: str):
         # Récupérer l'utilisateur par email
         user = db.query(Utilisateur).filter(Utilisateur.email == email).first()
-        # Vérification du mot de passe
-        if not user or not verify_password(password, user.mot_de_passe):
+        if not user:
             return {"code": 401, "message": "Email ou mot de passe invalide", "data": None}
+        # Vérification du mot de passe dans le pool de hachage borné
+        try:
+            valide, nouveau_hash = password_hasher.verify_and_update(password, user.mot_de_passe)
+        except PasswordHasherBusy as e:
+            return {"code": 503, "message": str(e), "data": None}
+        if not valide:
+            return {"code": 401, "message": "Email ou mot de passe invalide", "data": None}
+        return AuthService._connecter(db, user, nouveau_hash)
+
+    # Variante asynchrone : ni la boucle d'événements ni un thread de requête n'attendent bcrypt
+    @staticmethod
+    async def authenticate_user_async(db: Session, email: str, password: str):
+        user = await run_in_threadpool(lambda: db.query(Utilisateur).filter(Utilisateur.email == email).first())
+        if not user:
+            return {"code": 401, "message": "Email ou mot de passe invalide", "data": None}
+        try:
+            valide, nouveau_hash = await password_hasher.averify_and_update(password, user.mot_de_passe)
+        except PasswordHasherBusy as e:
+            return {"code": 503, "message": str(e), "data": None}
+        if not valide:
+            return {"code": 401, "message": "Email ou mot de passe invalide", "data": None}
+        return await run_in_threadpool(AuthService._connecter, db, user, nouveau_hash)
+
+    # Finalise la connexion : remplace le hachage obsolète (schéma ou coût), puis génère les tokens
+    @staticmethod
+    def _connecter(db: Session, user: Utilisateur, nouveau_hash: Optional[str] = None):
+        if nouveau_hash:
+            user.mot_de_passe = nouveau_hash
+        refresh_token = create_refresh_token(db, user.id)
+        db.commit()
+
+        # Génération du token JWT, avec les droits de l'utilisateur (masque, organisation, centre, époque)
+        claims = claims_utilisateur(permission_engine.etat(db, user.id))
+        access_token = create_access_token(data={"sub": str(user.id), **claims}, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
         
-        # Génération du token JWT
-        access_token = create_access_token(data={"sub": str(user.id)}, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-        
-        # Convertir l'utilisateur en un format de lecture (en supposant l'existence de UtilisateurRead)
-        user_data = UtilisateurRead.from_orm(user)
+        # Relire l'utilisateur et ses relations en une passe (le commit les a expirées)
+        user_data = lire_utilisateur(db, user.id)
         
         # Retourne tout sur une seule ligne
-        return {"code": 200, "message": "Authentification réussie", "data": {"access_token": access_token, "token_type": "bearer", "user_info": user_data}}
+        return {"code": 200, "message": "Authentification réussie", "data": {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer", "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60, "user_info": user_data}}
+
+    # Révoque toute une famille de jetons de rafraîchissement (déconnexion ou réutilisation détectée)
+    @staticmethod
+    def _revoquer_famille(db: Session, famille: str, now: datetime) -> int:
+        return (
+            db.query(RefreshToken)
+            .filter(RefreshToken.famille == famille, RefreshToken.revoque_le.is_(None))
+            .update({RefreshToken.revoque_le: now}, synchronize_session=False)
+        )
+
+    # Échange un jeton de rafraîchissement contre un nouveau token d'accès et un nouveau jeton (rotation),
+    # sans vérification de mot de passe
+    @staticmethod
+    def refresh_access_token(db: Session, refresh_token: str):
+        now = datetime.utcnow()
+        jeton = (
+            db.query(RefreshToken)
+            .filter(RefreshToken.token_hash == hash_refresh_token(refresh_token))
+            .with_for_update()
+            .first()
+        )
+        if jeton is None or jeton.revoque_le is not None or jeton.expires_at <= now:
+            db.rollback()
+            return {"code": 401, "message": "Jeton de rafraîchissement invalide ou expiré", "data": None}
+
+        if jeton.utilise_le is not None:
+            # Un jeton déjà remplacé est présenté à nouveau : il a fuité, toute la famille est révoquée
+            AuthService._revoquer_famille(db, jeton.famille, now)
+            db.commit()
+            logger.warning(f"⚠️ Réutilisation d'un jeton de rafraîchissement (utilisateur {jeton.utilisateur_id}), famille révoquée")
+            return {"code": 401, "message": "Jeton de rafraîchissement déjà utilisé, veuillez vous reconnecter", "data": None}
+
+        # Droits à jour (cache des permissions) : un compte supprimé ou désactivé ne peut plus se rafraîchir
+        etat = permission_engine.etat(db, jeton.utilisateur_id)
+        if etat.role_id is None:
+            AuthService._revoquer_famille(db, jeton.famille, now)
+            db.commit()
+            return {"code": 401, "message": "Compte inactif ou inexistant", "data": None}
+
+        jeton.utilise_le = now
+        nouveau_refresh_token = create_refresh_token(db, jeton.utilisateur_id, jeton.famille)
+        db.commit()
+
+        access_token = create_access_token(data={"sub": str(jeton.utilisateur_id), **claims_utilisateur(etat)}, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+        return {"code": 200, "message": "Token renouvelé", "data": {"access_token": access_token, "refresh_token": nouveau_refresh_token, "token_type": "bearer", "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60}}
+
+    # Décode un token de l'utilisateur (signature vérifiée) ; None s'il est invalide ou d'un autre utilisateur
+    @staticmethod
+    def _decode_user_token(user_id: str, token: str, verify_exp: bool = True):
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": verify_exp})
+        except jwt.PyJWTError:
+            return None
+        return payload if payload.get("sub") == str(user_id) else None
 
-    # Gère la déconnexion en mettant le token dans une blacklist spécifique à l'utilisateur
+    # Gère la déconnexion en révoquant le token (jti) jusqu'à son expiration,
+    # ainsi que la famille du jeton de rafraîchissement s'il est fourni.
+    # Un token d'accès déjà expiré reste accepté : sa signature suffit à révoquer la famille
     @staticmethod
-    def logout_user(user_id: str, token: str):
-        # Ajouter le token à la blacklist de l'utilisateur
-        if user_id not in token_blacklist:
-            token_blacklist[user_id] = set()
-        token_blacklist[user_id].add(token)
+    def logout_user(user_id: str, token: str, db: Optional[Session] = None, refresh_token: Optional[str] = None):
+        payload = AuthService._decode_user_token(user_id, token, verify_exp=False)
+        if payload is None:
+            return {"code": 401, "message": "Token invalide ou n'appartenant pas à cet utilisateur", "data": None}
+        expiration = float(payload.get("exp", 0))
+        if payload.get("jti") and expiration > time.time():
+            get_token_revocation_store().revoke(payload["jti"], expiration)
+        if db is not None and refresh_token:
+            jeton = db.query(RefreshToken).filter(RefreshToken.token_hash == hash_refresh_token(refresh_token)).first()
+            if jeton is not None and str(jeton.utilisateur_id) == str(user_id):
+                AuthService._revoquer_famille(db, jeton.famille, datetime.utcnow())
+                db.commit()
         return {"code": 200, "message": "Déconnexion réussie", "data": None}
     
-    # Vérifie si un token est dans la blacklist de l'utilisateur
+    # Vérifie si un token a été révoqué (un token expiré est considéré comme révoqué)
     @staticmethod
     def is_token_blacklisted(user_id: str, token: str) -> bool:
-        return token in token_blacklist.get(user_id, set())
+        payload = AuthService._decode_user_token(user_id, token)
+        if payload is None:
+            return True
+        return bool(payload.get("jti")) and get_token_revocation_store().is_revoked(payload["jti"])
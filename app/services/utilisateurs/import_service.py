@@ -0,0 +1,204 @@
+import csv
+import io
+import json
+import logging
+import time
+from collections import defaultdict
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.configs.enumerations.Comptes import ComptesEnum
+from app.configs.settings import settings
+from app.configs.utils.email_service import EmailService
+from app.configs.utils.password_hasher import password_hasher
+from app.models.organisations.centre_etat_civil import CentreEtatCivil
+from app.models.organisations.organisations import Organisation
+from app.models.utilisateurs.role import Role
+from app.models.utilisateurs.utilisateur import Utilisateur
+from app.schemas.utilisateurs.utilisateur_schema import UtilisateurCreate, UtilisateurImportRapport, UtilisateurImportResultat
+from app.services.utilisateurs.utilisateur_service import UtilisateurService
+
+logger = logging.getLogger(__name__)
+
+# Taille maximale d'une liste IN (...) envoyée à la base
+TAILLE_IN = 1000
+
+
+def par_lots(elements: List[Any], taille: int) -> Iterable[List[Any]]:
+    for debut in range(0, len(elements), taille):
+        yield elements[debut:debut + taille]
+
+
+class UtilisateurImportService:
+    """
+    Import en masse d'utilisateurs (fichier CSV ou JSON).
+
+    - Validation de toutes les lignes (schéma UtilisateurCreate, doublons du fichier), puis des emails,
+      rôles, organisations et centres avec une requête IN (...) par ensemble, au lieu de requêtes par ligne ;
+    - mots de passe générés puis hachés dans un pool de processus dédié, pendant l'insertion des lots précédents ;
+    - insertion par lots (un INSERT multi-lignes par lot) avec les emails de bienvenue mis en file
+      dans la boîte d'envoi, dans la même transaction ;
+    - si un lot échoue (email créé entre-temps), ses lignes sont reprises une par une.
+    Le rapport donne le résultat de chaque ligne.
+    """
+
+    def __init__(self, db: Session, taille_lot: Optional[int] = None):
+        self.db = db
+        self.taille_lot = taille_lot or settings.UTILISATEURS_IMPORT_BATCH_SIZE
+
+    @staticmethod
+    def lire_fichier(contenu: bytes, nom_fichier: str) -> List[Dict[str, Any]]:
+        """
+        Lit les lignes d'un fichier CSV (séparateur , ou ;, en-têtes nom, prenom, email, role_id,
+        organisation_id, centre_id) ou JSON (liste d'objets). Lève ValueError si le fichier est illisible.
+        """
+        texte = contenu.decode("utf-8-sig")
+        if nom_fichier.lower().endswith(".json"):
+            donnees = json.loads(texte)
+            if isinstance(donnees, dict):
+                donnees = donnees.get("utilisateurs")
+            if not isinstance(donnees, list) or not all(isinstance(d, dict) for d in donnees):
+                raise ValueError("Le fichier JSON doit contenir une liste d'utilisateurs")
+            return donnees
+        if nom_fichier.lower().endswith(".csv"):
+            try:
+                dialecte = csv.Sniffer().sniff(texte[:4096], delimiters=",;")
+            except csv.Error:
+                dialecte = csv.excel
+            return [
+                {cle.strip(): (valeur.strip() or None) if isinstance(valeur, str) else valeur
+                 for cle, valeur in ligne.items() if cle}
+                for ligne in csv.DictReader(io.StringIO(texte), dialect=dialecte)
+            ]
+        raise ValueError("Format de fichier non pris en charge (CSV ou JSON attendu)")
+
+    @staticmethod
+    def _erreur(numero: int, email: Optional[str], message: str) -> UtilisateurImportResultat:
+        return UtilisateurImportResultat(ligne=numero, email=email, statut="erreur", message=message)
+
+    def _valider(self, lignes: List[Dict[str, Any]]) -> Tuple[Dict[int, UtilisateurImportResultat], List[Tuple[int, UtilisateurCreate]], Dict[int, Any], Dict[int, Organisation]]:
+        resultats: Dict[int, UtilisateurImportResultat] = {}
+        candidats: List[Tuple[int, UtilisateurCreate]] = []
+        vus: Dict[str, int] = {}
+
+        # Validation ligne par ligne (sans accès à la base)
+        for numero, ligne in enumerate(lignes, start=1):
+            try:
+                utilisateur = UtilisateurCreate(**ligne)
+            except (ValidationError, TypeError) as e:
+                if isinstance(e, ValidationError):
+                    message = "; ".join(f"{'.'.join(map(str, err['loc']))} : {err['msg']}" for err in e.errors())
+                else:
+                    message = str(e)
+                resultats[numero] = self._erreur(numero, ligne.get("email"), message)
+                continue
+            cle = utilisateur.email.lower()
+            if cle in vus:
+                resultats[numero] = self._erreur(numero, utilisateur.email, f"Email en double dans le fichier (ligne {vus[cle]})")
+                continue
+            vus[cle] = numero
+            candidats.append((numero, utilisateur))
+
+        # Validation ensembliste : une requête par ensemble de valeurs
+        emails = [u.email for _, u in candidats]
+        existants = set()
+        for lot in par_lots(emails, TAILLE_IN):
+            existants.update(e.lower() for (e,) in self.db.query(Utilisateur.email).filter(Utilisateur.email.in_(lot)))
+        roles = dict(self.db.query(Role.id, Role.nom).filter(Role.id.in_({u.role_id for _, u in candidats})).all())
+        organisations = {o.id: o for o in self.db.query(Organisation).filter(Organisation.id.in_({u.organisation_id for _, u in candidats}))}
+        centres_demandes = {u.centre_id for _, u in candidats if u.centre_id is not None}
+        centres = {c for (c,) in self.db.query(CentreEtatCivil.id).filter(CentreEtatCivil.id.in_(centres_demandes))} if centres_demandes else set()
+
+        valides = []
+        for numero, utilisateur in candidats:
+            if utilisateur.email.lower() in existants:
+                resultats[numero] = self._erreur(numero, utilisateur.email, "L'email est déjà utilisé.")
+            elif utilisateur.role_id not in roles:
+                resultats[numero] = self._erreur(numero, utilisateur.email, "Rôle non trouvé")
+            elif utilisateur.organisation_id not in organisations:
+                resultats[numero] = self._erreur(numero, utilisateur.email, "Organisation non trouvée")
+            elif utilisateur.centre_id is not None and utilisateur.centre_id not in centres:
+                resultats[numero] = self._erreur(numero, utilisateur.email, "Centre d'état civil non trouvé")
+            else:
+                valides.append((numero, utilisateur))
+        return resultats, valides, roles, organisations
+
+    def _inserer(self, lot: List[Tuple[int, UtilisateurCreate, str, str]], roles: Dict[int, Any],
+                 organisations: Dict[int, Organisation]) -> Dict[str, int]:
+        """Insère un lot d'utilisateurs et met en file leurs emails de bienvenue (sans commit)."""
+        self.db.execute(insert(Utilisateur), [
+            {**utilisateur.dict(), "status": ComptesEnum.ACTIF, "mot_de_passe": hachage}
+            for _, utilisateur, _, hachage in lot
+        ])
+        emails = [utilisateur.email for _, utilisateur, _, _ in lot]
+        ids = {e.lower(): i for e, i in self.db.query(Utilisateur.email, Utilisateur.id).filter(Utilisateur.email.in_(emails))}
+
+        # Emails de bienvenue regroupés par organisation (en-tête et pied communs)
+        envois: Dict[int, List[Tuple[str, Dict[str, Any]]]] = defaultdict(list)
+        for _, utilisateur, mot_de_passe, _ in lot:
+            role = roles[utilisateur.role_id]
+            contexte = UtilisateurService.contexte_bienvenue(getattr(role, "value", role), mot_de_passe)
+            envois[utilisateur.organisation_id].append((utilisateur.email, contexte))
+        for organisation_id, envois_organisation in envois.items():
+            EmailService.queue_template_emails(self.db, envois_organisation, "bienvenue", organisation=organisations[organisation_id])
+        return ids
+
+    def _motif_refus(self, utilisateur: UtilisateurCreate, erreur: IntegrityError) -> str:
+        """Cause d'un refus à l'insertion : email pris entre-temps, sinon la contrainte violée (rôle, organisation ou centre supprimé)."""
+        if self.db.query(Utilisateur.id).filter(Utilisateur.email == utilisateur.email).first() is not None:
+            return "L'email est déjà utilisé."
+        return f"Contrainte d'intégrité non respectée : {erreur.orig}"
+
+    def _inserer_lots(self, lignes_valides: Iterable[Tuple[Tuple[int, UtilisateurCreate], str]], hachages: Iterable[str],
+                      resultats: Dict[int, UtilisateurImportResultat], roles: Dict[int, Any],
+                      organisations: Dict[int, Organisation], total: int) -> None:
+        lignes_valides = iter(lignes_valides)
+        for lot_valides in iter(lambda: list(islice(lignes_valides, self.taille_lot)), []):
+            lot = [(numero, utilisateur, mot_de_passe, hachage)
+                   for ((numero, utilisateur), mot_de_passe), hachage in zip(lot_valides, islice(hachages, len(lot_valides)))]
+            try:
+                ids = self._inserer(lot, roles, organisations)
+                self.db.commit()
+            except IntegrityError:
+                # Un email a été créé entre la validation et l'insertion : reprise ligne par ligne
+                self.db.rollback()
+                ids = {}
+                for ligne in lot:
+                    try:
+                        ids.update(self._inserer([ligne], roles, organisations))
+                        self.db.commit()
+                    except IntegrityError as e:
+                        self.db.rollback()
+                        resultats[ligne[0]] = self._erreur(ligne[0], ligne[1].email, self._motif_refus(ligne[1], e))
+            for numero, utilisateur, _, _ in lot:
+                if numero not in resultats:
+                    resultats[numero] = UtilisateurImportResultat(
+                        ligne=numero, email=utilisateur.email, statut="cree",
+                        message="Utilisateur créé, email en cours d'envoi", id=ids.get(utilisateur.email.lower()))
+            logger.info(f"👥 Import : {len(resultats)}/{total} ligne(s) traitée(s)")
+
+    def importer(self, lignes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        debut = time.monotonic()
+        resultats, valides, roles, organisations = self._valider(lignes)
+
+        # Hachage des mots de passe au fil de l'eau dans un pool de processus
+        mots_de_passe = [UtilisateurService.generate_password() for _ in valides]
+        hachages = password_hasher.hash_many(mots_de_passe)
+        try:
+            self._inserer_lots(zip(valides, mots_de_passe), hachages, resultats, roles, organisations, len(lignes))
+        finally:
+            hachages.close()
+
+        crees = sum(1 for r in resultats.values() if r.statut == "cree")
+        rapport = UtilisateurImportRapport(
+            total=len(lignes), crees=crees, erreurs=len(lignes) - crees,
+            duree_s=round(time.monotonic() - debut, 3),
+            lignes=[resultats[numero] for numero in sorted(resultats)],
+        )
+        message = f"{crees} utilisateur(s) créé(s), {rapport.erreurs} ligne(s) rejetée(s)"
+        return {"code": 200, "message": message, "data": rapport}
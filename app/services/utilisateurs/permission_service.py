@@ -1,9 +1,24 @@
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from app.configs.utils.permissions import permission_engine
+from app.configs.utils.reference_cache import PERMISSIONS, ROLES, reference_cache
 from app.models.utilisateurs.permission import Permission
+from app.models.utilisateurs.relations import role_permissions, user_permissions
+from app.models.utilisateurs.role import Role
+from app.models.utilisateurs.utilisateur import Utilisateur
 from app.schemas.utilisateurs.permission_schema import PermissionCreate, PermissionRead
 
 class PermissionService:
+    @staticmethod
+    def _incrementer_epoques(db: Session, permission_id: int):
+        """Invalide les tokens des rôles et utilisateurs qui portent la permission (avant sa modification)."""
+        roles = db.query(role_permissions.c.role_id).filter(role_permissions.c.permission_id == permission_id)
+        utilisateurs = db.query(user_permissions.c.user_id).filter(user_permissions.c.permission_id == permission_id)
+        db.query(Role).filter(Role.id.in_(roles.scalar_subquery())).update(
+            {Role.permissions_epoch: Role.permissions_epoch + 1}, synchronize_session=False)
+        db.query(Utilisateur).filter(Utilisateur.id.in_(utilisateurs.scalar_subquery())).update(
+            {Utilisateur.permissions_epoch: Utilisateur.permissions_epoch + 1}, synchronize_session=False)
+
     @staticmethod
     def create_permission(db: Session, permission_data: PermissionCreate):
         try:
@@ -14,6 +29,7 @@ class PermissionService:
             new_permission = Permission(**permission_data.dict())
             db.add(new_permission)
             db.commit()
+            reference_cache.invalider(PERMISSIONS)
             db.refresh(new_permission)
             return {"code": 201, "message": "Permission créée avec succès", "data": PermissionRead.from_orm(new_permission)}
         except IntegrityError as e:
@@ -43,7 +59,12 @@ class PermissionService:
         try:
             for key, value in updates.items():
                 setattr(permission, key, value)
+            PermissionService._incrementer_epoques(db, permission_id)
             db.commit()
+            # Le bit d'une permission dépend de son nom : tous les masques sont à recompiler
+            permission_engine.invalider(tout=True)
+            # Les rôles sont servis avec leurs permissions
+            reference_cache.invalider(PERMISSIONS, ROLES)
             db.refresh(permission)
             return {"code": 200, "message": "Permission mise à jour", "data": PermissionRead.from_orm(permission)}
         except IntegrityError as e:
@@ -59,8 +80,11 @@ class PermissionService:
         if not permission:
             return {"code": 404, "message": "Permission non trouvée", "data": None}
         try:
+            PermissionService._incrementer_epoques(db, permission_id)
             db.delete(permission)
             db.commit()
+            permission_engine.invalider(tout=True)
+            reference_cache.invalider(PERMISSIONS, ROLES)
             return {"code": 200, "message": "Permission supprimée avec succès", "data": None}
         except IntegrityError as e:
             db.rollback()
@@ -1,8 +1,11 @@
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from app.configs.utils.identifiants import ROLE, identifier_resolver
+from app.configs.utils.permissions import permission_engine
+from app.configs.utils.reference_cache import ROLES, reference_cache
 from app.models.utilisateurs.role import Role
 from app.schemas.utilisateurs.role_schema import RoleCreate, RoleRead
-from app.models.utilisateurs.permission import Permission
+from app.services.utilisateurs.attribution_service import CIBLE_ROLES, AttributionService
 
 class RoleService:
     @staticmethod
@@ -17,6 +20,8 @@ class RoleService:
             new_role = Role(**role_data.dict())
             db.add(new_role)
             db.commit()
+            identifier_resolver.invalider(ROLE)
+            reference_cache.invalider(ROLES)
             db.refresh(new_role)
             
             return {"code": 201, "message": "Rôle créé avec succès", "data": RoleRead.from_orm(new_role)}
@@ -41,71 +46,21 @@ class RoleService:
 
     @staticmethod
     def assign_permissions_to_role(db: Session, role_id: int, permission_ids: list):
-        """Assigne une liste de permissions à un rôle, en vérifiant qu'elles existent et en évitant les doublons."""
+        """Ajoute des permissions à un rôle (sans retirer les autres), en vérifiant qu'elles existent et en évitant les doublons."""
+        response = AttributionService.accorder(db, CIBLE_ROLES, [role_id], permission_ids)
+        if response["code"] != 200:
+            return {**response, "message": "Rôle non trouvé"} if response["code"] == 404 else response
         role = db.query(Role).filter(Role.id == role_id).first()
-        if not role:
-            return {"code": 404, "message": "Rôle non trouvé", "data": None}
-
-        # Vérifier que toutes les permissions existent
-        existing_permissions = db.query(Permission).filter(Permission.id.in_(permission_ids)).all()
-        existing_permission_ids = {p.id for p in existing_permissions}
-
-        # Permissions manquantes
-        missing_permission_ids = set(permission_ids) - existing_permission_ids
-        if missing_permission_ids:
-            return {"code": 400, "message": f"Les permissions suivantes n'existent pas: {', '.join(map(str, missing_permission_ids))}", "data": None}
-
-        try:
-            # Mettre à jour les permissions du rôle, en supprimant les anciennes et en ajoutant les nouvelles sans doublons
-            current_permissions_ids = {p.id for p in role.permissions}
-            new_permissions_to_add = [p for p in existing_permissions if p.id not in current_permissions_ids]
-            
-            # Mettre à jour les permissions du rôle
-            role.permissions = new_permissions_to_add
-            db.commit()
-            db.refresh(role)
+        return {"code": 200, "message": "Permissions assignées avec succès", "data": RoleRead.from_orm(role)}
 
-            return {"code": 200, "message": "Permissions assignées avec succès", "data": RoleRead.from_orm(role)}
-        except IntegrityError as e:
-            db.rollback()
-            return {"code": 500, "message": f"Erreur d'intégrité lors de l'assignation: {str(e)}", "data": None}
-        except Exception as e:
-            db.rollback()
-            return {"code": 500, "message": f"Erreur inattendue: {str(e)}", "data": None}
-        
     @staticmethod
     def remove_permissions_from_role(db: Session, role_id: int, permission_ids: list):
         """Retire une ou plusieurs permissions d'un rôle, en vérifiant qu'elles existent avant de les retirer."""
+        response = AttributionService.retirer(db, CIBLE_ROLES, [role_id], permission_ids)
+        if response["code"] != 200:
+            return {**response, "message": "Rôle non trouvé"} if response["code"] == 404 else response
         role = db.query(Role).filter(Role.id == role_id).first()
-        if not role:
-            return {"code": 404, "message": "Rôle non trouvé", "data": None}
-
-        # Vérifier que toutes les permissions existent
-        existing_permissions = db.query(Permission).filter(Permission.id.in_(permission_ids)).all()
-        existing_permission_ids = {p.id for p in existing_permissions}
-
-        # Permissions qui n'existent pas
-        non_existing_permission_ids = set(permission_ids) - existing_permission_ids
-        if non_existing_permission_ids:
-            return {"code": 400, "message": f"Les permissions suivantes n'existent pas: {', '.join(map(str, non_existing_permission_ids))}", "data": None}
-
-        try:
-            # Retirer les permissions du rôle
-            current_permission_ids = {p.id for p in role.permissions}
-            permissions_to_remove = [p for p in role.permissions if p.id in permission_ids]
-
-            # Mettre à jour les permissions du rôle en retirant les permissions demandées
-            role.permissions = [p for p in role.permissions if p.id not in permission_ids]
-            db.commit()
-            db.refresh(role)
-
-            return {"code": 200, "message": "Permissions retirées avec succès", "data": RoleRead.from_orm(role)}
-        except IntegrityError as e:
-            db.rollback()
-            return {"code": 500, "message": f"Erreur d'intégrité lors de la suppression des permissions: {str(e)}", "data": None}
-        except Exception as e:
-            db.rollback()
-            return {"code": 500, "message": f"Erreur inattendue: {str(e)}", "data": None}
+        return {"code": 200, "message": "Permissions retirées avec succès", "data": RoleRead.from_orm(role)}
 
     @staticmethod
     def delete_role(db: Session, role_id: int):
@@ -116,6 +71,9 @@ class RoleService:
         try:
             db.delete(role)
             db.commit()
+            permission_engine.invalider(roles=[role_id])
+            identifier_resolver.invalider(ROLE)
+            reference_cache.invalider(ROLES)
             return {"code": 200, "message": "Rôle supprimé avec succès", "data": None}
         except IntegrityError as e:
             db.rollback()
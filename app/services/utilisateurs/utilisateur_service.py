@@ -1,21 +1,81 @@
+import base64
+import json
 import random
 import string
 from datetime import datetime
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from typing import Optional
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
 from sqlalchemy.exc import IntegrityError
 
 from app.configs.enumerations.Comptes import ComptesEnum
+from app.configs.settings import settings
 from app.configs.utils.email_service import EmailService
+from app.configs.utils.identifiants import CENTRE, ORGANISATION, ROLE, identifier_resolver
+from app.configs.utils.password_hasher import PasswordHasherBusy, password_hasher
+from app.configs.utils.permissions import permission_engine
 from app.models.organisations.centre_etat_civil import CentreEtatCivil
 from app.models.organisations.organisations import Organisation
-from app.models.utilisateurs.permission import Permission
 from app.models.utilisateurs.role import Role
 from app.models.utilisateurs.utilisateur import Utilisateur
-from app.schemas.utilisateurs.utilisateur_schema import UtilisateurCreate, UtilisateurRead
+from app.schemas.utilisateurs.utilisateur_schema import UtilisateurCreate, UtilisateurPage, UtilisateurRead
+from app.services.utilisateurs.attribution_service import CIBLE_UTILISATEURS, AttributionService
+
+
+def encoder_curseur(nom: str, utilisateur_id: int) -> str:
+    """Curseur opaque de l'annuaire : clé (nom, id) du dernier utilisateur de la page."""
+    return base64.urlsafe_b64encode(json.dumps([nom, utilisateur_id]).encode()).decode().rstrip("=")
+
+
+def decoder_curseur(curseur: str):
+    """Clé (nom, id) d'un curseur ; lève ValueError s'il est illisible."""
+    try:
+        nom, utilisateur_id = json.loads(base64.urlsafe_b64decode(curseur + "=" * (-len(curseur) % 4)))
+    except Exception:
+        raise ValueError("Curseur invalide")
+    if not isinstance(nom, str) or not isinstance(utilisateur_id, int):
+        raise ValueError("Curseur invalide")
+    return nom, utilisateur_id
+
+
+def options_lecture():
+    """
+    Chargements nécessaires à UtilisateurRead : rôle (avec ses permissions), organisation et centre par
+    jointure, permissions propres par une requête IN. Une liste coûte ainsi trois requêtes quelle que
+    soit sa taille, au lieu de quatre à cinq par utilisateur en chargement paresseux.
+    Avec SQLALCHEMY_RAISELOAD, tout autre chargement paresseux d'une relation lève une erreur.
+    """
+    options = [
+        joinedload(Utilisateur.role).selectinload(Role.permissions),
+        joinedload(Utilisateur.organisation),
+        joinedload(Utilisateur.centre),
+        selectinload(Utilisateur.permissions),
+    ]
+    if settings.SQLALCHEMY_RAISELOAD:
+        options.append(raiseload("*", sql_only=True))
+    return options
+
+
+# Champs modifiables dont dépendent les claims de droits des jetons (statut, rôle, organisation)
+CHAMPS_DROITS = {"status", "role_id", "organisation_id"}
+
+
+def incrementer_epoque(utilisateur: Utilisateur) -> None:
+    """Incrémente l'époque des permissions en SQL (permissions_epoch + 1) : aucune incrémentation concurrente n'est perdue."""
+    utilisateur.permissions_epoch = Utilisateur.permissions_epoch + 1
+
+
+def lire_utilisateur(db: Session, utilisateur_id: int) -> UtilisateurRead:
+    """Relit un utilisateur avec ses relations (après un commit, qui les a expirées)."""
+    utilisateur = (
+        db.query(Utilisateur)
+        .options(*options_lecture())
+        .populate_existing()
+        .filter(Utilisateur.id == utilisateur_id)
+        .one()
+    )
+    return UtilisateurRead.from_orm(utilisateur)
 
-# Initialisation de CryptContext pour le hachage du mot de passe
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 class UtilisateurService:
     def __init__(self, db: Session):
@@ -30,19 +90,20 @@ class UtilisateurService:
 
     @staticmethod
     def hash_password(password: str):
-        """Hash le mot de passe généré"""
-        return pwd_context.hash(password)
+        """Hash le mot de passe généré (dans le pool de hachage borné)"""
+        return password_hasher.hash(password)
 
-    def send_welcome_email(self, email, role_nom, mot_de_passe):
-        """Envoie un email de bienvenue avec le mot de passe et le rôle"""
+    @staticmethod
+    def contexte_bienvenue(role_nom, mot_de_passe):
+        """Contexte du template d'email de bienvenue"""
         current_hour = datetime.now().hour
         salutation = "Bonjour" if current_hour < 18 else "Bonsoir"
-        subject = "Compte utilisateur créé"
-        body = (
-            f"Nous vous informons qu'un compte utilisateur vous a été créé en tant que {role_nom}.\n\n"
-            f"Votre mot de passe est le suivant : {mot_de_passe}\n\n"
-        )
-        return self.email_service.send_email(email, subject, body)
+        return {"salutation": salutation, "role": role_nom, "mot_de_passe": mot_de_passe}
+
+    def send_welcome_email(self, email, role_nom, mot_de_passe, organisation=None):
+        """Met en file l'email de bienvenue avec le mot de passe et le rôle (envoyé après le commit)"""
+        context = self.contexte_bienvenue(role_nom, mot_de_passe)
+        return self.email_service.queue_template_email(self.db, email, "bienvenue", context, organisation=organisation)
 
     def create_utilisateur(self, utilisateur_data: UtilisateurCreate):
         try:
@@ -67,17 +128,19 @@ class UtilisateurService:
             utilisateur_data.status = ComptesEnum.ACTIF
             new_utilisateur = Utilisateur(**utilisateur_data.dict(), mot_de_passe=hashed_password)
             self.db.add(new_utilisateur)
-            self.db.commit()
-            self.db.refresh(new_utilisateur)
 
             # Remplacer RoleEnum par son équivalent lisible
             role_nom = role.nom.value  # Utiliser le nom du rôle dans la base de données (en supposant qu'il est déjà défini)
 
-            # Envoyer l'email de bienvenue
-            success = self.send_welcome_email(utilisateur_data.email, role_nom, mot_de_passe)
-            message = "Utilisateur créé avec succès, email envoyé" if success else "Utilisateur créé avec succès, mais l'email n'a pas pu être envoyé"
-            return {"code": 201, "message": message, "data": UtilisateurRead.from_orm(new_utilisateur)}
+            # Mettre en file l'email de bienvenue : il part avec le commit de l'utilisateur
+            self.send_welcome_email(utilisateur_data.email, role_nom, mot_de_passe, organisation)
+            self.db.commit()
+            message = "Utilisateur créé avec succès, email en cours d'envoi"
+            return {"code": 201, "message": message, "data": lire_utilisateur(self.db, new_utilisateur.id)}
         
+        except PasswordHasherBusy as e:
+            self.db.rollback()
+            return {"code": 503, "message": str(e), "data": None}
         except IntegrityError as e:
             self.db.rollback()
             return {"code": 500, "message": f"Erreur d'intégrité lors de la création de l'utilisateur: {str(e)}", "data": None}
@@ -91,31 +154,65 @@ class UtilisateurService:
         utilisateur = None
 
         if param.isdigit():
-            utilisateur = db.query(Utilisateur).filter(Utilisateur.id == int(param)).first()
+            utilisateur = db.query(Utilisateur).options(*options_lecture()).filter(Utilisateur.id == int(param)).first()
         else:
-            utilisateur = db.query(Utilisateur).filter(Utilisateur.email == param).first()
+            utilisateur = db.query(Utilisateur).options(*options_lecture()).filter(Utilisateur.email == param).first()
         if utilisateur:
             return {"code": 200, "message": "Utilisateur trouvé", "data": UtilisateurRead.from_orm(utilisateur)}
         return {"code": 404, "message": "Utilisateur non trouvé", "data": None}
 
 
     def get_all_utilisateurs(self):
-        utilisateurs = self.db.query(Utilisateur).all()
+        utilisateurs = self.db.query(Utilisateur).options(*options_lecture()).all()
         return {"code": 200, "message": "Liste des utilisateurs récupérée", "data": [UtilisateurRead.from_orm(u) for u in utilisateurs]}
 
+    @staticmethod
+    def rechercher_utilisateurs(db: Session, role_id: Optional[int] = None, organisation_id: Optional[int] = None,
+                                centre_id: Optional[int] = None, status: Optional[ComptesEnum] = None,
+                                nom: Optional[str] = None, apres: Optional[str] = None, limite: Optional[int] = None):
+        """
+        Annuaire paginé par clé : filtres combinables (rôle, organisation, centre, statut, début du nom),
+        tri par (nom, id). Chaque page reprend après la clé du curseur au lieu d'un OFFSET, donc le coût
+        d'une page ne dépend pas de sa position ; les index (filtre, nom, id) évitent le tri.
+        """
+        limite = min(limite or settings.UTILISATEURS_PAGE_TAILLE, settings.UTILISATEURS_PAGE_TAILLE_MAX)
+        query = db.query(Utilisateur).options(*options_lecture())
+        if role_id is not None:
+            query = query.filter(Utilisateur.role_id == role_id)
+        if organisation_id is not None:
+            query = query.filter(Utilisateur.organisation_id == organisation_id)
+        if centre_id is not None:
+            query = query.filter(Utilisateur.centre_id == centre_id)
+        if status is not None:
+            query = query.filter(Utilisateur.status == status)
+        if nom:
+            prefixe = nom.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            query = query.filter(Utilisateur.nom.like(prefixe + "%", escape="\\"))
+        if apres:
+            try:
+                dernier_nom, dernier_id = decoder_curseur(apres)
+            except ValueError as e:
+                return {"code": 400, "message": str(e), "data": None}
+            # Forme développée de (nom, id) > (dernier_nom, dernier_id), utilisable par les index
+            query = query.filter(or_(Utilisateur.nom > dernier_nom,
+                                     and_(Utilisateur.nom == dernier_nom, Utilisateur.id > dernier_id)))
+
+        # Une ligne de plus que la page pour savoir s'il en reste
+        utilisateurs = query.order_by(Utilisateur.nom, Utilisateur.id).limit(limite + 1).all()
+        suivant = None
+        if len(utilisateurs) > limite:
+            utilisateurs = utilisateurs[:limite]
+            suivant = encoder_curseur(utilisateurs[-1].nom, utilisateurs[-1].id)
+        page = UtilisateurPage(elements=[UtilisateurRead.from_orm(u) for u in utilisateurs], suivant=suivant, limite=limite)
+        return {"code": 200, "message": "Utilisateurs trouvés", "data": page}
+
     @staticmethod
     def get_utilisateurs_by_role(db: Session, role: str):
-        # Tenter de convertir `role` en entier pour vérifier si c'est un ID
-        try:
-            role_id = int(role)  # Si `role` est un ID, cela va passer
-            role_obj = db.query(Role).filter(Role.id == role_id).first()
-        except ValueError:
-            # Si la conversion échoue, c'est probablement un nom de rôle
-            role_obj = db.query(Role).filter(Role.nom == role).first()
-        
-        if role_obj:
-            utilisateurs = db.query(Utilisateur).filter(Utilisateur.role_id == role_obj.id).all()
-            return {"code": 200, "message": "Utilisateurs trouvés", "data": utilisateurs}
+        # ID ou nom du rôle, résolu sans requête
+        role_id = identifier_resolver.resoudre(db, ROLE, role)
+        if role_id is not None:
+            utilisateurs = db.query(Utilisateur).options(*options_lecture()).filter(Utilisateur.role_id == role_id).all()
+            return {"code": 200, "message": "Utilisateurs trouvés", "data": [UtilisateurRead.from_orm(u) for u in utilisateurs]}
         
         return {"code": 404, "message": "Role non trouvé", "data": None}
 
@@ -125,20 +222,11 @@ class UtilisateurService:
         Retourne les utilisateurs par organisation.
         Le paramètre peut être l'ID (int), le nom ou la référence (str).
         """
-        # Vérification si l'organisation est un ID (entier)
-        try:
-            organisation_id = int(organisation)  # Tentative de conversion en entier
-            utilisateurs = db.query(Utilisateur).filter(Utilisateur.organisation_id == organisation_id).all()
-        except ValueError:  # Si l'organisation n'est pas un entier, on recherche par nom ou référence
-            # Recherche de l'organisation par nom ou référence
-            org_obj = db.query(Organisation).filter(
-                (Organisation.nom == organisation) | (Organisation.reference == organisation)
-            ).first()
-
-            if org_obj:
-                utilisateurs = db.query(Utilisateur).filter(Utilisateur.organisation_id == org_obj.id).all()
-            else:
-                return {"code": 404, "message": "Organisation non trouvée", "data": None}
+        # ID, nom ou référence, résolu sans requête
+        organisation_id = identifier_resolver.resoudre(db, ORGANISATION, organisation)
+        if organisation_id is None:
+            return {"code": 404, "message": "Organisation non trouvée", "data": None}
+        utilisateurs = db.query(Utilisateur).options(*options_lecture()).filter(Utilisateur.organisation_id == organisation_id).all()
 
         # Si des utilisateurs ont été trouvés, on les retourne, sinon un message d'erreur
         if utilisateurs:
@@ -151,24 +239,11 @@ class UtilisateurService:
         Retourne les utilisateurs par centre d'état civil.
         Le paramètre peut être l'ID (int) ou une valeur de référence, nom, email ou téléphone (str).
         """
-        if isinstance(centre, int):
-            # Recherche par ID du centre
-            utilisateurs = db.query(Utilisateur).filter(Utilisateur.centre_id == centre).all()
-        else:
-            # Recherche par référence, nom, email ou téléphone
-            centre_obj = db.query(CentreEtatCivil).filter(
-                (CentreEtatCivil.id == centre) |
-                (CentreEtatCivil.reference == centre) |
-                (CentreEtatCivil.nom == centre) |
-                (CentreEtatCivil.email == centre) |
-                (CentreEtatCivil.telephone == centre)
-            ).first()
-
-            if centre_obj:
-                # Recherche des utilisateurs pour ce centre
-                utilisateurs = db.query(Utilisateur).filter(Utilisateur.centre_id == centre_obj.id).all()
-            else:
-                return {"code": 404, "message": "Centre d'état civil non trouvé", "data": None}
+        # Recherche par ID, référence, nom, email ou téléphone, résolue sans requête
+        centre_id = identifier_resolver.resoudre(db, CENTRE, centre)
+        if centre_id is None:
+            return {"code": 404, "message": "Centre d'état civil non trouvé", "data": None}
+        utilisateurs = db.query(Utilisateur).options(*options_lecture()).filter(Utilisateur.centre_id == centre_id).all()
 
         if utilisateurs:
             # Retourne les utilisateurs trouvés sous forme de données lisibles
@@ -186,6 +261,10 @@ class UtilisateurService:
             return {"code": 404, "message": "Utilisateur non trouvé", "data": None}
         
         try:
+            # Les jetons en cours ne sont refusés que si les droits changent : la route envoie toujours
+            # statut, rôle et organisation, seules les valeurs différentes de l'état actuel comptent
+            droits_modifies = any(cle in updates and updates[cle] != getattr(utilisateur, cle) for cle in CHAMPS_DROITS)
+
             if 'role_id' in updates:
                 role = db.query(Role).filter(Role.id == updates['role_id']).first()
                 if not role:
@@ -201,10 +280,13 @@ class UtilisateurService:
             for key, value in updates.items():
                 if key not in ['role_id', 'organisation_id', 'centre_id']:
                     setattr(utilisateur, key, value)
+            if droits_modifies:
+                incrementer_epoque(utilisateur)
 
             db.commit()
-            db.refresh(utilisateur)
-            return {"code": 200, "message": "Utilisateur mis à jour", "data": UtilisateurRead.from_orm(utilisateur)}
+            if droits_modifies:
+                permission_engine.invalider(utilisateurs=[utilisateur_id])
+            return {"code": 200, "message": "Utilisateur mis à jour", "data": lire_utilisateur(db, utilisateur_id)}
         
         except IntegrityError as e:
             db.rollback()
@@ -221,6 +303,7 @@ class UtilisateurService:
         try:
             db.delete(utilisateur)
             db.commit()
+            permission_engine.invalider(utilisateurs=[utilisateur_id])
             return {"code": 200, "message": "Utilisateur supprimé", "data": None}
         except IntegrityError as e:
             db.rollback()
@@ -250,12 +333,13 @@ class UtilisateurService:
         utilisateur.organisation_id = organisation.id
         utilisateur.organisation_affecte_par_id = assigner.id
         utilisateur.date_affectation_organisation = datetime.now()
+        incrementer_epoque(utilisateur)
         
         # Enregistrement dans la base de données
         db.commit()
-        db.refresh(utilisateur)
+        permission_engine.invalider(utilisateurs=[utilisateur_id])
 
-        return {"code": 200, "message": "Utilisateur affecté à l'organisation", "data": UtilisateurRead.from_orm(utilisateur)}
+        return {"code": 200, "message": "Utilisateur affecté à l'organisation", "data": lire_utilisateur(db, utilisateur_id)}
 
     @staticmethod
     def assign_user_to_centre(db: Session, assigner_id: int, utilisateur_id: int, centre_id: int):
@@ -273,38 +357,26 @@ class UtilisateurService:
             return {"code": 404, "message": f"Le centre d'état civil avec l'ID {centre_id} n'existe pas dans la base de données de votre organisation. Veuillez vérifier les informations du centre.", "data": None}
         # Effectuer l'assignation
         utilisateur.centre_id = centre_id
+        incrementer_epoque(utilisateur)
         db.commit()
+        permission_engine.invalider(utilisateurs=[utilisateur_id])
         # Retourner directement l'entité utilisateur après l'assignation
-        return {"code": 200, "message": f"L'utilisateur {utilisateur.nom} a été affecté avec succès au centre {centre.nom}.", "data": UtilisateurRead.from_orm(utilisateur)}
+        return {"code": 200, "message": f"L'utilisateur {utilisateur.nom} a été affecté avec succès au centre {centre.nom}.", "data": lire_utilisateur(db, utilisateur_id)}
 
     @staticmethod
     def assign_permissions_to_user(db: Session, assigner_id: int, utilisateur_id: int, permissions: list):
-        assigner = db.query(Utilisateur).filter(Utilisateur.id == assigner_id).first()
+        assigner = db.query(Utilisateur.id).filter(Utilisateur.id == assigner_id).first()
         if not assigner:
             return {"code": 404, "message": "Utilisateur assignant non trouvé", "data": None}
-        
-        utilisateur = db.query(Utilisateur).filter(Utilisateur.id == utilisateur_id).first()
-        if not utilisateur:
-            return {"code": 404, "message": "Utilisateur à affecter non trouvé", "data": None}
-
-        for perm_id in permissions:
-            permission = db.query(Permission).filter(Permission.id == perm_id).first()
-            if permission:
-                if permission not in utilisateur.permissions:
-                    utilisateur.permissions.append(permission)
-            else:
-                return {"code": 404, "message": f"Permission avec l'ID {perm_id} non trouvée", "data": None}
 
-        try:
-            db.commit()
-            db.refresh(utilisateur)
-            return {"code": 200, "message": f"Permissions assignées à {utilisateur.nom} {utilisateur.prenom}", "data": utilisateur}
-        except IntegrityError as e:
-            db.rollback()
-            return {"code": 500, "message": f"Erreur d'intégrité lors de l'assignation des permissions: {str(e)}", "data": None}
-        except Exception as e:
-            db.rollback()
-            return {"code": 500, "message": f"Erreur inattendue lors de l'assignation des permissions: {str(e)}", "data": None}
+        # Un seul INSERT ... SELECT pour toutes les permissions (celles déjà attribuées sont ignorées)
+        response = AttributionService.accorder(db, CIBLE_UTILISATEURS, [utilisateur_id], permissions)
+        if response["code"] == 404:
+            return {"code": 404, "message": "Utilisateur à affecter non trouvé", "data": None}
+        if response["code"] != 200:
+            return response
+        data = lire_utilisateur(db, utilisateur_id)
+        return {"code": 200, "message": f"Permissions assignées à {data.nom} {data.prenom}", "data": data}
     
     @staticmethod
     def change_role(db: Session, utilisateur_id: int, new_role_id: int):
@@ -321,10 +393,11 @@ class UtilisateurService:
             return {"code": 404, "message": "Rôle non trouvé", "data": None}
 
         utilisateur.role_id = new_role_id
+        incrementer_epoque(utilisateur)
         try:
             db.commit()
-            db.refresh(utilisateur)
-            return {"code": 200, "message": "Rôle mis à jour avec succès", "data": UtilisateurRead.from_orm(utilisateur)}
+            permission_engine.invalider(utilisateurs=[utilisateur_id])
+            return {"code": 200, "message": "Rôle mis à jour avec succès", "data": lire_utilisateur(db, utilisateur_id)}
         except IntegrityError as e:
             db.rollback()
             return {"code": 500, "message": f"Erreur d'intégrité lors de la mise à jour du rôle: {str(e)}", "data": None}
@@ -339,7 +412,9 @@ class UtilisateurService:
         try:
             # Retirer l'utilisateur de son centre
             utilisateur.centre_id = None
+            incrementer_epoque(utilisateur)
             self.db.commit()
+            permission_engine.invalider(utilisateurs=[utilisateur_id])
             self.db.refresh(utilisateur)
             # Convertir en dict et supprimer la clé non sérialisable
             utilisateur_data = utilisateur.__dict__.copy()
@@ -0,0 +1,65 @@
+"""
+Benchmark du rendu des emails : templates reparsés à chaque message vs moteur compilé et mis en cache.
+
+Usage : python -m benchmarks.email_templates_benchmark [--messages 5000]
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from app.configs.utils.email_templates import TEMPLATES_DIR, EmailTemplateEngine
+
+
+def rendu_sans_cache(nom, contexte, organisation):
+    """Ce que ferait un envoi naïf : nouvel environnement, lecture et compilation des templates par message."""
+    dossier = f"{TEMPLATES_DIR}/fr"
+    html_env = Environment(loader=FileSystemLoader(dossier), autoescape=select_autoescape(["html"]))
+    texte_env = Environment(loader=FileSystemLoader(dossier))
+    commun = {"application": "ANGARA", "organisation": organisation.nom, "locale": "fr"}
+    entete = html_env.get_template("_entete.html").render(commun)
+    pied_html = html_env.get_template("_pied.html").render(commun)
+    pied_texte = texte_env.get_template("_pied.txt").render(commun)
+    sujet = texte_env.get_template(f"{nom}.sujet.txt").render(commun, **contexte)
+    html = html_env.get_template(f"{nom}.html").render(commun, entete=entete, pied=pied_html, **contexte)
+    texte = texte_env.get_template(f"{nom}.txt").render(commun, pied=pied_texte, **contexte)
+    return sujet, html, texte
+
+
+def mesurer(libelle, fonction, messages):
+    debut = time.perf_counter()
+    fonction()
+    duree = time.perf_counter() - debut
+    print(f"{libelle:<32} {duree:8.3f} s  {messages / duree:10.0f} emails/s  {duree / messages * 1e6:8.1f} µs/email")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5000)
+    args = parser.parse_args()
+
+    organisations = [SimpleNamespace(id=i, nom=f"Organisation {i}") for i in range(5)]
+    contextes = [
+        {"salutation": "Bonjour", "role": "AGENT", "mot_de_passe": f"Mdp-{i:06d}"}
+        for i in range(args.messages)
+    ]
+
+    moteur = EmailTemplateEngine()
+    debut = time.perf_counter()
+    moteur.precompiler()
+    print(f"Précompilation : {(time.perf_counter() - debut) * 1000:.1f} ms")
+
+    mesurer("Sans cache (reparse/message)",
+            lambda: [rendu_sans_cache("bienvenue", c, organisations[i % 5]) for i, c in enumerate(contextes)],
+            args.messages)
+    mesurer("Moteur compilé (render)",
+            lambda: [moteur.render("bienvenue", c, organisation=organisations[i % 5]) for i, c in enumerate(contextes)],
+            args.messages)
+    mesurer("Moteur compilé (render_many)",
+            lambda: moteur.render_many("bienvenue", contextes, organisation=organisations[0]),
+            args.messages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Vérification de RedisOTPStore contre un Redis local simulé (fakeredis, decode_responses=True comme get_redis).
+
+Contrôles :
+- save / get : l'OTP relu porte le code et les dates (à la seconde) enregistrés ;
+- consume : un code erroné est refusé sans supprimer l'OTP, le bon code n'est accepté qu'une fois,
+  y compris quand plusieurs threads le présentent en même temps ;
+- expiration : passé sa durée de vie, l'OTP n'est plus lu ni consommable.
+
+Usage : pip install fakeredis
+        python -m benchmarks.otp_store_redis_check
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import fakeredis
+
+os.environ.setdefault("EMAIL_OUTBOX_WORKER_ENABLED", "false")
+# Le stockage Redis ne lit pas la base : une base SQLite en mémoire suffit à importer les modèles
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+
+def verifier(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+    print(f"✅ {message}")
+
+
+def main():
+    from app.services.clients.otp_store import RedisOTPStore, vers_epoch
+
+    store = RedisOTPStore(client=fakeredis.FakeRedis(decode_responses=True))
+
+    enregistre = store.save(1, "123456", timedelta(minutes=5))
+    relu = store.get(1)
+    verifier(relu is not None and relu.otp_code == "123456", "get relit l'OTP enregistré")
+    verifier(vers_epoch(relu.created_at) == vers_epoch(enregistre.created_at)
+             and vers_epoch(relu.expires_at) == vers_epoch(enregistre.expires_at),
+             "get restitue les dates de création et d'expiration")
+    verifier(store.get(2) is None, "get ne trouve rien pour une session sans OTP")
+
+    verifier(not store.consume(1, "654321"), "consume refuse un code erroné")
+    verifier(not store.consume(1, "12345"), "consume refuse un préfixe du bon code")
+    verifier(store.get(1) is not None, "un code erroné ne supprime pas l'OTP")
+    verifier(store.consume(1, "123456"), "consume accepte le bon code")
+    verifier(not store.consume(1, "123456"), "consume refuse un OTP déjà utilisé")
+    verifier(store.get(1) is None, "l'OTP consommé n'est plus lu")
+
+    store.save(1, "111111", timedelta(minutes=5))
+    store.save(1, "222222", timedelta(minutes=5))
+    verifier(not store.consume(1, "111111") and store.consume(1, "222222"), "save remplace l'OTP précédent")
+
+    store.save(3, "333333", timedelta(minutes=5))
+    with ThreadPoolExecutor(16) as pool:
+        acceptes = sum(pool.map(lambda _: store.consume(3, "333333"), range(64)))
+    verifier(acceptes == 1, "64 consommations concurrentes : une seule acceptée")
+
+    store.save(4, "444444", timedelta(seconds=1))
+    time.sleep(1.5)
+    verifier(store.get(4) is None, "get ne lit plus un OTP expiré")
+    verifier(not store.consume(4, "444444"), "consume refuse un OTP expiré")
+
+
+if __name__ == "__main__":
+    main()
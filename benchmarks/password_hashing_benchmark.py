@@ -0,0 +1,88 @@
+"""
+Benchmark d'une rafale de connexions (vérification bcrypt) et de son effet sur les autres routes.
+
+Les routes synchrones de FastAPI partagent le pool de threads d'anyio (40 threads par défaut).
+Le benchmark lance une rafale de vérifications de mot de passe et, en parallèle, des requêtes
+« légères » qui passent par ce même pool ; il mesure la latence de ces dernières selon le mode :
+- inline : bcrypt exécuté dans le thread de la requête (comportement historique) ;
+- thread / process : bcrypt confié au PasswordHasher (pool dédié borné, threads ou processus).
+
+Usage : python -m benchmarks.password_hashing_benchmark [--connexions 200] [--workers 4] [--rounds 10]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("EMAIL_OUTBOX_WORKER_ENABLED", "false")
+
+
+def percentile(valeurs, p):
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, int(len(valeurs) * p))]
+
+
+async def rafale(mode, connexions, workers, hachage):
+    from starlette.concurrency import run_in_threadpool
+    from app.configs.utils.password_hasher import PasswordHasher, PasswordHasherBusy, pwd_context
+
+    hasher = None if mode == "inline" else PasswordHasher(workers=workers, queue_size=connexions, executor=mode)
+    if hasher:
+        # Démarrage du pool hors mesure (création des processus)
+        await hasher.averify_and_update("mot-de-passe", hachage)
+
+    async def connexion():
+        if hasher is None:
+            return await run_in_threadpool(pwd_context.verify_and_update, "mot-de-passe", hachage)
+        try:
+            return await hasher.averify_and_update("mot-de-passe", hachage)
+        except PasswordHasherBusy:
+            return False, None
+
+    latences = []
+    termine = asyncio.Event()
+
+    async def route_legere():
+        while not termine.is_set():
+            debut = time.perf_counter()
+            await run_in_threadpool(lambda: None)
+            latences.append((time.perf_counter() - debut) * 1000)
+            await asyncio.sleep(0.005)
+
+    sondes = [asyncio.create_task(route_legere()) for _ in range(4)]
+    debut = time.perf_counter()
+    resultats = await asyncio.gather(*(connexion() for _ in range(connexions)))
+    duree = time.perf_counter() - debut
+    termine.set()
+    await asyncio.gather(*sondes)
+
+    assert all(valide for valide, _ in resultats)
+    stats = hasher.stats() if hasher else None
+    if hasher:
+        hasher.close()
+    print(f"{mode:<8} {connexions / duree:8.1f} connexions/s   autres routes : "
+          f"p50 {statistics.median(latences):7.2f} ms   p99 {percentile(latences, 0.99):7.2f} ms   "
+          f"max {max(latences):7.2f} ms")
+    if stats:
+        print(f"         file : attente moyenne {stats['attente_moyenne_ms']} ms, "
+              f"durée moyenne {stats['duree_moyenne_ms']} ms, rejets {stats['rejetes']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connexions", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--rounds", type=int, default=10, help="Coût bcrypt du hachage vérifié.")
+    args = parser.parse_args()
+
+    from passlib.hash import bcrypt
+    hachage = bcrypt.using(rounds=args.rounds).hash("mot-de-passe")
+
+    print(f"{args.connexions} connexions simultanées, bcrypt coût {args.rounds}, {args.workers} workers de hachage")
+    for mode in ("inline", "thread", "process"):
+        asyncio.run(rafale(mode, args.connexions, args.workers, hachage))
+
+
+if __name__ == "__main__":
+    main()
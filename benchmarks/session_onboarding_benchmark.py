@@ -0,0 +1,137 @@
+"""
+Benchmark de l'inscription d'un client (client + session + OTP + email en file).
+
+Compare le chemin historique (un commit par étape, refresh, nouvelle requête pour l'OTP)
+avec le chemin en une transaction de ClientService.create_client, en comptant les requêtes SQL
+et les commits, sur une base SQLite temporaire. Un délai peut être ajouté à chaque requête
+pour simuler l'aller-retour réseau vers MySQL.
+
+Usage : python -m benchmarks.session_onboarding_benchmark [--clients 300] [--rtt-ms 0.5]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+os.environ.setdefault("EMAIL_OUTBOX_WORKER_ENABLED", "false")
+
+from app.jobs.common import charger_modeles  # noqa: E402
+
+charger_modeles()
+
+from app.configs.database import Base  # noqa: E402
+from app.configs.utils.email_service import EmailService  # noqa: E402
+from app.models.clients.client import Client  # noqa: E402
+from app.models.clients.otp import OTP  # noqa: E402
+from app.models.clients.session import Session as ClientSession  # noqa: E402
+from app.schemas.clients.client_schema import ClientCreate  # noqa: E402
+from app.services.clients.client_services import ClientService  # noqa: E402
+
+
+class Compteur:
+    def __init__(self, engine, rtt: float):
+        self.requetes = 0
+        self.commits = 0
+        self.rtt = rtt
+        event.listen(engine, "before_cursor_execute", self._requete)
+        event.listen(engine, "commit", self._commit)
+
+    def _requete(self, *args):
+        self.requetes += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+    def _commit(self, *args):
+        self.commits += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+    def reinitialiser(self):
+        self.requetes = self.commits = 0
+
+
+def inscription_historique(db, email):
+    """Réplique du chemin d'inscription avant consolidation (ClientService -> SessionService -> OTPService)."""
+    client = db.query(Client).filter(Client.email == email).first()
+    client = Client(email=email)
+    db.add(client)
+    db.commit()
+    db.refresh(client)
+
+    client = db.query(Client).filter(Client.id == client.id).first()
+    db.query(ClientSession).filter(
+        ClientSession.client_id == client.id, ClientSession.is_active == True,
+        ClientSession.expires_at > datetime.utcnow()
+    ).first()
+    current_time = datetime.utcnow()
+    db.query(ClientSession).filter(ClientSession.client_id == client.id).update({
+        ClientSession.is_active: False, ClientSession.expires_at: current_time - timedelta(seconds=20)
+    })
+    db.commit()
+    session = ClientSession(client_id=client.id, is_active=False, expires_at=current_time)
+    db.add(session)
+    db.commit()
+    db.refresh(session)
+
+    session_obj = db.query(ClientSession).filter(ClientSession.id == session.id).first()
+    receiver_email = session_obj.client.email
+    for otp in db.query(OTP).filter(OTP.session_id == session.id).all():
+        otp.expires_at = current_time - timedelta(seconds=20)
+    db.commit()
+    otp = OTP(session_id=session.id, otp_code=str(random.randint(10000, 99999)),
+              expires_at=current_time + timedelta(minutes=70))
+    db.add(otp)
+    EmailService.queue_template_email(db, receiver_email, "otp", {"otp_code": otp.otp_code, "validite_minutes": 70})
+    db.commit()
+    db.refresh(otp)
+    return {c.name: getattr(client, c.name) for c in client.__table__.columns}, \
+        {c.name: getattr(session, c.name) for c in session.__table__.columns}
+
+
+def inscription_consolidee(db, email):
+    reponse = ClientService(db).create_client(ClientCreate(email=email))
+    assert reponse["code"] == 201, reponse["message"]
+
+
+def executer(libelle, fonction, SessionBench, compteur, clients, prefixe):
+    compteur.reinitialiser()
+    debut = time.perf_counter()
+    for i in range(clients):
+        db = SessionBench()
+        try:
+            fonction(db, f"{prefixe}{i}@angara.cm")
+        finally:
+            db.close()
+    duree = time.perf_counter() - debut
+    print(f"{libelle:<14} {compteur.requetes / clients:6.1f} requêtes/inscription   "
+          f"{compteur.commits / clients:4.1f} commits/inscription   "
+          f"{duree / clients * 1000:7.2f} ms/inscription   {clients / duree:8.1f} inscriptions/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--rtt-ms", type=float, default=0.5, help="Délai simulé par requête et par commit.")
+    args = parser.parse_args()
+
+    from app.configs import settings as module_settings
+    module_settings.settings.OTP_STORE_BACKEND = "database"
+
+    fichier = os.path.join(tempfile.mkdtemp(), "onboarding.db")
+    engine = create_engine(f"sqlite:///{fichier}")
+    Base.metadata.create_all(engine)
+    SessionBench = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    compteur = Compteur(engine, args.rtt_ms / 1000)
+
+    print(f"{args.clients} inscriptions, aller-retour simulé {args.rtt_ms} ms")
+    executer("historique", inscription_historique, SessionBench, compteur, args.clients, "h")
+    executer("consolidé", inscription_consolidee, SessionBench, compteur, args.clients, "c")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Benchmark du débit d'envoi des emails contre un serveur SMTP local (aiosmtpd).
+
+Le serveur local accepte n'importe quels identifiants et compte les connexions ouvertes ;
+EmailService y est redirigé via SMTP_SERVER / SMTP_PORT / SMTP_USE_SSL=false.
+
+Modes comparés :
+- direct : EmailService.send_email, une connexion + login par email (comportement historique) ;
+- pool   : SMTPConnectionPool, connexions authentifiées réutilisées ;
+- outbox : emails mis en file (base SQLite temporaire) puis envoyés par EmailOutboxWorker ;
+           la latence est mesurée de la mise en file à la réception par le serveur (OTP de bout en bout).
+
+Usage : pip install aiosmtpd
+        python -m benchmarks.smtp_benchmark [--messages 500] [--concurrence 8] [--latence-ms 5] [--modes direct,pool,outbox]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import SMTP, AuthResult
+
+HOTE = "127.0.0.1"
+PORT = int(os.getenv("BENCH_SMTP_PORT", "8465"))
+
+# EmailService lit sa configuration à l'import : rediriger vers le serveur local avant tout import de l'application
+os.environ.update({"SMTP_SERVER": HOTE, "SMTP_PORT": str(PORT), "SMTP_USE_SSL": "false",
+                   "GMAIL_EMAIL": "bench@angara.local", "GMAIL_PASSWORD": "bench",
+                   "EMAIL_OUTBOX_BACKOFF_SECONDS": "1"})
+
+
+class ServeurSMTPLocal(SMTP):
+    """Serveur SMTP qui compte les connexions et simule un temps de traitement par message."""
+
+    def connection_made(self, transport):
+        self.event_handler.connexions += 1
+        super().connection_made(transport)
+
+
+class Reception:
+    def __init__(self, latence: float):
+        self.latence = latence
+        self.connexions = 0
+        self.recus = {}
+        self.lock = threading.Lock()
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.latence:
+            import asyncio
+            await asyncio.sleep(self.latence)
+        identifiant = None
+        for ligne in envelope.content.decode("utf-8", "replace").splitlines():
+            if ligne.startswith("X-Bench-Id:"):
+                identifiant = ligne.split(":", 1)[1].strip()
+                break
+        with self.lock:
+            self.recus[identifiant or str(len(self.recus))] = time.perf_counter()
+        return "250 OK"
+
+    def reinitialiser(self):
+        with self.lock:
+            self.connexions = 0
+            self.recus.clear()
+
+
+class Controleur(Controller):
+    def factory(self):
+        return ServeurSMTPLocal(self.handler, auth_require_tls=False,
+                                authenticator=lambda *args: AuthResult(success=True))
+
+
+def percentile(valeurs, p):
+    if not valeurs:
+        return 0.0
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, int(round(p / 100 * (len(valeurs) - 1))))]
+
+
+def rapport(mode, reception, duree, latences, messages):
+    print(f"{mode:<8} {messages / duree:9.1f} msg/s   p50 {percentile(latences, 50) * 1000:8.1f} ms   "
+          f"p99 {percentile(latences, 99) * 1000:8.1f} ms   connexions {reception.connexions:5d}   "
+          f"reçus {len(reception.recus)}/{messages}")
+
+
+def contenus(messages):
+    """Alterne des emails OTP et de bienvenue rendus depuis les templates."""
+    from app.configs.utils.email_templates import email_templates
+    emails = []
+    for i in range(messages):
+        if i % 2:
+            rendu = email_templates.render("otp", {"otp_code": f"{i % 100000:05d}", "validite_minutes": 70})
+        else:
+            rendu = email_templates.render("bienvenue", {"salutation": "Bonjour", "role": "AGENT", "mot_de_passe": f"Mdp-{i}"})
+        emails.append((f"utilisateur{i}@angara.local", rendu))
+    return emails
+
+
+def executer_synchrone(mode, envoyer, emails, concurrence, reception):
+    latences = []
+
+    def tache(email):
+        debut = time.perf_counter()
+        envoyer(*email)
+        latences.append(time.perf_counter() - debut)
+
+    debut = time.perf_counter()
+    with ThreadPoolExecutor(concurrence) as executor:
+        list(executor.map(tache, emails))
+    rapport(mode, reception, time.perf_counter() - debut, latences, len(emails))
+
+
+def mode_direct(emails, concurrence, reception):
+    from app.configs.utils.email_service import EmailService
+
+    def envoyer(destinataire, rendu):
+        # send_email ne permet pas d'ajouter d'en-tête : la latence est mesurée côté client
+        EmailService.send_email(destinataire, rendu.sujet, rendu.html, html=True)
+
+    executer_synchrone("direct", envoyer, emails, concurrence, reception)
+
+
+def mode_pool(emails, concurrence, reception):
+    from app.configs.utils.email_service import SMTPConnectionPool
+    pool = SMTPConnectionPool(max_size=concurrence)
+    executer_synchrone("pool", lambda d, r: pool.send(d, r.sujet, r.html, True, r.texte), emails, concurrence, reception)
+    pool.close()
+
+
+def mode_outbox(emails, concurrence, reception):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.configs.utils.email_service import EmailService
+    from app.models.notifications.email_outbox import EmailOutbox
+    from app.services.notifications.email_outbox_service import EmailOutboxWorker
+
+    fichier = os.path.join(tempfile.mkdtemp(), "outbox.db")
+    engine = create_engine(f"sqlite:///{fichier}", connect_args={"check_same_thread": False})
+    EmailOutbox.__table__.create(engine)
+    SessionBench = sessionmaker(bind=engine)
+
+    # Mise en file : l'identifiant de l'email (X-Bench-Id) permet de relier envoi et réception
+    mises_en_file = {}
+    db = SessionBench()
+    for destinataire, rendu in emails:
+        email = EmailService.queue_email(db, destinataire, rendu.sujet, rendu.html, html=True, text=rendu.texte)
+        db.flush()
+        mises_en_file[str(email.id)] = time.perf_counter()
+    db.commit()
+    db.close()
+
+    import app.configs.utils.email_service as module_email
+    build_message = module_email.EmailService.build_message
+
+    def build_message_identifie(receiver_email, subject, body, html=False, text=None):
+        message = build_message(receiver_email, subject, body, html, text)
+        message["X-Bench-Id"] = identifiants[receiver_email]
+        return message
+
+    identifiants = {destinataire: str(i + 1) for i, (destinataire, _) in enumerate(emails)}
+    module_email.EmailService.build_message = staticmethod(build_message_identifie)
+    try:
+        worker = EmailOutboxWorker(SessionBench, concurrency=concurrence, batch_size=max(50, concurrence * 8))
+        debut = time.perf_counter()
+        while len(reception.recus) < len(emails):
+            if not sum(worker.run_once().values()):
+                time.sleep(0.05)
+            if time.perf_counter() - debut > 600:
+                break
+        duree = time.perf_counter() - debut
+        worker.pool.close()
+        worker.executor.shutdown()
+    finally:
+        module_email.EmailService.build_message = build_message
+    latences = [reception.recus[i] - mises_en_file[i] for i in mises_en_file if i in reception.recus]
+    rapport("outbox", reception, duree, latences, len(emails))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrence", type=int, default=8)
+    parser.add_argument("--latence-ms", type=float, default=5, help="Temps de traitement simulé par message côté serveur.")
+    parser.add_argument("--modes", default="direct,pool,outbox")
+    args = parser.parse_args()
+
+    reception = Reception(args.latence_ms / 1000)
+    controleur = Controleur(reception, hostname=HOTE, port=PORT)
+    controleur.start()
+    try:
+        emails = contenus(args.messages)
+        print(f"{args.messages} emails, concurrence {args.concurrence}, latence serveur {args.latence_ms} ms")
+        modes = {"direct": mode_direct, "pool": mode_pool, "outbox": mode_outbox}
+        for mode in args.modes.split(","):
+            reception.reinitialiser()
+            modes[mode.strip()](emails, args.concurrence, reception)
+    finally:
+        controleur.stop()
+
+
+if __name__ == "__main__":
+    main()